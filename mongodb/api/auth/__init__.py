@@ -6,6 +6,7 @@ from mongodb.api.auth.jwt_auth import (
     Token,
     TokenData,
     UserCreate,
+    UserUpdate,
     UserResponse,
     LoginRequest,
     create_access_token,
@@ -13,6 +14,7 @@ from mongodb.api.auth.jwt_auth import (
     decode_token,
     authenticate_user,
     create_user,
+    update_user,
     get_current_user,
     get_current_active_user,
     get_optional_user,
@@ -21,12 +23,15 @@ from mongodb.api.auth.jwt_auth import (
     require_crawler,
     verify_password,
     get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
 )
 
 __all__ = [
     "Token",
     "TokenData",
     "UserCreate",
+    "UserUpdate",
     "UserResponse",
     "LoginRequest",
     "create_access_token",
@@ -34,6 +39,7 @@ __all__ = [
     "decode_token",
     "authenticate_user",
     "create_user",
+    "update_user",
     "get_current_user",
     "get_current_active_user",
     "get_optional_user",
@@ -42,4 +48,6 @@ __all__ = [
     "require_crawler",
     "verify_password",
     "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
 ]
@@ -5,6 +5,8 @@ Provides user authentication and token management
 
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
@@ -12,6 +14,7 @@ from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from mongodb.api.config.settings import settings
 from mongodb.api.config.database import get_users_collection
+from mongodb.api.auth.principal_cache import principal_cache, invalidate_principal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,6 +22,16 @@ logger = logging.getLogger(__name__)
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt takes ~100-300ms of CPU per call (the C code releases the GIL), so
+# it runs on a small dedicated pool instead of the event loop. The pool size
+# caps concurrent hashes; jobs beyond auth_hash_max_pending are rejected so a
+# login flood cannot queue up unbounded work.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.auth_hash_workers,
+    thread_name_prefix="bcrypt"
+)
+_hash_pending = 0
+
 # Security scheme
 security = HTTPBearer()
 
@@ -48,6 +61,12 @@ class UserCreate(BaseModel):
     role: str = "user"  # user, admin, crawler
 
 
+class UserUpdate(BaseModel):
+    role: Optional[str] = None  # user, admin, crawler
+    is_active: Optional[bool] = None
+    full_name: Optional[str] = None
+
+
 class UserInDB(BaseModel):
     id: str
     username: str
@@ -88,6 +107,33 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_hash(func, *args):
+    """Run a bcrypt call on the hash pool (bounded queue)"""
+    global _hash_pending
+    if _hash_pending >= settings.auth_hash_max_pending:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent authentication requests",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password without blocking the event loop"""
+    return await _run_hash(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash without blocking the event loop"""
+    return await _run_hash(get_password_hash, password)
+
+
 # ============================================
 # Token Utilities
 # ============================================
@@ -194,7 +240,7 @@ async def create_user(user_data: UserCreate) -> Dict[str, Any]:
         "username": user_data.username,
         "email": user_data.email,
         "full_name": user_data.full_name,
-        "hashed_password": get_password_hash(user_data.password),
+        "hashed_password": await get_password_hash_async(user_data.password),
         "role": user_data.role,
         "is_active": True,
         "created_at": datetime.utcnow()
@@ -207,6 +253,30 @@ async def create_user(user_data: UserCreate) -> Dict[str, Any]:
     return user_doc
 
 
+async def update_user(username: str, updates: UserUpdate) -> Optional[Dict[str, Any]]:
+    """
+    Update a user's role / status / name.
+    Cached principals are invalidated on every worker, so a deactivation
+    or role change applies to already-issued tokens right away.
+    """
+    from pymongo import ReturnDocument
+    users = get_users_collection()
+    
+    changes = updates.model_dump(exclude_none=True)
+    if not changes:
+        return await get_user_by_username(username)
+    
+    user = await users.find_one_and_update(
+        {"username": username},
+        {"$set": changes},
+        return_document=ReturnDocument.AFTER
+    )
+    if user is not None:
+        await invalidate_principal(username)
+        logger.info(f"Updated user {username}: {sorted(changes)}")
+    return user
+
+
 async def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
     """Authenticate user with username and password"""
     user = await get_user_by_username(username)
@@ -214,7 +284,7 @@ async def authenticate_user(username: str, password: str) -> Optional[Dict[str,
     if not user:
         return None
     
-    if not verify_password(password, user["hashed_password"]):
+    if not await verify_password_async(password, user["hashed_password"]):
         return None
     
     if not user.get("is_active", True):
@@ -250,7 +320,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = await get_user_by_username(username)
+    # Short-TTL per-worker cache; invalidated on role/status changes
+    user = await principal_cache.get_or_load(username, get_user_by_username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,106 @@
+"""
+Principal cache for get_current_user
+
+Resolving a bearer token used to cost a ``users.find_one`` on every request.
+Resolved users are kept per worker for ``auth_principal_cache_ttl`` seconds,
+keyed by the token subject (username). When a user is deactivated or
+changes role, ``invalidate_principal`` drops the entry locally and publishes
+the username on Redis so every worker drops it too; the TTL bounds
+staleness if Redis is down.
+"""
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import copy
+import json
+import logging
+import time
+
+from mongodb.api.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCache:
+    """Short-TTL LRU of resolved users, invalidated over Redis pub/sub"""
+
+    def __init__(self, ttl: Optional[int] = None, max_size: Optional[int] = None):
+        self.ttl = settings.auth_principal_cache_ttl if ttl is None else ttl
+        self.max_size = max_size or settings.auth_principal_cache_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Bumped on invalidation so a load that started before it is not cached
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(
+        self,
+        subject: str,
+        loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Cached user for ``subject``; calls ``loader`` on a miss"""
+        if self.ttl <= 0:
+            return await loader(subject)
+
+        entry = self._entries.get(subject)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(subject)
+                self.hits += 1
+                return copy.copy(user)
+            del self._entries[subject]
+
+        self.misses += 1
+        generation = self._generations.get(subject, 0)
+        user = await loader(subject)
+        if user is not None and self._generations.get(subject, 0) == generation:
+            self._entries[subject] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return copy.copy(user) if user is not None else None
+
+    def forget(self, subject: str):
+        """Drop one principal on this worker"""
+        self._entries.pop(subject, None)
+        self._generations[subject] = self._generations.get(subject, 0) + 1
+
+    def clear(self):
+        self._entries.clear()
+        self._generations.clear()
+
+    async def _on_redis_message(self, message: Any):
+        if isinstance(message, str) and message:
+            self.forget(message)
+
+    async def setup_redis_subscriber(self):
+        """Listen for invalidations published by other workers"""
+        try:
+            from mongodb.api.services.redis_service import RedisService, CHANNEL_AUTH_INVALIDATE
+            await RedisService.subscribe(CHANNEL_AUTH_INVALIDATE, self._on_redis_message)
+        except Exception as e:
+            logger.warning(f"Principal cache invalidation not shared across workers: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "ttl": self.ttl,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Global cache - one per worker process
+principal_cache = PrincipalCache()
+
+
+async def invalidate_principal(username: str):
+    """Drop a user's cached principal on every worker"""
+    principal_cache.forget(username)
+    try:
+        from mongodb.api.services.redis_service import RedisService, CHANNEL_AUTH_INVALIDATE
+        # JSON-encoded so usernames like "123" survive the subscriber's json.loads
+        await RedisService.publish(CHANNEL_AUTH_INVALIDATE, json.dumps(username))
+    except Exception as e:
+        logger.debug(f"Principal invalidation not published: {e}")
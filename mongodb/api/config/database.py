@@ -76,7 +76,13 @@ class Database:
             await articles.create_index([("disaster_type", ASCENDING)])
             await articles.create_index([("severity", ASCENDING)])
             await articles.create_index([("region", ASCENDING)])
+            await articles.create_index([("province", ASCENDING)])
+            await articles.create_index([("provinces", ASCENDING)])  # multikey: any province mentioned
             await articles.create_index([("url", ASCENDING)], unique=True, sparse=True)
+            # Near-duplicate stories: /articles?collapse=true and the story index sync
+            await articles.create_index([("story_id", ASCENDING)], sparse=True)
+            await articles.create_index([("created_at", DESCENDING)])
+            await articles.create_index([("event_id", ASCENDING)], sparse=True)
             
             # Text index with "none" language for Vietnamese support
             # First, try to drop any existing text index with wrong language
@@ -102,7 +108,22 @@ class Database:
             sources = cls.db.sources
             await sources.create_index([("domain", ASCENDING)], unique=True, sparse=True)
             await sources.create_index([("is_active", ASCENDING)])
-            
+
+            # Source health probes (time-series)
+            await cls._create_source_health_collection()
+
+            # Crawl queue: claims scan pending / expired units oldest first
+            crawl_units = cls.db.crawl_units
+            await crawl_units.create_index([("state", ASCENDING), ("created_at", ASCENDING)])
+            await crawl_units.create_index([("sweep_id", ASCENDING), ("state", ASCENDING)])
+            await cls.db.crawl_sweeps.create_index([("created_at", DESCENDING)])
+
+            # Events: open candidates per type/region, dashboard lists by activity
+            events = cls.db.events
+            await events.create_index([("disaster_type", ASCENDING), ("region", ASCENDING), ("last_seen_at", DESCENDING)])
+            await events.create_index([("last_seen_at", DESCENDING)])
+            await events.create_index([("provinces", ASCENDING), ("last_seen_at", DESCENDING)])
+
             # Keywords collection indexes
             keywords = cls.db.keywords
             await keywords.create_index([("keyword", ASCENDING)])
@@ -118,6 +139,28 @@ class Database:
         except Exception as e:
             logger.warning(f"⚠️ Error creating indexes: {e}")
     
+    @classmethod
+    async def _create_source_health_collection(cls):
+        """Time-series collection for feed probes (MongoDB 5.0+), expired after the retention period"""
+        from mongodb.api.config.settings import settings
+
+        if "source_health" in await cls.db.list_collection_names():
+            return
+        try:
+            await cls.db.create_collection(
+                "source_health",
+                timeseries={"timeField": "checked_at", "metaField": "meta", "granularity": "minutes"},
+                expireAfterSeconds=settings.source_health_retention_days * 86400
+            )
+        except Exception as e:
+            # Older servers: a regular collection with a TTL index
+            logger.warning(f"Time-series collections unavailable ({e}), using a TTL index")
+            await cls.db.source_health.create_index(
+                [("checked_at", ASCENDING)],
+                expireAfterSeconds=settings.source_health_retention_days * 86400
+            )
+        await cls.db.source_health.create_index([("meta.domain", ASCENDING), ("checked_at", DESCENDING)])
+
     @classmethod
     def get_db(cls) -> AsyncIOMotorDatabase:
         """Get database instance"""
@@ -26,12 +26,24 @@ class Settings(BaseSettings):
     redis_url: str = "redis://localhost:6379"
     redis_db: int = 0
     redis_password: Optional[str] = None
+    realtime_wire_format: str = "json"  # json or msgpack (cross-worker event envelope)
+    redis_pubsub_batch_size: int = 256  # pub/sub messages drained per listener wakeup
+    event_bus_stream: str = "events:disaster"  # Redis Stream for ingest events
+    event_bus_group: str = "realtime-hub"  # consumer group shared by API workers
+    event_bus_maxlen: int = 10000  # approximate MAXLEN trim
+    event_bus_batch_size: int = 100  # events per XADD / XREADGROUP batch
+    event_bus_block_ms: int = 5000  # XREADGROUP block time
+    event_bus_claim_idle_ms: int = 60000  # reclaim entries pending this long
 
     # Security settings
     secret_key: str = "your-super-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    auth_principal_cache_ttl: int = 30  # seconds a resolved user is reused, 0 = off
+    auth_principal_cache_size: int = 10000  # max cached principals per worker
+    auth_hash_workers: int = 4  # threads for bcrypt hash/verify
+    auth_hash_max_pending: int = 64  # queued hash jobs before logins get 503
     
     # CORS settings - comma separated origins
     cors_origins: str = "http://localhost:8080,http://localhost:5173,http://localhost:3000,http://127.0.0.1:8080,http://127.0.0.1:5173,http://127.0.0.1:3000"
@@ -47,10 +59,36 @@ class Settings(BaseSettings):
     # WebSocket settings
     websocket_url: str = "ws://localhost:8000/realtime/ws/disasters"
     ws_heartbeat_interval: int = 30
+    ws_idle_timeout: int = 0  # close sockets silent this long (seconds), 0 = never
+    ws_send_queue_size: int = 256  # outbound frames buffered per client
+    ws_slow_consumer_policy: str = "drop_oldest"  # drop_oldest or disconnect
+    ws_replay_buffer_size: int = 1000  # recent sequenced events kept for resume
+    ws_coalesce_window_ms: int = 250  # batch new_disaster bursts, 0 = send each event
+    ws_coalesce_max_events: int = 100  # flush a batch early at this size
 
     # Scheduler settings
     scheduler_timezone: str = "Asia/Ho_Chi_Minh"
-    crawl_interval_minutes: int = 15
+    crawl_interval_minutes: int = 15  # initial interval of a feed without history
+    adaptive_crawl_enabled: bool = True
+    crawl_schedule_tick_seconds: int = 60  # how often due feeds are looked up
+    crawl_min_interval_minutes: int = 5
+    crawl_max_interval_minutes: int = 360
+    crawl_target_items_per_poll: float = 3.0  # new entries expected per poll
+    crawl_severity_boost_minutes: int = 120  # poll at the minimum interval after a high-severity hit
+    crawl_claim_timeout_s: int = 600  # a claimed feed is released after this if its crawl dies
+    # The 00:05 crawl also crawls every direct feed; off while the adaptive
+    # scheduler polls them (the fixed crawl then only searches Google News)
+    scheduled_full_crawl_enabled: bool = False
+    
+    # Distributed sweeps: units are leased for crawl_claim_timeout_s
+    crawl_unit_max_attempts: int = 3
+    crawl_worker_concurrency: int = 2  # units one worker crawls at once
+    crawl_worker_poll_seconds: int = 5  # idle workers look for new units this often
+    
+    @property
+    def scheduled_crawl_includes_direct(self) -> bool:
+        """Whether the fixed daily crawl also crawls the direct RSS feeds"""
+        return self.scheduled_full_crawl_enabled or not self.adaptive_crawl_enabled
 
     # Logging settings
     log_level: str = "INFO"
@@ -60,12 +98,35 @@ class Settings(BaseSettings):
     # Rate limiting
     rate_limit_requests: int = 100
     rate_limit_window: int = 60  # seconds
+    rate_limit_enabled: bool = True
+    rate_limit_lease_size: int = 10  # tokens a worker reserves per Redis call
+    rate_limit_lease_ms: int = 1000  # unused leased tokens expire after this
 
     # Crawler settings
     crawler_user_agent: str = "DisasterMonitor/2.0 (+https://github.com/disaster-monitor)"
     crawler_timeout: int = 30
     crawler_max_retries: int = 3
 
+    # Source health checks
+    source_health_concurrency: int = 20  # feeds probed at once
+    source_health_timeout: int = 10  # seconds per feed
+    source_health_max_bytes: int = 2_000_000  # stop reading a feed body after this
+    source_health_retention_days: int = 30  # probe history kept in source_health
+
+    # Near-duplicate story clustering
+    story_similarity: float = 0.5  # estimated Jaccard of title + lead to join a story
+    story_window_days: int = 3  # stories stay open for new copies this long
+    story_skip_near_duplicates: bool = False  # don't extract/classify/store copies of a known story
+
+    # Disaster events (articles clustered by type, region, time and title)
+    event_window_hours: int = 72  # an event takes new articles until quiet this long
+    event_similarity: float = 0.25  # word-level Jaccard of titles to join an event
+
+    # Reclassification backfill
+    reclassify_batch_size: int = 1000  # articles per classify + bulk write round
+    reclassify_workers: int = 0  # classifier processes, 0 = CPU count
+    reclassify_lease_s: int = 300  # a job whose runner stops renewing is taken over after this
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
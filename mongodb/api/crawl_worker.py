@@ -0,0 +1,31 @@
+"""
+Crawl Worker - tiến trình chỉ nhận và crawl các đơn vị trong hàng đợi crawl
+
+Sweeps started by the API or the daily scheduler are split into units
+(feeds, keywords) in MongoDB; every running worker claims its own units,
+so a sweep finishes roughly N times faster with N replicas:
+
+    docker compose up -d --scale crawl-worker=4
+"""
+
+import asyncio
+import logging
+
+from mongodb.api.config.database import Database
+from mongodb.api.config.settings import settings
+from mongodb.api.services.crawl_queue import CrawlWorker
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    await Database.connect(settings.mongo_uri, settings.mongo_db)
+    try:
+        await CrawlWorker().run_forever()
+    finally:
+        await Database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,6 +6,7 @@ Provides endpoints for automated daily data updates
 from fastapi import FastAPI, BackgroundTasks, HTTPException
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.asyncio import AsyncIOExecutor
 import logging
@@ -18,6 +19,9 @@ from mongodb.api.services.stats_service import StatsUpdateService
 from mongodb.api.services.maintenance_service import MaintenanceService
 from mongodb.api.services.sources_service import SourcesHealthService
 from mongodb.api.services.keywords_service import KeywordsUpdateService
+from mongodb.api.services.crawl_scheduler import adaptive_scheduler
+from mongodb.api.config.settings import settings
+from mongodb.api.config.database import Database
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -54,6 +58,9 @@ scheduler = AsyncIOScheduler(
 async def startup_event():
     """Initialize scheduler on startup"""
     try:
+        # Jobs read and write MongoDB
+        await Database.connect(settings.mongo_uri, settings.mongo_db)
+
         # Start the scheduler
         scheduler.start()
         logger.info("🚀 Scheduler started successfully")
@@ -72,6 +79,7 @@ async def shutdown_event():
         logger.info("🛑 Scheduler shut down")
     except Exception as e:
         logger.error(f"Error shutting down scheduler: {e}")
+    await Database.disconnect()
 
 async def schedule_daily_jobs():
     """Schedule all daily jobs"""
@@ -85,7 +93,8 @@ async def schedule_daily_jobs():
             replace_existing=True
         )
 
-        # Crawl data at 0:05
+        # Crawl data at 0:05 (Google News only while the adaptive crawl
+        # polls the direct feeds, see scheduled_full_crawl_enabled)
         scheduler.add_job(
             daily_crawl,
             trigger=CronTrigger(hour=0, minute=5),
@@ -121,6 +130,18 @@ async def schedule_daily_jobs():
             replace_existing=True
         )
 
+        # Adaptive per-feed crawl (feeds are claimed in MongoDB, so the API
+        # scheduler running the same job does not double-poll)
+        if settings.adaptive_crawl_enabled:
+            scheduler.add_job(
+                adaptive_crawl,
+                trigger=IntervalTrigger(seconds=settings.crawl_schedule_tick_seconds),
+                id="adaptive_crawl",
+                name="Adaptive Feed Crawl",
+                replace_existing=True,
+                coalesce=True
+            )
+
         logger.info("📅 Daily jobs scheduled successfully")
 
     except Exception as e:
@@ -142,11 +163,20 @@ async def daily_crawl():
     try:
         logger.info("🌐 Running daily crawl...")
         service = DailyCrawlService()
-        result = await service.crawl_all_sources()
+        result = await service.crawl_all_sources(include_direct=settings.scheduled_crawl_includes_direct)
         logger.info(f"✅ Daily crawl completed: {result}")
     except Exception as e:
         logger.error(f"❌ Daily crawl failed: {e}")
 
+async def adaptive_crawl():
+    """Crawl the feeds that are due by their learned publish rate"""
+    try:
+        result = await adaptive_scheduler.run_due()
+        if result["crawled"]:
+            logger.info(f"✅ Adaptive crawl completed: {result}")
+    except Exception as e:
+        logger.error(f"❌ Adaptive crawl failed: {e}")
+
 async def daily_stats_update():
     """Daily statistics update"""
     try:
@@ -25,7 +25,9 @@ from mongodb.api.routers import (
     keywords, regions, realtime, internal, auth
 )
 from mongodb.api.routers import crawl as crawl_router
-from mongodb.api.websockets.disaster_feed import manager as ws_manager
+from mongodb.api.websockets.hub import hub as ws_manager
+from mongodb.api.services.event_bus import EventBus, RECONNECT_INTERVAL, realtime_consumer
+from mongodb.api.auth.principal_cache import principal_cache
 from mongodb.api.middleware.rate_limit import limiter, setup_rate_limiting
 
 # Setup structured logging
@@ -44,20 +46,32 @@ from mongodb.api.services.maintenance_service import MaintenanceService
 from mongodb.api.services.sources_service import SourcesHealthService
 from mongodb.api.services.keywords_service import KeywordsUpdateService
 from mongodb.api.services.crawl_service import DailyCrawlService
+from mongodb.api.services.crawl_scheduler import adaptive_scheduler
+from mongodb.api.services.reclassify_service import reclassify_service
 
 
 async def scheduled_crawl():
-    """Daily crawl from all sources - runs at 00:05"""
+    """Daily crawl - runs at 00:05 (Google News only while the adaptive scheduler polls the feeds)"""
     try:
         logger.info("🌐 [Scheduler] Running daily crawl...")
         service = DailyCrawlService()
-        result = await service.crawl_all_sources()
+        result = await service.crawl_all_sources(include_direct=settings.scheduled_crawl_includes_direct)
         stored = result.get('total', {}).get('stored', 0)
         logger.info(f"✅ [Scheduler] Crawl completed: {stored} new articles")
     except Exception as e:
         logger.error(f"❌ [Scheduler] Crawl failed: {e}")
 
 
+async def scheduled_adaptive_crawl():
+    """Crawl the feeds that are due by their learned publish rate"""
+    try:
+        result = await adaptive_scheduler.run_due()
+        if result["crawled"]:
+            logger.info(f"✅ [Scheduler] Adaptive crawl: {result}")
+    except Exception as e:
+        logger.error(f"❌ [Scheduler] Adaptive crawl failed: {e}")
+
+
 async def scheduled_health_check():
     """Daily sources health check - runs at 00:00"""
     try:
@@ -102,10 +116,50 @@ async def scheduled_maintenance():
         logger.error(f"❌ [Scheduler] Maintenance failed: {e}")
 
 
+async def scheduled_reclassify():
+    """Relabel stored articles after a classifier change - runs at 02:00"""
+    try:
+        result = await reclassify_service.run_if_needed()
+        if result:
+            logger.info(f"✅ [Scheduler] Reclassification: {result.get('changed')}/{result.get('scanned')} relabeled")
+    except Exception as e:
+        logger.error(f"❌ [Scheduler] Reclassification failed: {e}")
+
+
 # ============================================
 # Application Lifespan
 # ============================================
 
+# Feeds ingest events from the Redis Stream to this worker's realtime hub
+event_consumer = realtime_consumer()
+
+
+async def connect_redis():
+    """Start the Redis-backed realtime pieces (raises if Redis is unreachable)"""
+    from mongodb.api.services.redis_service import RedisService
+    await RedisService.connect()
+    if not ws_manager.redis_connected:
+        await ws_manager.setup_redis_subscriber()
+    await ws_manager.start_heartbeat()
+    await event_consumer.start()
+    # The consumer reads the stream now - stop publishing locally
+    EventBus.local_only = False
+    await principal_cache.setup_redis_subscriber()
+
+
+async def reconnect_redis():
+    """Retry until Redis is reachable, then switch to the event bus"""
+    while True:
+        await asyncio.sleep(RECONNECT_INTERVAL)
+        try:
+            await connect_redis()
+        except Exception as e:
+            logger.debug(f"Redis still not available: {e}")
+            continue
+        logger.info("📡 Redis available - realtime events now go through the event bus")
+        return
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -123,17 +177,20 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
     
-    # Connect to Redis (optional)
+    # Connect to Redis (optional). Until this worker's consumer reads the
+    # stream, events are published locally instead of written to it
+    EventBus.local_only = True
+    redis_retry = None
     try:
-        from mongodb.api.services.redis_service import RedisService
-        await RedisService.connect()
-        await ws_manager.setup_redis_subscriber()
+        await connect_redis()
     except Exception as e:
         logger.warning(f"Redis not available: {e}. WebSocket will use local broadcast.")
+        redis_retry = asyncio.create_task(reconnect_redis())
     
     # Start Scheduler
     try:
-        # Daily crawl at 00:05 (first job of the day)
+        # Daily crawl at 00:05 (first job of the day); direct feeds are left
+        # to the adaptive crawl unless SCHEDULED_FULL_CRAWL_ENABLED is set
         scheduler.add_job(
             scheduled_crawl,
             trigger=CronTrigger(hour=0, minute=5),
@@ -178,6 +235,29 @@ async def lifespan(app: FastAPI):
             replace_existing=True
         )
         
+        # Reclassification backfill at 02:00: only does work when the
+        # classifier rules changed or an earlier run was interrupted
+        scheduler.add_job(
+            scheduled_reclassify,
+            trigger=CronTrigger(hour=2, minute=0),
+            id="daily_reclassify",
+            name="Reclassification Backfill",
+            replace_existing=True,
+            max_instances=1
+        )
+        
+        # Adaptive per-feed crawl: look for due feeds every tick
+        if settings.adaptive_crawl_enabled:
+            scheduler.add_job(
+                scheduled_adaptive_crawl,
+                trigger=IntervalTrigger(seconds=settings.crawl_schedule_tick_seconds),
+                id="adaptive_crawl",
+                name="Adaptive Feed Crawl",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+        
         # Optional: Stats update every 15 minutes for realtime dashboard
         scheduler.add_job(
             scheduled_stats_update,
@@ -206,6 +286,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Error stopping scheduler: {e}")
     
+    # Stop reading the event bus, then drop WebSocket clients
+    if redis_retry:
+        redis_retry.cancel()
+    await event_consumer.stop()
+    await ws_manager.stop()
+    
     # Disconnect from MongoDB
     await Database.disconnect()
     
@@ -400,6 +486,8 @@ async def run_job_now(job_id: str, background_tasks: BackgroundTasks):
         "stats_update": scheduled_stats_update,
         "keywords_update": scheduled_keywords_update,
         "maintenance": scheduled_maintenance,
+        "adaptive_crawl": scheduled_adaptive_crawl,
+        "reclassify": scheduled_reclassify,
     }
     
     if job_id not in job_map:
@@ -1,2 +1,4 @@
 """Middleware package"""
-from mongodb.api.middleware.rate_limit import limiter, setup_rate_limiting, rate_limit, RATE_LIMITS
+from mongodb.api.middleware.rate_limit import (
+    limiter, setup_rate_limiting, rate_limit, RATE_LIMITS, distributed_limiter
+)
@@ -1,6 +1,13 @@
 """
-Rate Limiting Middleware using SlowAPI
+Rate Limiting Middleware
 Protects API endpoints from abuse
+
+Every request is counted against its RATE_LIMITS category by a Redis
+sliding-window limiter shared by all workers and replicas (see
+sliding_window.py); that middleware is the only limiter requests pass
+through. The SlowAPI limiter stays on in-memory storage for the legacy
+``@rate_limit`` decorator (no route uses it) so it never makes a blocking
+Redis call on the event loop.
 """
 
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -11,6 +18,11 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from typing import Callable, Optional
 import logging
 
+from mongodb.api.config.settings import settings
+from mongodb.api.middleware.sliding_window import (
+    SlidingWindowLimiter, RateLimitResult, parse_limit
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,7 +52,7 @@ def get_client_ip(request: Request) -> str:
 limiter = Limiter(
     key_func=get_client_ip,
     default_limits=["200 per minute", "5000 per hour"],
-    storage_uri="memory://",  # Use Redis in production: "redis://localhost:6379"
+    storage_uri="memory://",  # fleet-wide limits come from distributed_limiter
     strategy="fixed-window",
     headers_enabled=True,
 )
@@ -71,9 +83,64 @@ RATE_LIMITS = {
 }
 
 
+# Parsed once: category -> (requests, window seconds)
+_PARSED_LIMITS = {category: parse_limit(spec) for category, spec in RATE_LIMITS.items()}
+
+# Path prefix -> category (first match wins); other paths use read/write/public
+CATEGORY_PREFIXES = (
+    ("/api/v1/crawl", "crawl"),
+    ("/api/v1/internal/crawl", "crawl"),
+    ("/api/v1/dashboard", "dashboard"),
+    ("/api/v1/realtime/stream", "websocket"),
+    ("/realtime/stream", "websocket"),
+)
+
+EXEMPT_PATHS = {"/health", "/", "/docs", "/redoc", "/openapi.json"}
+
+# Shared by every request in this worker
+distributed_limiter = SlidingWindowLimiter()
+
+
+def get_rate_limit_category(request: Request) -> str:
+    """RATE_LIMITS category a request is counted against"""
+    path = request.url.path
+    if path.startswith("/api/v1/auth"):
+        # Login / register / refresh are brute-force targets; /me is a read
+        return "auth" if request.method == "POST" else "read"
+    for prefix, category in CATEGORY_PREFIXES:
+        if path.startswith(prefix):
+            return category
+    if request.method in ("GET", "HEAD"):
+        return "read" if path.startswith("/api/") else "public"
+    return "write"
+
+
+def rate_limited_response(result: RateLimitResult, category: str) -> Response:
+    """429 body in the same shape as custom_rate_limit_handler"""
+    from fastapi.responses import JSONResponse
+    
+    return JSONResponse(
+        status_code=429,
+        content={
+            "error": "Rate limit exceeded",
+            "message": "Too many requests. Please try again later.",
+            "detail": RATE_LIMITS[category],
+            "retry_after": str(result.retry_after)
+        },
+        headers={
+            "Retry-After": str(result.retry_after),
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": "0",
+        }
+    )
+
+
 def rate_limit(limit_type: str = "read"):
     """
-    Decorator factory for rate limiting
+    Decorator factory for an extra per-route, per-process limit
+    
+    Category limits are already enforced for every request by the
+    middleware; only use this for a route that needs a tighter limit.
     
     Usage:
         @router.get("/items")
@@ -98,18 +165,27 @@ def setup_rate_limiting(app):
     # Add exception handler for rate limit exceeded
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
     
-    # Add custom middleware that skips OPTIONS requests
+    # Enforce RATE_LIMITS categories across all workers
     @app.middleware("http")
     async def rate_limit_middleware(request: Request, call_next):
         # Skip rate limiting for OPTIONS (CORS preflight)
-        if request.method == "OPTIONS":
+        if not settings.rate_limit_enabled or request.method == "OPTIONS":
             return await call_next(request)
         
         # Skip health check endpoints
-        if request.url.path in ["/health", "/", "/docs", "/redoc", "/openapi.json"]:
+        if request.url.path in EXEMPT_PATHS:
             return await call_next(request)
         
-        return await call_next(request)
+        category = get_rate_limit_category(request)
+        limit, window = _PARSED_LIMITS[category]
+        result = await distributed_limiter.hit(f"{category}:{get_client_ip(request)}", limit, window)
+        if not result.allowed:
+            return rate_limited_response(result, category)
+        
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(result.limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+        return response
     
     logger.info("🛡️ Rate limiting enabled")
 
@@ -0,0 +1,253 @@
+"""
+Distributed sliding-window rate limiter
+
+Counters live in Redis so every worker and replica enforces the same limit.
+Each (category, client) key uses the sliding-window-counter approximation:
+the previous fixed window's count, weighted by how much of it still
+overlaps the sliding window, plus the current window's count. The check and
+the increment run atomically in one Lua script.
+
+To avoid a Redis call per request, a worker reserves a lease of tokens and
+spends them locally; a denial is cached locally until it expires as well.
+A key without recent local demand is charged exactly one token; the lease
+doubles only while the previous one was used up before it expired, and the
+unspent part of an expired lease is refunded on the next reservation, so
+sparse clients are never charged for tokens they did not use. If Redis is
+unavailable the same algorithm runs in process (per-worker limits) until
+Redis is back.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import logging
+import math
+import re
+import time
+
+from mongodb.api.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS: current window, previous window, window charged for the refunded lease
+# ARGV: limit, window_ms, now_ms, tokens wanted, unspent tokens to refund
+# Returns: tokens granted, tokens left, ms until the current window ends
+SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local wanted = tonumber(ARGV[4])
+local refund = tonumber(ARGV[5])
+if refund > 0 then
+    local charged = tonumber(redis.call('GET', KEYS[3]) or '0')
+    if charged > 0 then
+        redis.call('DECRBY', KEYS[3], math.min(refund, charged))
+    end
+end
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local elapsed = now % window
+local used = previous * (window - elapsed) / window + current
+local available = math.floor(limit - used)
+local granted = math.max(0, math.min(wanted, available))
+if granted > 0 then
+    redis.call('INCRBY', KEYS[1], granted)
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+end
+return {granted, math.max(0, available - granted), window - elapsed}
+"""
+
+# Seconds between reconnect attempts once Redis was found unavailable
+RECONNECT_INTERVAL = 30
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+
+def parse_limit(spec: str) -> Tuple[int, int]:
+    """``"60/minute"`` or ``"200 per minute"`` -> (60, 60 seconds)"""
+    match = _LIMIT_RE.match(spec.lower())
+    if not match:
+        raise ValueError(f"Invalid rate limit: {spec}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * _UNITS[unit]
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int = 0  # seconds
+
+
+class _Lease:
+    """Tokens reserved from Redis (or a cached denial) for one key"""
+
+    __slots__ = ("tokens", "remaining", "expires_at", "retry_after", "size", "window")
+
+    def __init__(
+        self,
+        tokens: int,
+        remaining: int,
+        expires_at: float,
+        retry_after: int = 0,
+        size: int = 1,
+        window: int = 0
+    ):
+        self.tokens = tokens
+        self.remaining = remaining
+        self.expires_at = expires_at
+        self.retry_after = retry_after
+        self.size = size  # tokens granted by the reservation
+        self.window = window  # window index the tokens were charged to
+
+
+class LocalWindow:
+    """In-process sliding window counters (fallback when Redis is down)"""
+
+    def __init__(self):
+        # key -> [window index, previous count, current count, window ms]
+        self._counters: Dict[str, list] = {}
+
+    def take(self, key: str, limit: int, window_ms: int, wanted: int, now_ms: int) -> Tuple[int, int, int]:
+        index, elapsed = divmod(now_ms, window_ms)
+        counter = self._counters.get(key)
+        if counter is None or counter[0] < index - 1:
+            counter = [index, 0, 0, window_ms]
+        elif counter[0] == index - 1:
+            counter = [index, counter[2], 0, window_ms]
+        self._counters[key] = counter
+
+        used = counter[1] * (window_ms - elapsed) / window_ms + counter[2]
+        available = math.floor(limit - used)
+        granted = max(0, min(wanted, available))
+        counter[2] += granted
+        return granted, max(0, available - granted), window_ms - elapsed
+
+    def refund(self, key: str, window: int, tokens: int):
+        """Give back unspent tokens charged to window index ``window``"""
+        counter = self._counters.get(key)
+        if counter is None:
+            return
+        if counter[0] == window:
+            counter[2] = max(0, counter[2] - tokens)
+        elif counter[0] == window + 1:
+            counter[1] = max(0, counter[1] - tokens)
+
+    def prune(self, now_ms: int):
+        """Drop counters whose windows no longer overlap the present"""
+        for key in [k for k, c in self._counters.items() if c[0] < now_ms // c[3] - 1]:
+            del self._counters[key]
+
+
+class SlidingWindowLimiter:
+    """Redis sliding-window limiter with a local token lease per key"""
+
+    def __init__(
+        self,
+        prefix: str = "rl",
+        lease_size: Optional[int] = None,
+        lease_ms: Optional[int] = None,
+        client=None
+    ):
+        self.prefix = prefix
+        self.lease_size = lease_size or settings.rate_limit_lease_size
+        self.lease_ttl = (lease_ms or settings.rate_limit_lease_ms) / 1000
+        self._client = client
+        self._script = None
+        self._leases: Dict[str, _Lease] = {}
+        self.local = LocalWindow()
+        self._retry_at = 0.0
+        self._degraded = False
+        self.redis_calls = 0
+        self.fallbacks = 0
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        """Count one request against ``limit`` per ``window`` seconds"""
+        now = time.monotonic()
+        max_size = max(1, min(self.lease_size, limit // 20))
+        lease = self._leases.get(key)
+        refund = None
+        if lease is not None and lease.expires_at > now:
+            if lease.tokens > 0:
+                lease.tokens -= 1
+                return RateLimitResult(True, limit, lease.remaining + lease.tokens)
+            if lease.retry_after:
+                return RateLimitResult(False, limit, 0, lease.retry_after)
+            # Used up before it expired: demand is high, reserve more
+            wanted = min(lease.size * 2, max_size)
+        else:
+            # No recent demand: charge just this request
+            wanted = 1
+            if lease is not None and lease.tokens > 0:
+                refund = (lease.window, lease.tokens)
+
+        granted, remaining, reset_ms, index = await self._reserve(key, limit, window * 1000, wanted, refund)
+
+        if len(self._leases) > 10000:
+            self._prune(now)
+
+        if granted == 0:
+            retry_after = max(1, math.ceil(reset_ms / 1000))
+            # Cache the denial so a flood does not hit Redis per request
+            self._leases[key] = _Lease(0, 0, now + min(self.lease_ttl, retry_after), retry_after)
+            return RateLimitResult(False, limit, 0, retry_after)
+
+        self._leases[key] = _Lease(granted - 1, remaining, now + self.lease_ttl, size=granted, window=index)
+        return RateLimitResult(True, limit, remaining + granted - 1)
+
+    async def _reserve(
+        self,
+        key: str,
+        limit: int,
+        window_ms: int,
+        wanted: int,
+        refund: Optional[Tuple[int, int]] = None
+    ) -> Tuple[int, int, int, int]:
+        """Take up to ``wanted`` tokens, returning (granted, left, reset ms, window index)"""
+        now_ms = int(time.time() * 1000)
+        index = now_ms // window_ms
+        refund_window, refund_tokens = refund or (index, 0)
+        if time.monotonic() >= self._retry_at:
+            try:
+                script = await self._get_script()
+                redis_key = f"{self.prefix}:{key}"
+                self.redis_calls += 1
+                granted, remaining, reset_ms = await script(
+                    keys=[f"{redis_key}:{index}", f"{redis_key}:{index - 1}", f"{redis_key}:{refund_window}"],
+                    args=[limit, window_ms, now_ms, wanted, refund_tokens]
+                )
+                self._degraded = False
+                return int(granted), int(remaining), int(reset_ms), index
+            except Exception as e:
+                if not self._degraded:
+                    logger.warning(f"Rate limiter falling back to per-process limits: {e}")
+                self._degraded = True
+                self._retry_at = time.monotonic() + RECONNECT_INTERVAL
+                self._script = None
+        self.fallbacks += 1
+        if refund_tokens:
+            self.local.refund(key, refund_window, refund_tokens)
+        return (*self.local.take(key, limit, window_ms, wanted, now_ms), index)
+
+    async def _get_script(self):
+        if self._script is None:
+            client = self._client
+            if client is None:
+                from mongodb.api.services.redis_service import RedisService
+                client = RedisService.get_client()
+            self._script = client.register_script(SLIDING_WINDOW_LUA)
+        return self._script
+
+    def _prune(self, now: float):
+        for key in [k for k, lease in self._leases.items() if lease.expires_at <= now]:
+            del self._leases[key]
+        self.local.prune(int(time.time() * 1000))
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local" if time.monotonic() < self._retry_at else "redis",
+            "leases": len(self._leases),
+            "redis_calls": self.redis_calls,
+            "fallbacks": self.fallbacks
+        }
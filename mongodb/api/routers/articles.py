@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
 from typing import List, Optional, Dict, Any
 from mongodb.api.services.articles_service import ArticlesService
+from mongodb.api.services.cache_service import cached_endpoint, CACHE_CONFIG, TAG_ARTICLES
 from mongodb.api.schemas.article import ArticleResponse, ArticleFilter
 
 router = APIRouter()
@@ -28,7 +29,9 @@ async def get_latest_articles(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=Dict[str, Any])
+@cached_endpoint("articles_list", ttl=CACHE_CONFIG["tagged"], tags=[TAG_ARTICLES])
 async def get_articles(
+    request: Request,
     limit: int = Query(20, ge=1, le=500),
     skip: int = Query(0, ge=0),
     page: int = Query(1, ge=1),
@@ -37,21 +40,26 @@ async def get_articles(
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
     region: Optional[str] = None,
+    province: Optional[str] = Query(None, description="Province mentioned, any spelling (\"tp.hcm\", \"Hue\")"),
     disaster_type: Optional[str] = None,
     severity: Optional[str] = None,
     source: Optional[str] = None,
     search: Optional[str] = None,
+    collapse: bool = Query(False, description="One article per near-duplicate story"),
     service: ArticlesService = Depends(get_articles_service)
 ):
     """
     Get articles with various filters for the dashboard and analytics.
     Returns paginated response with articles array and metadata.
+    Cached per query string until the next article write.
+    With ``collapse`` each story is listed once, with its ``story_size``.
     """
     try:
         filters = ArticleFilter(
             from_date=from_date,
             to_date=to_date,
             region=region,
+            province=province,
             disaster_type=disaster_type,
             severity=severity,
             source=source
@@ -66,11 +74,12 @@ async def get_articles(
             skip=actual_skip,
             sort_by=sort_by,
             sort_order=sort_order,
-            search=search
+            search=search,
+            collapse=collapse
         )
         
         # Get total count for pagination
-        total = await service.get_total_count(filters=filters, search=search)
+        total = await service.get_total_count(filters=filters, search=search, collapse=collapse)
         
         return {
             "articles": articles,
@@ -8,10 +8,12 @@ from datetime import timedelta
 from mongodb.api.auth.jwt_auth import (
     Token,
     UserCreate,
+    UserUpdate,
     UserResponse,
     LoginRequest,
     authenticate_user,
     create_user,
+    update_user,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -158,6 +160,42 @@ async def get_me(current_user: Dict[str, Any] = Depends(get_current_active_user)
     )
 
 
+@router.patch("/users/{username}", response_model=UserResponse)
+async def update_user_account(
+    username: str,
+    updates: UserUpdate,
+    admin: Dict[str, Any] = Depends(require_admin)
+):
+    """
+    Update a user's role or active status (admin only).
+    
+    Takes effect immediately on every worker - cached principals are
+    invalidated over Redis.
+    """
+    if updates.role is not None and updates.role not in ("user", "admin", "crawler"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid role"
+        )
+    
+    user = await update_user(username, updates)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return UserResponse(
+        id=str(user["_id"]),
+        username=user["username"],
+        email=user.get("email"),
+        full_name=user.get("full_name"),
+        role=user["role"],
+        is_active=user["is_active"],
+        created_at=user["created_at"]
+    )
+
+
 @router.post("/logout")
 async def logout(current_user: Dict[str, Any] = Depends(get_current_active_user)):
     """
@@ -7,19 +7,29 @@ Endpoints:
 - POST /crawl/all - Crawl từ tất cả nguồn
 - GET /crawl/sources - Danh sách nguồn RSS
 - GET /crawl/status - Trạng thái crawl gần nhất
+- GET /crawl/sweeps/{sweep_id} - Tiến độ một lượt crawl
+- GET /crawl/schedule - Lịch crawl thích ứng của từng feed
+
+Crawls run as sweeps in the shared crawl queue: the units (feeds,
+keywords) are split between this process and any crawl-worker replicas,
+and the status is read back from the queue, so it is the same on every
+API worker.
 """
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime
 from pydantic import BaseModel
+import uuid
 
 from mongodb.api.services.crawl_service import (
     CrawlService, 
-    DailyCrawlService,
     DIRECT_RSS_SOURCES,
-    DISASTER_SEARCH_KEYWORDS
+    DISASTER_SEARCH_KEYWORDS,
+    direct_feeds
 )
+from mongodb.api.services.crawl_queue import CrawlWorker, crawl_queue, sweep_units
+from mongodb.api.services.crawl_scheduler import adaptive_scheduler
 from mongodb.api.config.database import Database
 
 import logging
@@ -27,13 +37,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/crawl", tags=["crawl"])
 
-# Store crawl status in memory
-_crawl_status = {
-    "is_running": False,
-    "last_run": None,
-    "last_result": None
-}
-
 
 # =====================================================
 # SCHEMAS
@@ -68,83 +71,32 @@ class SourcesResponse(BaseModel):
 # BACKGROUND TASKS
 # =====================================================
 
-async def _run_google_news_crawl(max_keywords: int = 5):
-    """Background task for Google News crawl"""
-    global _crawl_status
-    _crawl_status["is_running"] = True
-    _crawl_status["last_run"] = datetime.now().isoformat()
-    
-    try:
-        service = CrawlService()
-        result = await service.crawl_google_news(max_keywords=max_keywords)
-        _crawl_status["last_result"] = {
-            "type": "google_news",
-            **result,
-            "completed_at": datetime.now().isoformat()
-        }
-        logger.info(f"Google News crawl completed: {result}")
-    except Exception as e:
-        _crawl_status["last_result"] = {
-            "type": "google_news",
-            "error": str(e),
-            "completed_at": datetime.now().isoformat()
-        }
-        logger.error(f"Google News crawl failed: {e}")
-    finally:
-        _crawl_status["is_running"] = False
-
-
-async def _run_direct_sources_crawl(sources: Optional[List[str]] = None):
-    """Background task for direct sources crawl"""
-    global _crawl_status
-    _crawl_status["is_running"] = True
-    _crawl_status["last_run"] = datetime.now().isoformat()
+async def _start_sweep(
+    background_tasks: BackgroundTasks,
+    kind: str,
+    keywords: Sequence[str] = (),
+    feeds: Sequence[Tuple[str, str]] = ()
+) -> str:
+    """Enqueue a sweep and help crawl it in the background (409 if one is running)"""
+    if await crawl_queue.running_sweeps():
+        raise HTTPException(
+            status_code=409,
+            detail="Crawl đang chạy. Vui lòng đợi hoàn thành."
+        )
     
-    try:
-        service = CrawlService()
-        result = await service.crawl_direct_sources(sources=sources)
-        _crawl_status["last_result"] = {
-            "type": "direct_sources",
-            "sources": sources or list(DIRECT_RSS_SOURCES.keys()),
-            **result,
-            "completed_at": datetime.now().isoformat()
-        }
-        logger.info(f"Direct sources crawl completed: {result}")
-    except Exception as e:
-        _crawl_status["last_result"] = {
-            "type": "direct_sources",
-            "error": str(e),
-            "completed_at": datetime.now().isoformat()
-        }
-        logger.error(f"Direct sources crawl failed: {e}")
-    finally:
-        _crawl_status["is_running"] = False
+    sweep_id = f"{kind}-{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+    await crawl_queue.enqueue(sweep_id, kind, sweep_units(sweep_id, keywords=keywords, feeds=feeds))
+    background_tasks.add_task(_drain_sweep, sweep_id)
+    return sweep_id
 
 
-async def _run_full_crawl():
-    """Background task for full crawl"""
-    global _crawl_status
-    _crawl_status["is_running"] = True
-    _crawl_status["last_run"] = datetime.now().isoformat()
-    
+async def _drain_sweep(sweep_id: str):
+    """Background task: crawl units of the sweep until none is left to claim"""
     try:
-        service = CrawlService()
-        result = await service.crawl_all()
-        _crawl_status["last_result"] = {
-            "type": "full_crawl",
-            **result,
-            "completed_at": datetime.now().isoformat()
-        }
-        logger.info(f"Full crawl completed: {result}")
+        done = await CrawlWorker().drain(sweep_id)
+        logger.info(f"Crawled {done} units of {sweep_id} in this process")
     except Exception as e:
-        _crawl_status["last_result"] = {
-            "type": "full_crawl",
-            "error": str(e),
-            "completed_at": datetime.now().isoformat()
-        }
-        logger.error(f"Full crawl failed: {e}")
-    finally:
-        _crawl_status["is_running"] = False
+        logger.error(f"Crawl sweep {sweep_id} failed: {e}")
 
 
 # =====================================================
@@ -175,15 +127,41 @@ async def get_sources():
 @router.get("/status", response_model=CrawlStatsResponse)
 async def get_status():
     """
-    Lấy trạng thái crawl hiện tại
+    Lấy trạng thái crawl hiện tại (tổng hợp từ hàng đợi, chung cho mọi worker)
     """
+    running = await crawl_queue.running_sweeps()
+    sweep_id = await crawl_queue.latest_sweep_id()
+    last = await crawl_queue.sweep_status(sweep_id) if sweep_id else None
     return CrawlStatsResponse(
-        is_running=_crawl_status["is_running"],
-        last_run=_crawl_status["last_run"],
-        last_result=_crawl_status["last_result"]
+        is_running=bool(running),
+        last_run=last["created_at"].isoformat() if last and last.get("created_at") else None,
+        last_result=last
     )
 
 
+@router.get("/sweeps/{sweep_id}")
+async def get_sweep(sweep_id: str):
+    """
+    Tiến độ một lượt crawl: số đơn vị theo trạng thái và thống kê đã crawl
+    """
+    status = await crawl_queue.sweep_status(sweep_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Không tìm thấy lượt crawl {sweep_id}")
+    return status
+
+
+@router.get("/schedule")
+async def get_schedule():
+    """
+    Lịch crawl thích ứng: tốc độ đăng bài ước lượng và lần crawl kế tiếp của từng feed
+    """
+    schedules = await adaptive_scheduler.get_schedules()
+    return {
+        "feeds": schedules,
+        "count": len(schedules)
+    }
+
+
 @router.post("/google-news", response_model=CrawlResponse)
 async def crawl_google_news(
     background_tasks: BackgroundTasks,
@@ -194,18 +172,15 @@ async def crawl_google_news(
     
     - **max_keywords**: Số từ khóa tối đa để tìm kiếm (mặc định: 5)
     """
-    if _crawl_status["is_running"]:
-        raise HTTPException(
-            status_code=409,
-            detail="Crawl đang chạy. Vui lòng đợi hoàn thành."
-        )
-    
-    background_tasks.add_task(_run_google_news_crawl, max_keywords)
+    sweep_id = await _start_sweep(
+        background_tasks, "google_news", keywords=DISASTER_SEARCH_KEYWORDS[:max_keywords]
+    )
     
     return CrawlResponse(
         success=True,
         message=f"Đã bắt đầu crawl Google News với {max_keywords} từ khóa",
-        started_at=datetime.now().isoformat()
+        started_at=datetime.now().isoformat(),
+        task_id=sweep_id
     )
 
 
@@ -219,12 +194,6 @@ async def crawl_direct_sources(
     
     - **sources**: Danh sách key nguồn (nếu None, crawl tất cả)
     """
-    if _crawl_status["is_running"]:
-        raise HTTPException(
-            status_code=409,
-            detail="Crawl đang chạy. Vui lòng đợi hoàn thành."
-        )
-    
     # Validate sources
     if sources:
         invalid = [s for s in sources if s not in DIRECT_RSS_SOURCES]
@@ -234,13 +203,14 @@ async def crawl_direct_sources(
                 detail=f"Nguồn không hợp lệ: {invalid}. Nguồn hợp lệ: {list(DIRECT_RSS_SOURCES.keys())}"
             )
     
-    background_tasks.add_task(_run_direct_sources_crawl, sources)
+    sweep_id = await _start_sweep(background_tasks, "direct_sources", feeds=direct_feeds(sources))
     
     source_count = len(sources) if sources else len(DIRECT_RSS_SOURCES)
     return CrawlResponse(
         success=True,
         message=f"Đã bắt đầu crawl từ {source_count} nguồn RSS",
-        started_at=datetime.now().isoformat()
+        started_at=datetime.now().isoformat(),
+        task_id=sweep_id
     )
 
 
@@ -249,20 +219,18 @@ async def crawl_all(background_tasks: BackgroundTasks):
     """
     Bắt đầu crawl từ TẤT CẢ nguồn (Google News + Direct RSS)
     
-    Đây là full crawl, có thể mất 5-10 phút.
+    Đây là full crawl, có thể mất 5-10 phút (chia cho các crawl-worker).
     """
-    if _crawl_status["is_running"]:
-        raise HTTPException(
-            status_code=409,
-            detail="Crawl đang chạy. Vui lòng đợi hoàn thành."
-        )
-    
-    background_tasks.add_task(_run_full_crawl)
+    sweep_id = await _start_sweep(
+        background_tasks, "full_crawl",
+        keywords=DISASTER_SEARCH_KEYWORDS[:10], feeds=direct_feeds()
+    )
     
     return CrawlResponse(
         success=True,
         message="Đã bắt đầu full crawl từ tất cả nguồn",
-        started_at=datetime.now().isoformat()
+        started_at=datetime.now().isoformat(),
+        task_id=sweep_id
     )
 
 
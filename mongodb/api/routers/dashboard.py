@@ -1,104 +1,136 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from datetime import datetime
 from mongodb.api.services.stats_service import StatsUpdateService
-from mongodb.api.services.cache_service import cached, get_cache_service
-from mongodb.api.schemas.dashboard import DashboardOverview, SeverityBreakdown, DisasterTypeDistribution, CrawlActivityTimeline
+from mongodb.api.services.event_service import event_service
+from mongodb.api.services.cache_service import (
+    cached, get_cache_service, to_cacheable, CacheSpec,
+    CACHE_CONFIG, TAG_ARTICLES
+)
+from mongodb.api.schemas.dashboard import (
+    DashboardOverview, SeverityBreakdown, DisasterTypeDistribution,
+    CrawlActivityTimeline, DashboardSummary, EventSummary, EventDetail
+)
 
 router = APIRouter()
 
 
+async def _load_overview():
+    return to_cacheable(await StatsUpdateService().get_dashboard_overview())
+
+
+async def _load_severity():
+    return to_cacheable(await StatsUpdateService().get_severity_breakdown())
+
+
+async def _load_disaster_types():
+    return to_cacheable(await StatsUpdateService().get_disaster_type_distribution())
+
+
+async def _load_crawl_timeline():
+    return to_cacheable(await StatsUpdateService().get_crawl_activity_timeline())
+
+
+# Cache keys are single-flight and stale-while-revalidate (see CacheService.get_or_set),
+# so an expiring key triggers one recompute instead of a count_documents storm.
+# Article-derived panels are tagged: article writes bump the tag generation, so
+# they can use the long "tagged" TTL and still never serve pre-write data.
+TAGGED_TTL = CACHE_CONFIG["tagged"]
+
+
+def _overview_spec() -> CacheSpec:
+    # today_articles depends on the date, so the key rolls over at midnight
+    return CacheSpec(
+        f"dashboard:overview:{datetime.now().strftime('%Y-%m-%d')}", _load_overview,
+        ttl=TAGGED_TTL, tags=[TAG_ARTICLES]
+    )
+
+
+def _severity_spec() -> CacheSpec:
+    return CacheSpec("dashboard:severity", _load_severity, ttl=TAGGED_TTL, tags=[TAG_ARTICLES])
+
+
+def _disaster_types_spec() -> CacheSpec:
+    return CacheSpec("dashboard:disaster_types", _load_disaster_types, ttl=TAGGED_TTL, tags=[TAG_ARTICLES])
+
+
+def _crawl_timeline_spec() -> CacheSpec:
+    return CacheSpec("dashboard:crawl_timeline", _load_crawl_timeline, ttl=120)
+
+
+async def _resolve(spec: CacheSpec):
+    return await get_cache_service().get_or_set(
+        spec.key, spec.loader, ttl=spec.ttl, stale_ttl=spec.stale_ttl, tags=spec.tags
+    )
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_dashboard_summary():
+    """Get every dashboard panel in one request - one cache round trip"""
+    cache = get_cache_service()
+    overview, severity, disaster_types, timeline = await cache.get_many([
+        _overview_spec(), _severity_spec(), _disaster_types_spec(), _crawl_timeline_spec()
+    ])
+    return DashboardSummary(
+        overview=DashboardOverview(**overview),
+        severity=SeverityBreakdown(**severity),
+        disaster_types=DisasterTypeDistribution(**disaster_types),
+        crawl_timeline=[CrawlActivityTimeline(**item) for item in timeline]
+    )
+
+
 @router.get("/overview", response_model=DashboardOverview)
 async def get_dashboard_overview():
-    """Get dashboard overview stats - cached for 5 minutes"""
-    cache = get_cache_service()
-    cache_key = "dashboard:overview"
-    
-    # Try cache first
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return DashboardOverview(**cached_data)
-    
-    # Get from service
-    stats_service = StatsUpdateService()
-    overview = await stats_service.get_dashboard_overview()
-    
-    # Cache the result
-    if hasattr(overview, 'model_dump'):
-        await cache.set(cache_key, overview.model_dump(), ttl=300)
-    elif hasattr(overview, 'dict'):
-        await cache.set(cache_key, overview.dict(), ttl=300)
-    
-    return overview
+    """Get dashboard overview stats - cached until articles change"""
+    return DashboardOverview(**await _resolve(_overview_spec()))
 
 
 @router.get("/severity", response_model=SeverityBreakdown)
 async def get_severity_breakdown():
-    """Get severity breakdown - cached for 5 minutes"""
-    cache = get_cache_service()
-    cache_key = "dashboard:severity"
-    
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return SeverityBreakdown(**cached_data)
-    
-    stats_service = StatsUpdateService()
-    severity_data = await stats_service.get_severity_breakdown()
-    
-    if hasattr(severity_data, 'model_dump'):
-        await cache.set(cache_key, severity_data.model_dump(), ttl=300)
-    elif hasattr(severity_data, 'dict'):
-        await cache.set(cache_key, severity_data.dict(), ttl=300)
-    
-    return severity_data
+    """Get severity breakdown - cached until articles change"""
+    return SeverityBreakdown(**await _resolve(_severity_spec()))
 
 
 @router.get("/disaster-types", response_model=DisasterTypeDistribution)
 async def get_disaster_type_distribution():
-    """Get disaster type distribution - cached for 5 minutes"""
-    cache = get_cache_service()
-    cache_key = "dashboard:disaster_types"
-    
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return DisasterTypeDistribution(**cached_data)
-    
-    stats_service = StatsUpdateService()
-    distribution = await stats_service.get_disaster_type_distribution()
-    
-    if hasattr(distribution, 'model_dump'):
-        await cache.set(cache_key, distribution.model_dump(), ttl=300)
-    elif hasattr(distribution, 'dict'):
-        await cache.set(cache_key, distribution.dict(), ttl=300)
-    
-    return distribution
+    """Get disaster type distribution - cached until articles change"""
+    return DisasterTypeDistribution(**await _resolve(_disaster_types_spec()))
 
 
 @router.get("/crawl-timeline", response_model=List[CrawlActivityTimeline])
 async def get_crawl_activity_timeline():
     """Get crawl timeline - cached for 2 minutes"""
-    cache = get_cache_service()
-    cache_key = "dashboard:crawl_timeline"
-    
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        return [CrawlActivityTimeline(**item) for item in cached_data]
-    
-    stats_service = StatsUpdateService()
-    timeline = await stats_service.get_crawl_activity_timeline()
-    
-    # Cache list of models
-    timeline_data = []
-    for item in timeline:
-        if hasattr(item, 'model_dump'):
-            timeline_data.append(item.model_dump())
-        elif hasattr(item, 'dict'):
-            timeline_data.append(item.dict())
-        else:
-            timeline_data.append(item)
-    
-    await cache.set(cache_key, timeline_data, ttl=120)
-    
-    return timeline
+    data = await _resolve(_crawl_timeline_spec())
+    return [CrawlActivityTimeline(**item) for item in data]
+
+
+@router.get("/events", response_model=List[EventSummary])
+async def get_events(
+    disaster_type: Optional[str] = None,
+    region: Optional[str] = None,
+    province: Optional[str] = None,
+    since_hours: Optional[int] = Query(None, ge=1, le=24 * 90),
+    limit: int = Query(50, ge=1, le=200)
+):
+    """Get disaster events, most recently active first - cached until articles change"""
+    async def load():
+        return to_cacheable(await event_service.get_events(disaster_type, region, since_hours, limit, province=province))
+
+    # Events are only written together with articles, so the article tag covers them
+    spec = CacheSpec(
+        f"dashboard:events:{disaster_type}:{region}:{province}:{since_hours}:{limit}", load,
+        ttl=TAGGED_TTL, tags=[TAG_ARTICLES]
+    )
+    return [EventSummary(**item) for item in await _resolve(spec)]
+
+
+@router.get("/events/{event_id}", response_model=EventDetail)
+async def get_event(event_id: str):
+    """Get one event with its latest articles"""
+    event = await event_service.get_event(event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return EventDetail(**event)
 
 
 @router.delete("/cache")
@@ -106,4 +138,4 @@ async def clear_dashboard_cache():
     """Clear all dashboard cache"""
     cache = get_cache_service()
     count = await cache.delete_pattern("dashboard:*")
-    return {"cleared": count, "message": "Dashboard cache cleared"}
\ No newline at end of file
+    return {"cleared": count, "message": "Dashboard cache cleared"}
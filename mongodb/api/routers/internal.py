@@ -7,16 +7,27 @@ Endpoints:
 - POST /internal/ingest - Nhập bài báo vào pipeline
 - POST /internal/ingest/batch - Nhập batch bài báo
 - GET /internal/pipeline/stats - Thống kê pipeline
+- POST /internal/import/json - Nhập file JSON / NDJSON theo luồng
+- POST /internal/reclassify - Phân loại lại toàn bộ bài báo (chạy nền)
+- GET /internal/reclassify - Tiến độ phân loại lại
 """
 
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Body
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import logging
 
 from mongodb.api.services.crawl_service import DailyCrawlService
 from mongodb.api.services.classification_service import ClassificationService
 from mongodb.api.services.pipeline_service import PipelineService
+from mongodb.api.services.cache_service import invalidate_tags, ARTICLE_WRITE_TAGS
+from mongodb.api.services.json_import import (
+    DEFAULT_BATCH_SIZE, ImportFormatError, ImportStats, JsonImporter, service_classifier
+)
+from mongodb.api.services.reclassify_service import JOB_RUNNING, reclassify_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -69,6 +80,8 @@ async def trigger_crawl(source: str, mode: str = "full"):
             "result": result,
             "timestamp": datetime.now().isoformat()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -254,17 +267,21 @@ async def test_classification(
 
 @router.post("/import/json")
 async def import_from_json(
-    file_path: str = Body(..., embed=True, description="Path to JSON file"),
-    classify: bool = Body(True, embed=True, description="Run NLP classification")
+    file_path: str = Body(..., embed=True, description="Path to JSON or NDJSON file"),
+    classify: bool = Body(True, embed=True, description="Run NLP classification"),
+    batch_size: int = Body(DEFAULT_BATCH_SIZE, embed=True, ge=1, le=10000, description="Articles per bulk write")
 ):
     """
-    Import articles from a JSON file into MongoDB
+    Import articles from a JSON array or NDJSON file into MongoDB
+    
+    The file is streamed: articles are classified and upserted by URL one
+    batch at a time, so archives of any size import in constant memory.
     
     Args:
         file_path: Path to JSON file (relative or absolute)
         classify: Whether to run NLP classification
+        batch_size: Articles per classification batch and bulk write
     """
-    import json
     import os
     from mongodb.api.config.database import get_database
     
@@ -286,67 +303,103 @@ async def import_from_json(
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
         
-        # Load JSON
-        with open(file_path, 'r', encoding='utf-8') as f:
-            articles = json.load(f)
-        
-        if not isinstance(articles, list):
-            articles = [articles]
+        db = await get_database()
         
-        db = get_database()
-        collection = db.articles
-        
-        # Process each article
-        processed = 0
-        skipped = 0
-        classifier = ClassificationService() if classify else None
+        def report(stats: ImportStats):
+            logger.info(
+                f"Import {file_path}: {stats.read} read, {stats.inserted} inserted, "
+                f"{stats.duplicates} duplicates, {stats.failed} failed ({stats.rate:.0f} docs/s)"
+            )
         
-        for article in articles:
-            try:
-                # Skip if already exists
-                if collection.find_one({"url": article.get("url")}):
-                    skipped += 1
-                    continue
-                
-                # Run classification if enabled
-                if classifier:
-                    title = article.get("title", "")
-                    content = article.get("text") or article.get("summary") or ""
-                    
-                    if title or content:
-                        result = await classifier.classify_article(title, content)
-                        article["is_disaster"] = result.is_disaster
-                        article["disaster_type"] = result.disaster_type
-                        article["severity"] = result.severity
-                        article["confidence"] = result.confidence
-                        article["region"] = result.region
-                        article["matched_keywords"] = result.matched_keywords
-                    else:
-                        article["is_disaster"] = False
-                
-                # Insert into MongoDB
-                collection.insert_one(article)
-                processed += 1
-                
-            except Exception as e:
-                print(f"Error processing article: {e}")
-                continue
+        importer = JsonImporter(
+            db.articles,
+            classify=service_classifier() if classify else None,
+            batch_size=batch_size,
+            on_progress=report
+        )
+        try:
+            stats = await importer.import_file(file_path)
+        finally:
+            # Also after a format error part-way through the file
+            if importer.stats and importer.stats.inserted:
+                await invalidate_tags(*ARTICLE_WRITE_TAGS)
         
         return {
             "success": True,
-            "message": f"Imported {processed} articles from {file_path}",
-            "stats": {
-                "total_in_file": len(articles),
-                "processed": processed,
-                "skipped_duplicates": skipped,
-                "failed": len(articles) - processed - skipped
-            },
+            "message": f"Imported {stats.inserted} articles from {file_path}",
+            "stats": stats.to_dict(),
             "classification_enabled": classify,
             "timestamp": datetime.now().isoformat()
         }
         
     except HTTPException:
         raise
+    except ImportFormatError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _run_reclassify(restart: bool):
+    try:
+        await reclassify_service.run(restart=restart)
+    except Exception as e:
+        logger.error(f"Reclassification task failed: {e}")
+
+
+@router.post("/reclassify")
+async def start_reclassify(
+    background_tasks: BackgroundTasks,
+    restart: bool = Body(False, embed=True, description="Start over instead of resuming from the checkpoint")
+):
+    """
+    Phân loại lại các bài báo đã lưu bằng bộ phân loại hiện tại
+    
+    Runs in the background and resumes from its checkpoint (a paused or
+    interrupted job continues where it stopped).
+    """
+    try:
+        job = await reclassify_service.status()
+        if job and job["state"] == JOB_RUNNING and job["lease_expires_at"] > datetime.utcnow():
+            raise HTTPException(status_code=409, detail="Reclassification is already running")
+        
+        background_tasks.add_task(_run_reclassify, restart)
+        return {
+            "success": True,
+            "message": "Reclassification started in background",
+            "restart": restart,
+            "job": job,
+            "timestamp": datetime.now().isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/reclassify")
+async def get_reclassify_status():
+    """Tiến độ phân loại lại (checkpoint, số bài đã quét / đã đổi nhãn)"""
+    try:
+        return {
+            "success": True,
+            "job": await reclassify_service.status(),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reclassify/pause")
+async def pause_reclassify():
+    """Dừng phân loại lại sau lô hiện tại (POST /reclassify để tiếp tục)"""
+    try:
+        paused = await reclassify_service.pause()
+        return {
+            "success": paused,
+            "message": "Reclassification paused" if paused else "No reclassification is running",
+            "timestamp": datetime.now().isoformat()
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
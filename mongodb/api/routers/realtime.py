@@ -4,25 +4,32 @@ Realtime Router - WebSocket endpoints cho disaster feed realtime
 Endpoints:
 - GET /realtime/ - Test page cho WebSocket
 - WS /realtime/ws/disasters - WebSocket feed thiên tai
+- GET /realtime/stream - Server-Sent Events feed (chỉ đọc)
 - GET /realtime/status - Trạng thái kết nối
 - GET /realtime/recent - Bài báo thiên tai gần đây
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from fastapi.responses import HTMLResponse
-from typing import List, Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Header
+from fastapi.responses import HTMLResponse, StreamingResponse
+from typing import Optional
 from datetime import datetime, timedelta
-import asyncio
 import json
+import logging
 
 from mongodb.api.services.websocket_service import WebSocketService, websocket_manager
+from mongodb.api.websockets.hub import StreamClient
 from mongodb.api.config.database import Database
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # WebSocket service uses global manager, so single instance is fine
 websocket_service = WebSocketService()
 
+# EventSource reconnect delay sent to SSE clients (ms)
+SSE_RETRY_MS = 3000
+
 
 @router.get("/", response_class=HTMLResponse)
 async def get_realtime_page():
@@ -61,9 +68,26 @@ async def get_realtime_page():
             <script>
                 const statusEl = document.getElementById('status');
                 const messagesEl = document.getElementById('messages');
+                let lastSeq = null;
+                
+                function addDisaster(data) {
+                    const li = document.createElement('li');
+                    li.className = 'severity-' + data.severity;
+                    li.innerHTML = `
+                        <strong>${data.title}</strong><br>
+                        <span class="meta">
+                            🏷️ ${data.disaster_type} | 
+                            ⚠️ ${data.severity} | 
+                            📍 ${data.region || 'Unknown'} | 
+                            📰 ${data.source}
+                        </span>
+                    `;
+                    messagesEl.insertBefore(li, messagesEl.firstChild);
+                }
                 
                 function connect() {
-                    const ws = new WebSocket("ws://localhost:8000/realtime/ws/disasters");
+                    const query = lastSeq !== null ? '?last_seq=' + lastSeq : '';
+                    const ws = new WebSocket("ws://localhost:8000/realtime/ws/disasters" + query);
                     
                     ws.onopen = function() {
                         statusEl.textContent = '✅ Connected';
@@ -72,20 +96,15 @@ async def get_realtime_page():
                     
                     ws.onmessage = function(event) {
                         const message = JSON.parse(event.data);
+                        // Only sequenced events advance the resume point
+                        // (connected carries the head as head_seq)
+                        if (message.event && typeof message.seq === 'number') {
+                            lastSeq = Math.max(lastSeq ?? 0, message.seq);
+                        }
                         if (message.type === 'new_disaster') {
-                            const data = message.data;
-                            const li = document.createElement('li');
-                            li.className = 'severity-' + data.severity;
-                            li.innerHTML = `
-                                <strong>${data.title}</strong><br>
-                                <span class="meta">
-                                    🏷️ ${data.disaster_type} | 
-                                    ⚠️ ${data.severity} | 
-                                    📍 ${data.region || 'Unknown'} | 
-                                    📰 ${data.source}
-                                </span>
-                            `;
-                            messagesEl.insertBefore(li, messagesEl.firstChild);
+                            addDisaster(message.data);
+                        } else if (message.type === 'new_disasters') {
+                            message.data.items.forEach(addDisaster);
                         }
                     };
                     
@@ -109,57 +128,131 @@ async def get_realtime_page():
 
 
 @router.websocket("/ws/disasters")
-async def realtime_disaster_feed(websocket: WebSocket):
+async def realtime_disaster_feed(websocket: WebSocket, last_seq: Optional[int] = Query(None)):
     """
     WebSocket endpoint cho disaster feed realtime
     
     Client kết nối và nhận:
     - new_disaster: Bài báo thiên tai mới
-    - heartbeat: Ping mỗi 30s để giữ connection
+    - new_disasters: Nhiều bài gộp trong một khung (khi crawl dồn dập), kèm stats_delta
+    - heartbeat: Ping chung mỗi ws_heartbeat_interval giây để giữ connection
+    
+    Client có thể lọc feed theo khu vực / loại thiên tai / mức độ tối thiểu:
+    {"type": "subscribe", "topics": ["region:central", "disaster_type:flood", "severity:medium"]}
+    
+    Mỗi event có `seq` tăng dần; khi reconnect với `?last_seq=N` (hoặc gửi
+    {"type": "resume", "last_seq": N}) server gửi lại các event bị lỡ từ
+    buffer trong bộ nhớ, không cần query MongoDB.
     """
     await websocket_service.connect(websocket)
     
     try:
-        # Send initial connection message
-        await websocket.send_json({
+        # Send initial connection message (via the client's send queue so
+        # it never interleaves with broadcasts written by the writer task)
+        await websocket_manager.send_personal(websocket, {
             "type": "connected",
             "message": "Connected to disaster realtime feed",
+            "head_seq": websocket_manager.last_seq,
             "timestamp": datetime.now().isoformat()
         })
+        if last_seq is not None:
+            websocket_manager.replay(websocket, last_seq)
         
-        # Keep connection alive with heartbeat
+        # Heartbeats come from the hub's shared timer (no per-socket timeout)
         while True:
-            try:
-                # Wait for client message or timeout for heartbeat
-                data = await asyncio.wait_for(
-                    websocket.receive_text(),
-                    timeout=30.0
-                )
-                
-                # Handle client messages
-                if data == "ping":
-                    await websocket.send_json({"type": "pong"})
-                    
-            except asyncio.TimeoutError:
-                # Send heartbeat
-                await websocket.send_json({
-                    "type": "heartbeat",
-                    "timestamp": datetime.now().isoformat(),
-                    "connections": websocket_service.get_connection_count()
-                })
+            data = await websocket.receive_text()
+            websocket_manager.touch(websocket)
+            
+            # Handle client messages
+            if data == "ping":
+                await websocket_manager.send_personal(websocket, {"type": "pong"})
+            else:
+                await _handle_client_message(websocket, data)
                 
     except WebSocketDisconnect:
         websocket_service.disconnect(websocket)
     except Exception as e:
+        logger.error(f"WebSocket error: {e}")
         websocket_service.disconnect(websocket)
 
 
+@router.get("/stream")
+async def realtime_stream(
+    last_event_id: Optional[str] = Header(None),
+    last_seq: Optional[int] = Query(None, description="Resume after this seq (thay cho Last-Event-ID)"),
+    region: Optional[str] = Query(None, description="Khu vực, phân cách bằng dấu phẩy"),
+    disaster_type: Optional[str] = Query(None, description="Loại thiên tai, phân cách bằng dấu phẩy"),
+    min_severity: Optional[str] = Query(None, description="low / medium / high")
+):
+    """
+    Server-Sent Events feed - cùng hub với /ws/disasters
+    
+    Dành cho client chỉ đọc (màn hình treo tường, script tích hợp). Mỗi event
+    có `id` = seq, nên EventSource tự gửi Last-Event-ID khi reconnect và
+    nhận lại các event bị lỡ từ replay buffer.
+    """
+    filters = None
+    if region or disaster_type or min_severity:
+        filters = {
+            "regions": region.split(",") if region else None,
+            "disaster_types": disaster_type.split(",") if disaster_type else None,
+            "min_severity": min_severity
+        }
+    if last_seq is None and last_event_id and last_event_id.isdigit():
+        last_seq = int(last_event_id)
+    
+    async def event_stream():
+        client = StreamClient()
+        channel = websocket_manager.connect_stream(client, filters)
+        # Replay is queued before any live event since nothing awaits in between
+        if last_seq is not None:
+            websocket_manager.replay(client, last_seq)
+        try:
+            yield f"retry: {SSE_RETRY_MS}\nevent: connected\ndata: {json.dumps({'head_seq': websocket_manager.last_seq})}\n\n"
+            while True:
+                frame = await channel.queue.get()
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            websocket_manager.disconnect(client)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx: do not buffer the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+async def _handle_client_message(websocket: WebSocket, raw: str):
+    """Xử lý message JSON từ client (subscribe / unsubscribe)"""
+    try:
+        data = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return
+    if not isinstance(data, dict):
+        return
+    
+    if data.get("type") == "subscribe":
+        filters = websocket_manager.subscribe(websocket, data)
+        await websocket_manager.send_personal(websocket, {"type": "subscribed", "filters": filters})
+    elif data.get("type") == "unsubscribe":
+        filters = websocket_manager.unsubscribe(websocket)
+        await websocket_manager.send_personal(websocket, {"type": "unsubscribed", "filters": filters})
+    elif data.get("type") == "resume" and isinstance(data.get("last_seq"), int):
+        websocket_manager.replay(websocket, data["last_seq"])
+
+
 @router.get("/status")
 async def get_realtime_status():
     """Lấy trạng thái WebSocket connections"""
     return {
         "status": "running",
-        "active_connections": websocket_service.get_connection_count(),
+        **websocket_manager.status(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List
 from mongodb.api.models.source import Source
 from mongodb.api.schemas.source import SourceCreate, SourceUpdate
-from mongodb.api.services.sources_service import SourcesService
+from mongodb.api.services.sources_service import SourcesService, SourcesHealthService
 
 router = APIRouter()
 
@@ -12,6 +12,11 @@ def get_sources_service():
     return SourcesService()
 
 
+def get_sources_health_service():
+    """Dependency injection for SourcesHealthService"""
+    return SourcesHealthService()
+
+
 @router.get("/", response_model=List[Source])
 async def get_all_sources(service: SourcesService = Depends(get_sources_service)):
     """Retrieve all news sources"""
@@ -24,6 +29,24 @@ async def get_realtime_sources(service: SourcesService = Depends(get_sources_ser
     sources = await service.get_realtime_sources()
     return sources
 
+@router.get("/health", response_model=dict)
+async def get_sources_health(
+    hours: int = Query(24, ge=1, le=24 * 30, description="Summary window in hours"),
+    service: SourcesHealthService = Depends(get_sources_health_service)
+):
+    """Per-feed availability, latency and freshness from recent health checks"""
+    return await service.get_health_summary(hours)
+
+@router.post("/health/check", response_model=dict)
+async def run_sources_health_check(service: SourcesHealthService = Depends(get_sources_health_service)):
+    """Probe every feed of every active source now"""
+    return await service.check_all_sources()
+
+@router.get("/{source_id}/health", response_model=dict)
+async def get_source_health(source_id: str, service: SourcesService = Depends(get_sources_service)):
+    """Probe the feeds of one source"""
+    return await service.check_source_health(source_id)
+
 @router.post("/", response_model=Source)
 async def create_source(source: SourceCreate, service: SourcesService = Depends(get_sources_service)):
     """Create a new news source"""
@@ -10,6 +10,8 @@ class ArticleBase(BaseModel):
     disaster_type: Optional[str] = None
     severity: Optional[str] = None
     region: Optional[str] = None
+    provinces: List[str] = []
+    province: Optional[str] = None
 
 class ArticleCreate(ArticleBase):
     pass
@@ -37,6 +39,7 @@ class ArticleFilter(BaseModel):
     from_date: Optional[datetime] = None
     to_date: Optional[datetime] = None
     region: Optional[str] = None
+    province: Optional[str] = None
     disaster_type: Optional[str] = None
     severity: Optional[str] = None
     source: Optional[str] = None
\ No newline at end of file
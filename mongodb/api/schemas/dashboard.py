@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List, Dict, Optional
 
 class DashboardOverview(BaseModel):
@@ -31,4 +32,43 @@ class CrawlActivityTimeline(BaseModel):
     disaster_articles: int = 0
 
 class CrawlTimelineResponse(BaseModel):
-    timeline: List[CrawlActivityTimeline]
\ No newline at end of file
+    timeline: List[CrawlActivityTimeline]
+
+class DashboardSummary(BaseModel):
+    overview: DashboardOverview
+    severity: SeverityBreakdown
+    disaster_types: DisasterTypeDistribution
+    crawl_timeline: List[CrawlActivityTimeline]
+
+class EventSummary(BaseModel):
+    id: str = Field(alias="_id")
+    title: Optional[str] = None
+    disaster_type: Optional[str] = None
+    region: Optional[str] = None
+    provinces: List[str] = []
+    severity: str = "none"
+    article_count: int = 0
+    sources: List[str] = []
+    deaths: int = 0
+    missing: int = 0
+    injured: int = 0
+    houses_affected: int = 0
+    first_seen_at: Optional[datetime] = None
+    last_seen_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+
+class EventArticle(BaseModel):
+    id: str = Field(alias="_id")
+    title: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[str] = None
+    severity: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+
+class EventDetail(EventSummary):
+    articles: List[EventArticle] = []
@@ -6,11 +6,16 @@ from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 from mongodb.api.schemas.article import ArticleCreate, ArticleUpdate, ArticleFilter
 from mongodb.api.config.database import Database, get_articles_collection
+from mongodb.api.services.cache_service import invalidate_cache, ARTICLE_WRITE_TAGS
+from mongodb.api.services.gazetteer import gazetteer
 from bson import ObjectId
 import logging
 
 logger = logging.getLogger(__name__)
 
+# MinHash signatures are only used for near-duplicate matching
+_LIST_PROJECTION = {"story_signature": 0}
+
 
 class ArticlesService:
     """Service for article CRUD operations using async MongoDB"""
@@ -46,6 +51,9 @@ class ArticlesService:
                 })
             if filters.region:
                 query['region'] = {"$regex": filters.region, "$options": "i"}
+            if filters.province:
+                # Exact match on the multikey index, whatever spelling was asked for
+                query['provinces'] = gazetteer.resolve(filters.province) or filters.province
             if filters.disaster_type:
                 query['disaster_type'] = {"$regex": filters.disaster_type, "$options": "i"}
             if filters.severity:
@@ -88,11 +96,11 @@ class ArticlesService:
             query['disaster_type'] = type
         
         try:
-            cursor = self.collection.find(query).sort("collected_at", -1).limit(limit)
+            cursor = self.collection.find(query, _LIST_PROJECTION).sort("collected_at", -1).limit(limit)
             articles = await cursor.to_list(length=limit)
         except Exception as e:
             logger.warning(f"Error with sort field, using default: {e}")
-            cursor = self.collection.find(query).limit(limit)
+            cursor = self.collection.find(query, _LIST_PROJECTION).limit(limit)
             articles = await cursor.to_list(length=limit)
         
         return [self._serialize_article(a) for a in articles]
@@ -104,9 +112,15 @@ class ArticlesService:
         skip: int = 0,
         sort_by: str = "collected_at",
         sort_order: str = "desc",
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        collapse: bool = False
     ) -> List[Dict[str, Any]]:
-        """Get articles with filters, pagination and sorting"""
+        """
+        Get articles with filters, pagination and sorting
+        
+        ``collapse``: one article per story (near-duplicate copies from other
+        outlets are folded into it, ``story_size`` counts them).
+        """
         query = self._build_query(filters, search)
         
         # Determine sort direction
@@ -117,23 +131,51 @@ class ArticlesService:
         if sort_by not in valid_sort_fields:
             sort_by = "collected_at"
         
+        if collapse:
+            pipeline = self._story_pipeline(query, sort_by, sort_direction) + [{"$skip": skip}, {"$limit": limit}]
+            articles = await self.collection.aggregate(pipeline).to_list(length=limit)
+            return [self._serialize_article(a) for a in articles]
+        
         try:
-            cursor = self.collection.find(query).sort(sort_by, sort_direction).skip(skip).limit(limit)
+            cursor = self.collection.find(query, _LIST_PROJECTION).sort(sort_by, sort_direction).skip(skip).limit(limit)
             articles = await cursor.to_list(length=limit)
         except Exception as e:
             logger.warning(f"Error with query/sort: {e}")
-            cursor = self.collection.find(query).skip(skip).limit(limit)
+            cursor = self.collection.find(query, _LIST_PROJECTION).skip(skip).limit(limit)
             articles = await cursor.to_list(length=limit)
         
         return [self._serialize_article(a) for a in articles]
+    
+    def _story_pipeline(self, query: Dict[str, Any], sort_by: str, sort_direction: int) -> List[Dict[str, Any]]:
+        """Matching articles grouped by story, the first in sort order standing for each"""
+        return [
+            {"$match": query},
+            {"$sort": {sort_by: sort_direction}},
+            {"$project": _LIST_PROJECTION},
+            {"$group": {
+                "_id": {"$ifNull": ["$story_id", "$_id"]},
+                "article": {"$first": "$$ROOT"},
+                "story_size": {"$sum": 1}
+            }},
+            {"$replaceRoot": {"newRoot": {"$mergeObjects": ["$article", {"story_size": "$story_size"}]}}},
+            {"$sort": {sort_by: sort_direction, "_id": 1}}
+        ]
 
     async def get_total_count(
         self, 
         filters: Optional[ArticleFilter] = None, 
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        collapse: bool = False
     ) -> int:
-        """Get total count of articles matching filters"""
+        """Get total count of articles (or stories, with ``collapse``) matching filters"""
         query = self._build_query(filters, search)
+        if collapse:
+            rows = await self.collection.aggregate([
+                {"$match": query},
+                {"$group": {"_id": {"$ifNull": ["$story_id", "$_id"]}}},
+                {"$count": "stories"}
+            ]).to_list(length=1)
+            return rows[0]["stories"] if rows else 0
         return await self.collection.count_documents(query)
 
     async def get_articles_with_filter(
@@ -174,6 +216,7 @@ class ArticlesService:
         
         return self._serialize_article(doc)
 
+    @invalidate_cache(tags=ARTICLE_WRITE_TAGS)
     async def create_article(self, article: ArticleCreate) -> Dict[str, Any]:
         """Create a new article"""
         article_data = article.model_dump()
@@ -190,6 +233,7 @@ class ArticlesService:
         
         return article_data
 
+    @invalidate_cache(tags=ARTICLE_WRITE_TAGS)
     async def create_many_articles(self, articles: List[Dict[str, Any]]) -> List[str]:
         """Create multiple articles at once"""
         if not articles:
@@ -198,6 +242,7 @@ class ArticlesService:
         result = await self.collection.insert_many(articles)
         return [str(id) for id in result.inserted_ids]
 
+    @invalidate_cache(tags=ARTICLE_WRITE_TAGS)
     async def update_article(self, article_id: str, article: ArticleUpdate) -> Dict[str, Any]:
         """Update an existing article"""
         update_data = article.model_dump(exclude_unset=True)
@@ -218,6 +263,7 @@ class ArticlesService:
         
         return await self.get_article_by_id(article_id)
 
+    @invalidate_cache(tags=ARTICLE_WRITE_TAGS)
     async def delete_article(self, article_id: str) -> None:
         """Delete an article by ID"""
         try:
@@ -245,6 +291,9 @@ class ArticlesService:
                     "by_region": [
                         {"$group": {"_id": "$region", "count": {"$sum": 1}}}
                     ],
+                    "by_province": [
+                        {"$group": {"_id": "$province", "count": {"$sum": 1}}}
+                    ],
                     "by_disaster_type": [
                         {"$group": {"_id": "$disaster_type", "count": {"$sum": 1}}}
                     ],
@@ -260,13 +309,14 @@ class ArticlesService:
         result = await self.collection.aggregate(pipeline).to_list(length=1)
         
         if not result:
-            return {"total": 0, "by_severity": {}, "by_region": {}, "by_disaster_type": {}, "by_source": {}}
+            return {"total": 0, "by_severity": {}, "by_region": {}, "by_province": {}, "by_disaster_type": {}, "by_source": {}}
         
         stats = result[0]
         return {
             "total": stats["total"][0]["count"] if stats["total"] else 0,
             "by_severity": {item["_id"]: item["count"] for item in stats["by_severity"] if item["_id"]},
             "by_region": {item["_id"]: item["count"] for item in stats["by_region"] if item["_id"]},
+            "by_province": {item["_id"]: item["count"] for item in stats["by_province"] if item["_id"]},
             "by_disaster_type": {item["_id"]: item["count"] for item in stats["by_disaster_type"] if item["_id"]},
             "by_source": {item["_id"]: item["count"] for item in stats["by_source"] if item["_id"]}
         }
\ No newline at end of file
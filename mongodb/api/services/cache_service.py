@@ -6,10 +6,13 @@ Provides caching decorators and utilities for FastAPI endpoints
 import json
 import hashlib
 import functools
-from typing import Optional, Callable, Any, Union
+from dataclasses import dataclass
+from typing import Optional, Callable, Any, Union, Dict, Awaitable, Iterable, List
 from datetime import timedelta
 import logging
 import asyncio
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +30,46 @@ CACHE_CONFIG = {
     "keyword_cloud": 600,        # 10 minutes
     "region_stats": 300,         # 5 minutes
     "default": 60,               # 1 minute default
+    # Tag-invalidated entries: writes bump the tag generation, so the TTL
+    # only bounds memory use rather than staleness
+    "tagged": 3600,              # 1 hour
 }
 
+# ============================================
+# Cache Tags
+# ============================================
+# Cached values declare the data they depend on; writes bump the tag's
+# generation counter and every key embedding the old generation is
+# simply never read again (it expires on its own TTL).
+
+TAG_ARTICLES = "articles"
+
+# Tags touched by any article insert/update/delete ("today" panels need no
+# tag of their own: their keys embed the date and depend on TAG_ARTICLES)
+ARTICLE_WRITE_TAGS = (TAG_ARTICLES,)
+
+TAG_KEY_PREFIX = "cachetag:"  # outside "cache:*" so clear_all keeps generations
+
+# Stale-while-revalidate: how long (seconds) an expired entry may still be
+# served while a single background task recomputes it
+STALE_GRACE_SECONDS = 300
+
+# Cross-worker recompute lock (Redis SET NX PX)
+RECOMPUTE_LOCK_TTL_MS = 10000
+LOCK_POLL_INTERVAL = 0.05        # first poll delay while another worker recomputes
+LOCK_POLL_MAX_INTERVAL = 0.5
+
+# Keys per SCAN page / UNLINK call when deleting by pattern
+SCAN_BATCH_SIZE = 500
+
+# Compare-and-delete so a worker never releases a lock it no longer owns
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 
 class CacheService:
     """
@@ -40,6 +81,10 @@ class CacheService:
         self._redis = None
         self._memory_cache: dict = {}
         self._memory_expiry: dict = {}
+        # In-flight recomputes per key (single-flight within this worker)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Tag generations when Redis is unavailable
+        self._tag_versions: Dict[str, int] = {}
     
     async def get_redis(self):
         """Get Redis connection lazily"""
@@ -60,12 +105,12 @@ class CacheService:
             try:
                 value = await redis.get(f"cache:{key}")
                 if value:
-                    return json.loads(value)
+                    return self._unwrap(json.loads(value))
             except Exception as e:
                 logger.debug(f"Redis get error: {e}")
         
         # Fallback to memory cache
-        return self._get_from_memory(key)
+        return self._unwrap(self._get_from_memory(key))
     
     async def set(self, key: str, value: Any, ttl: int = 60) -> bool:
         """Set value in cache with TTL in seconds"""
@@ -86,6 +131,311 @@ class CacheService:
         self._set_in_memory(key, value, ttl)
         return True
     
+    # ----------------------------------------
+    # Stampede protection / stale-while-revalidate
+    # ----------------------------------------
+    
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 60,
+        stale_ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> Any:
+        """
+        Get value from cache, computing it with ``loader`` on a miss.
+        
+        - Fresh entry: returned directly.
+        - Expired but within ``stale_ttl``: the stale value is returned and
+          one background task refreshes it.
+        - Miss: only one recompute runs per key in this worker (concurrent
+          callers await the same task) and a short Redis lock keeps other
+          workers from recomputing at the same time.
+        
+        With ``tags``, the key embeds the current tag generations, so a
+        ``bump_tags`` call makes every dependent entry miss immediately.
+        """
+        spec = CacheSpec(key, loader, ttl=ttl, stale_ttl=stale_ttl, tags=tags)
+        return (await self.get_many([spec]))[0]
+    
+    async def get_many(self, specs: List["CacheSpec"]) -> List[Any]:
+        """
+        Resolve several cached values in one round trip.
+        
+        Tag generations for all specs are read with one MGET and the
+        entries with a second one; only the misses run their loaders
+        (concurrently, each single-flighted like ``get_or_set``).
+        """
+        all_tags = sorted({t for spec in specs for t in (spec.tags or [])})
+        versions = await self.get_tag_versions(all_tags) if all_tags else {}
+        
+        keys = []
+        for spec in specs:
+            tags = sorted(set(spec.tags)) if spec.tags else []
+            keys.append(_format_tagged_key(spec.key, tags, versions) if tags else spec.key)
+        
+        entries = await self._get_entries(keys)
+        now = time.time()
+        results: List[Any] = [None] * len(specs)
+        pending = {}
+        
+        for i, (spec, key, entry) in enumerate(zip(specs, keys, entries)):
+            stale_ttl = STALE_GRACE_SECONDS if spec.stale_ttl is None else spec.stale_ttl
+            tags = sorted(set(spec.tags)) if spec.tags else []
+            
+            if entry is not None:
+                results[i] = entry["value"]
+                if now >= entry["fresh_until"]:
+                    logger.debug(f"Cache STALE: {key}")
+                    self._start_recompute(key, spec.loader, spec.ttl, stale_ttl, wait=False, tags=tags)
+                continue
+            
+            logger.debug(f"Cache MISS: {key}")
+            pending[i] = self._join_recompute(key, spec.loader, spec.ttl, stale_ttl, tags)
+        
+        if pending:
+            values = await asyncio.gather(*pending.values())
+            for i, value in zip(pending.keys(), values):
+                results[i] = value
+        
+        return results
+    
+    async def _join_recompute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """
+        Wait for the key's in-flight recompute (starting one if needed).
+        
+        The task joined may be a background refresh that gave up because
+        another worker holds the lock; a caller that needs the value then
+        starts a blocking recompute, which waits for that worker's result.
+        """
+        while True:
+            task = self._start_recompute(key, loader, ttl, stale_ttl, wait=True, tags=tags)
+            # Shield so a cancelled request does not abort the shared recompute
+            value = await asyncio.shield(task)
+            if value is not _MISSING:
+                return value
+    
+    def _start_recompute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        wait: bool,
+        tags: Optional[List[str]] = None
+    ) -> asyncio.Task:
+        """Start (or join) the single in-flight recompute for a key"""
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            return task
+        
+        task = asyncio.ensure_future(self._recompute(key, loader, ttl, stale_ttl, wait, tags))
+        self._inflight[key] = task
+        
+        def _done(t: asyncio.Task):
+            if self._inflight.get(key) is t:
+                self._inflight.pop(key, None)
+            if not wait and not t.cancelled() and t.exception():
+                logger.warning(f"Background cache refresh failed for {key}: {t.exception()}")
+        
+        task.add_done_callback(_done)
+        return task
+    
+    async def _recompute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        wait: bool,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """
+        Recompute a key under a cross-worker lock.
+        
+        If another worker holds the lock, a blocking caller (``wait=True``)
+        polls for the value it publishes; a background refresh just gives up
+        (returns ``_MISSING``) since the stale value is still being served.
+        """
+        redis = await self.get_redis()
+        lock_key = f"lock:cache:{key}"
+        token = None
+        
+        if redis:
+            token = uuid.uuid4().hex
+            try:
+                acquired = await redis.set(lock_key, token, nx=True, px=RECOMPUTE_LOCK_TTL_MS)
+            except Exception as e:
+                logger.debug(f"Redis lock error: {e}")
+                acquired, token = True, None
+            
+            if not acquired:
+                if not wait:
+                    return _MISSING
+                value = await self._wait_for_entry(key)
+                if value is not _MISSING:
+                    return value
+                # Lock holder did not publish in time, compute ourselves
+                token = None
+        
+        try:
+            value = await loader()
+            await self._set_entry(key, value, ttl, stale_ttl, tags)
+            return value
+        finally:
+            if token:
+                await self._release_lock(redis, lock_key, token)
+    
+    async def _wait_for_entry(self, key: str) -> Any:
+        """Poll for a fresh entry written by the worker holding the lock"""
+        deadline = time.time() + RECOMPUTE_LOCK_TTL_MS / 1000
+        interval = LOCK_POLL_INTERVAL
+        
+        while time.time() < deadline:
+            await asyncio.sleep(interval)
+            entry = await self._get_entry(key)
+            if entry is not None and time.time() < entry["fresh_until"]:
+                return entry["value"]
+            interval = min(interval * 2, LOCK_POLL_MAX_INTERVAL)
+        
+        return _MISSING
+    
+    async def _release_lock(self, redis, lock_key: str, token: str):
+        """Release recompute lock if we still own it"""
+        try:
+            await redis.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            logger.debug(f"Redis unlock error: {e}")
+    
+    async def _get_entry(self, key: str) -> Optional[dict]:
+        """Get raw SWR entry ({value, fresh_until}) from Redis or memory"""
+        return (await self._get_entries([key]))[0]
+    
+    async def _get_entries(self, keys: List[str]) -> List[Optional[dict]]:
+        """Get raw SWR entries for several keys with a single MGET"""
+        if not keys:
+            return []
+        redis = await self.get_redis()
+        
+        if redis:
+            try:
+                raws = await redis.mget([f"cache:{k}" for k in keys])
+                entries = []
+                for key, raw in zip(keys, raws):
+                    entry = json.loads(raw) if raw else self._get_from_memory(key)
+                    entries.append(entry if _is_entry(entry) else None)
+                return entries
+            except Exception as e:
+                logger.debug(f"Redis mget error: {e}")
+        
+        entries = [self._get_from_memory(k) for k in keys]
+        return [e if _is_entry(e) else None for e in entries]
+    
+    async def _set_entry(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]] = None
+    ):
+        """Store SWR entry; hard expiry covers the stale grace window"""
+        entry = {"__swr__": 1, "value": value, "fresh_until": time.time() + ttl}
+        if tags:
+            entry["tags"] = list(tags)
+        hard_ttl = ttl + stale_ttl
+        redis = await self.get_redis()
+        
+        if redis:
+            try:
+                await redis.setex(f"cache:{key}", hard_ttl, json.dumps(entry, default=_json_default))
+                return
+            except Exception as e:
+                logger.debug(f"Redis set error: {e}")
+        
+        self._set_in_memory(key, entry, hard_ttl)
+    
+    def _unwrap(self, value: Any) -> Optional[Any]:
+        """Return plain value for SWR entries (None once past fresh TTL)"""
+        if _is_entry(value):
+            return value["value"] if time.time() < value["fresh_until"] else None
+        return value
+    
+    # ----------------------------------------
+    # Tag generations
+    # ----------------------------------------
+    
+    async def get_tag_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Get current generation of each tag (one MGET round trip)"""
+        tags = list(tags)
+        redis = await self.get_redis()
+        
+        if redis:
+            try:
+                values = await redis.mget([f"{TAG_KEY_PREFIX}{t}" for t in tags])
+                return {t: int(v or 0) for t, v in zip(tags, values)}
+            except Exception as e:
+                logger.debug(f"Redis tag read error: {e}")
+        
+        return {t: self._tag_versions.get(t, 0) for t in tags}
+    
+    async def tagged_key(self, key: str, tags: Iterable[str]) -> str:
+        """Embed tag generations in a cache key"""
+        tags = sorted(set(tags))
+        versions = await self.get_tag_versions(tags)
+        return _format_tagged_key(key, tags, versions)
+    
+    async def bump_tags(self, *tags: str) -> Dict[str, int]:
+        """Invalidate every entry depending on ``tags`` by bumping generations"""
+        for tag in tags:
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+        
+        redis = await self.get_redis()
+        if redis:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for tag in tags:
+                    pipe.incr(f"{TAG_KEY_PREFIX}{tag}")
+                values = await pipe.execute()
+                return dict(zip(tags, values))
+            except Exception as e:
+                logger.debug(f"Redis tag bump error: {e}")
+        
+        return {t: self._tag_versions[t] for t in tags}
+    
+    async def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several plain values in one round trip (missing keys omitted)"""
+        if not keys:
+            return {}
+        redis = await self.get_redis()
+        
+        if redis:
+            try:
+                raws = await redis.mget([f"cache:{k}" for k in keys])
+                values = {}
+                for key, raw in zip(keys, raws):
+                    value = self._unwrap(json.loads(raw)) if raw else None
+                    if value is not None:
+                        values[key] = value
+                return values
+            except Exception as e:
+                logger.debug(f"Redis mget error: {e}")
+        
+        values = {}
+        for key in keys:
+            value = self._unwrap(self._get_from_memory(key))
+            if value is not None:
+                values[key] = value
+        return values
+    
     async def delete(self, key: str) -> bool:
         """Delete key from cache"""
         redis = await self.get_redis()
@@ -108,9 +458,7 @@ class CacheService:
         
         if redis:
             try:
-                async for key in redis.scan_iter(match=f"cache:{pattern}"):
-                    await redis.delete(key)
-                    count += 1
+                count += await self._scan_unlink(redis, f"cache:{pattern}")
             except Exception as e:
                 logger.debug(f"Redis delete pattern error: {e}")
         
@@ -129,8 +477,7 @@ class CacheService:
         
         if redis:
             try:
-                async for key in redis.scan_iter(match="cache:*"):
-                    await redis.delete(key)
+                await self._scan_unlink(redis, "cache:*")
             except Exception:
                 pass
         
@@ -138,6 +485,28 @@ class CacheService:
         self._memory_expiry.clear()
         return True
     
+    async def _scan_unlink(self, redis, match: str) -> int:
+        """SCAN for keys and UNLINK them in chunks (non-blocking delete)"""
+        count = 0
+        batch: List[str] = []
+        
+        async for key in redis.scan_iter(match=match, count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                count += await self._unlink(redis, batch)
+                batch = []
+        
+        if batch:
+            count += await self._unlink(redis, batch)
+        return count
+    
+    async def _unlink(self, redis, keys: List[str]) -> int:
+        """UNLINK keys, falling back to DEL on servers without it"""
+        try:
+            return await redis.unlink(*keys)
+        except Exception:
+            return await redis.delete(*keys)
+    
     def _get_from_memory(self, key: str) -> Optional[Any]:
         """Get from in-memory cache with expiry check"""
         import time
@@ -169,6 +538,38 @@ class CacheService:
                 self._memory_expiry.pop(k, None)
 
 
+@dataclass
+class CacheSpec:
+    """One value to resolve through CacheService.get_many"""
+    key: str
+    loader: Callable[[], Awaitable[Any]]
+    ttl: int = 60
+    stale_ttl: Optional[int] = None
+    tags: Optional[Iterable[str]] = None
+
+
+# Sentinel for "no value published" (None is a valid cached value)
+_MISSING = object()
+
+
+def _json_default(value: Any) -> Any:
+    """JSON fallback keeping datetimes in ISO format"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _format_tagged_key(key: str, tags: List[str], versions: Dict[str, int]) -> str:
+    """Build the generation-stamped key for sorted ``tags``"""
+    suffix = ".".join(f"{t}={versions[t]}" for t in tags)
+    return f"{key}@{suffix}"
+
+
+def _is_entry(value: Any) -> bool:
+    """Check if a cached value is a stale-while-revalidate entry"""
+    return isinstance(value, dict) and value.get("__swr__") == 1
+
+
 # Singleton instance
 _cache_service: Optional[CacheService] = None
 
@@ -185,6 +586,17 @@ def get_cache_service() -> CacheService:
 # Caching Decorators
 # ============================================
 
+def to_cacheable(result: Any) -> Any:
+    """Convert Pydantic models (or lists of them) to JSON-serializable data"""
+    if isinstance(result, list):
+        return [to_cacheable(item) for item in result]
+    if hasattr(result, 'model_dump'):
+        return result.model_dump()
+    if hasattr(result, 'dict'):
+        return result.dict()
+    return result
+
+
 def make_cache_key(*args, **kwargs) -> str:
     """Generate a cache key from arguments"""
     key_data = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str)
@@ -194,7 +606,9 @@ def make_cache_key(*args, **kwargs) -> str:
 def cached(
     prefix: str,
     ttl: Optional[int] = None,
-    key_builder: Optional[Callable] = None
+    key_builder: Optional[Callable] = None,
+    stale_ttl: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None
 ):
     """
     Caching decorator for async functions.
@@ -208,6 +622,9 @@ def cached(
         prefix: Cache key prefix (also used to look up TTL in CACHE_CONFIG)
         ttl: Time-to-live in seconds (overrides CACHE_CONFIG)
         key_builder: Custom function to build cache key from args/kwargs
+        stale_ttl: Seconds an expired value may be served while refreshing
+            (defaults to STALE_GRACE_SECONDS)
+        tags: Cache tags the value depends on (see bump_tags)
     """
     def decorator(func: Callable):
         @functools.wraps(func)
@@ -221,34 +638,30 @@ def cached(
                 key_suffix = make_cache_key(*args, **kwargs)
             
             cache_key = f"{prefix}:{key_suffix}"
-            
-            # Try to get from cache
-            cached_value = await cache.get(cache_key)
-            if cached_value is not None:
-                logger.debug(f"Cache HIT: {cache_key}")
-                return cached_value
-            
-            logger.debug(f"Cache MISS: {cache_key}")
-            
-            # Execute function
-            result = await func(*args, **kwargs)
-            
-            # Cache the result
             cache_ttl = ttl or CACHE_CONFIG.get(prefix, CACHE_CONFIG["default"])
-            await cache.set(cache_key, result, cache_ttl)
             
-            return result
+            # Single-flight + stale-while-revalidate
+            return await cache.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=cache_ttl,
+                stale_ttl=stale_ttl,
+                tags=tags
+            )
         
         return wrapper
     return decorator
 
 
-def invalidate_cache(prefix: str):
+def invalidate_cache(prefix: Optional[str] = None, tags: Optional[Iterable[str]] = None):
     """
     Decorator to invalidate cache after function execution.
     
+    Prefer ``tags``: bumping a tag generation is O(1), while ``prefix``
+    SCANs and deletes matching keys.
+    
     Usage:
-        @invalidate_cache("dashboard_stats")
+        @invalidate_cache(tags=ARTICLE_WRITE_TAGS)
         async def update_article(article_id: str, data: dict):
             ...
     """
@@ -258,9 +671,12 @@ def invalidate_cache(prefix: str):
             result = await func(*args, **kwargs)
             
             # Invalidate cache
-            cache = get_cache_service()
-            await cache.delete_pattern(f"{prefix}:*")
-            logger.debug(f"Cache invalidated: {prefix}:*")
+            if tags:
+                await invalidate_tags(*tags)
+            if prefix:
+                cache = get_cache_service()
+                await cache.delete_pattern(f"{prefix}:*")
+                logger.debug(f"Cache invalidated: {prefix}:*")
             
             return result
         
@@ -268,6 +684,15 @@ def invalidate_cache(prefix: str):
     return decorator
 
 
+async def invalidate_tags(*tags: str):
+    """Bump tag generations (never raises - caching must not break writes)"""
+    try:
+        await get_cache_service().bump_tags(*tags)
+        logger.debug(f"Cache tags invalidated: {tags}")
+    except Exception as e:
+        logger.warning(f"Cache tag invalidation failed: {e}")
+
+
 # ============================================
 # FastAPI Request-based Caching
 # ============================================
@@ -275,7 +700,9 @@ def invalidate_cache(prefix: str):
 def cached_endpoint(
     prefix: str,
     ttl: Optional[int] = None,
-    include_query_params: bool = True
+    include_query_params: bool = True,
+    stale_ttl: Optional[int] = None,
+    tags: Optional[Iterable[str]] = None
 ):
     """
     Caching decorator specifically for FastAPI endpoints.
@@ -301,28 +728,16 @@ def cached_endpoint(
                 key_suffix = make_cache_key(*args, **kwargs)
             
             cache_key = f"{prefix}:{key_suffix}"
-            
-            # Try cache
-            cached_value = await cache.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-            
-            # Execute
-            result = await func(*args, **kwargs)
-            
-            # Handle Pydantic models and dict-like responses
-            if hasattr(result, 'dict'):
-                cache_data = result.dict()
-            elif hasattr(result, 'model_dump'):
-                cache_data = result.model_dump()
-            else:
-                cache_data = result
-            
-            # Cache
             cache_ttl = ttl or CACHE_CONFIG.get(prefix, CACHE_CONFIG["default"])
-            await cache.set(cache_key, cache_data, cache_ttl)
             
-            return result
+            async def load():
+                result = await func(*args, **kwargs)
+                # Handle Pydantic models and dict-like responses
+                return to_cacheable(result)
+            
+            return await cache.get_or_set(
+                cache_key, load, ttl=cache_ttl, stale_ttl=stale_ttl, tags=tags
+            )
         
         return wrapper
     return decorator
@@ -338,10 +753,14 @@ async def get_cache_stats() -> dict:
     
     stats = {
         "memory_cache_size": len(cache._memory_cache),
+        "inflight_recomputes": len(cache._inflight),
+        "stale_grace_seconds": STALE_GRACE_SECONDS,
         "redis_available": cache._redis is not None and cache._redis is not False,
         "config": CACHE_CONFIG
     }
     
+    stats["tag_versions"] = await cache.get_tag_versions(ARTICLE_WRITE_TAGS)
+    
     redis = await cache.get_redis()
     if redis:
         try:
@@ -3,11 +3,20 @@ NLP Classification Service - Phân loại bài báo thiên tai
 Sử dụng kết hợp Rule-based và Machine Learning
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple
 from typing import Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
 import re
 
+from mongodb.api.services.gazetteer import PROVINCES, gazetteer
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,31 +90,19 @@ SEVERITY_INDICATORS = {
     }
 }
 
+# Vùng miền của một bài báo: vùng của tỉnh được nhắc nhiều nhất (gazetteer);
+# không có tỉnh nào thì cụm từ chỉ vùng xuất hiện sớm nhất
 REGION_MAPPING = {
     "north": [
-        "hà nội", "hải phòng", "quảng ninh", "hải dương", "hưng yên",
-        "thái bình", "hà nam", "nam định", "ninh bình", "vĩnh phúc",
-        "bắc ninh", "bắc giang", "thái nguyên", "lạng sơn", "cao bằng",
-        "bắc kạn", "hà giang", "tuyên quang", "lào cai", "yên bái",
-        "điện biên", "lai châu", "sơn la", "hòa bình", "phú thọ",
         "miền bắc", "đồng bằng bắc bộ", "tây bắc", "đông bắc"
     ],
     "central": [
-        "thanh hóa", "nghệ an", "hà tĩnh", "quảng bình", "quảng trị",
-        "thừa thiên huế", "đà nẵng", "quảng nam", "quảng ngãi",
-        "bình định", "phú yên", "khánh hòa", "ninh thuận", "bình thuận",
         "miền trung", "bắc trung bộ", "nam trung bộ", "duyên hải miền trung"
     ],
     "south": [
-        "tp.hcm", "thành phố hồ chí minh", "hồ chí minh", "bình dương",
-        "đồng nai", "bà rịa", "vũng tàu", "tây ninh", "bình phước",
-        "long an", "tiền giang", "bến tre", "vĩnh long", "trà vinh",
-        "đồng tháp", "an giang", "kiên giang", "cần thơ", "hậu giang",
-        "sóc trăng", "bạc liêu", "cà mau", "miền nam", "đông nam bộ",
-        "tây nam bộ", "đồng bằng sông cửu long"
+        "miền nam", "đông nam bộ", "tây nam bộ", "đồng bằng sông cửu long"
     ],
     "highlands": [
-        "kon tum", "gia lai", "đắk lắk", "đắk nông", "lâm đồng",
         "tây nguyên", "cao nguyên"
     ]
 }
@@ -118,10 +115,31 @@ class ClassificationResult(BaseModel):
     severity: str
     confidence: float
     region: Optional[str] = None
+    provinces: List[str] = []  # most mentioned first
+    province: Optional[str] = None
     matched_keywords: List[str] = []
     details: Dict[str, Any] = {}
 
 
+# Fields an article stores from its ClassificationResult
+LABEL_FIELDS = (
+    "is_disaster", "disaster_type", "severity", "confidence", "region", "provinces", "province", "matched_keywords"
+)
+
+# Bump when the classification logic (not only the tables above) changes,
+# so the reclassification backfill relabels stored articles
+CLASSIFIER_VERSION = 2
+
+
+def classifier_fingerprint() -> str:
+    """Identifies the rules stored labels were computed with"""
+    rules = [
+        CLASSIFIER_VERSION, DISASTER_KEYWORDS, SEVERITY_INDICATORS, REGION_MAPPING,
+        [astuple(p) for p in PROVINCES]
+    ]
+    return hashlib.sha1(json.dumps(rules, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:12]
+
+
 class ClassificationService:
     """
     NLP Classification Service
@@ -130,7 +148,7 @@ class ClassificationService:
     1. Rule-based: Keyword matching với weight
     2. Pattern matching: Regex cho số liệu thiệt hại
     3. Severity detection: Dựa trên từ khóa và số liệu
-    4. Region detection: Mapping địa phương
+    4. Region detection: Tỉnh/thành (gazetteer) và vùng miền
     """
     
     def __init__(self):
@@ -167,12 +185,24 @@ class ClassificationService:
         Returns:
             ClassificationResult: Kết quả phân loại
         """
+        return ClassificationResult(**self.classify(title, content))
+    
+    def classify(self, title: str, content: str = "") -> Dict[str, Any]:
+        """
+        Phân loại đồng bộ - lõi của classify_article
+        
+        Used directly by batch jobs (worker processes, imports, backfills) so
+        offline data gets exactly the labels live ingest does. Besides the
+        ClassificationResult fields, ``disaster_types`` lists every type
+        with a keyword match.
+        """
         try:
             # Combine text for analysis
             full_text = f"{title} {content}".lower()
             
             # Step 1: Detect disaster type and keywords
-            disaster_type, matched_keywords, type_score = self._detect_disaster_type(full_text)
+            matches = self._match_types(full_text)
+            disaster_type, matched_keywords, type_score = self._detect_disaster_type(full_text, matches)
             
             # Step 2: Check if is disaster article
             # Lowered threshold to 0.2 vì chỉ cần 1-2 keyword cũng đủ xác định là tin thiên tai
@@ -181,8 +211,10 @@ class ClassificationService:
             # Step 3: Detect severity
             severity, severity_details = self._detect_severity(full_text)
             
-            # Step 4: Detect region
-            region = self._detect_region(full_text)
+            # Step 4: Detect provinces and region
+            provinces = gazetteer.tag(f"{title} {content}")
+            province = provinces[0] if provinces else None
+            region = self._detect_region(full_text, province)
             
             # Step 5: Calculate confidence
             confidence = self._calculate_confidence(
@@ -192,43 +224,50 @@ class ClassificationService:
                 region is not None
             )
             
-            return ClassificationResult(
-                is_disaster=is_disaster,
-                disaster_type=disaster_type if is_disaster else "none",
-                severity=severity if is_disaster else "none",
-                confidence=round(confidence, 2),
-                region=region,
-                matched_keywords=matched_keywords,
-                details=severity_details
-            )
+            return {
+                "is_disaster": is_disaster,
+                "disaster_type": disaster_type if is_disaster else "none",
+                "disaster_types": list(matches),
+                "severity": severity if is_disaster else "none",
+                "confidence": round(confidence, 2),
+                "region": region,
+                "provinces": provinces,
+                "province": province,
+                "matched_keywords": matched_keywords,
+                "details": severity_details
+            }
             
         except Exception as e:
             logger.error(f"Error during classification: {e}")
-            return ClassificationResult(
-                is_disaster=False,
-                disaster_type="none",
-                severity="none",
-                confidence=0.0
-            )
+            return {
+                "is_disaster": False,
+                "disaster_type": "none",
+                "disaster_types": [],
+                "severity": "none",
+                "confidence": 0.0
+            }
     
-    def _detect_disaster_type(self, text: str) -> Tuple[str, List[str], float]:
-        """Phát hiện loại thiên tai"""
-        scores = {}
+    def _match_types(self, text: str) -> Dict[str, List[str]]:
+        """Keywords found in ``text``, per disaster type"""
         matched = {}
-        
         for dtype, config in self.disaster_keywords.items():
-            keywords = config["keywords"]
-            weight = config["weight"]
-            matches = []
-            
-            for kw in keywords:
-                if kw in text:
-                    matches.append(kw)
-            
+            matches = [kw for kw in config["keywords"] if kw in text]
             if matches:
-                score = len(matches) * weight
-                scores[dtype] = score
                 matched[dtype] = matches
+        return matched
+    
+    def _detect_disaster_type(
+        self,
+        text: str,
+        matched: Optional[Dict[str, List[str]]] = None
+    ) -> Tuple[str, List[str], float]:
+        """Phát hiện loại thiên tai"""
+        if matched is None:
+            matched = self._match_types(text)
+        scores = {
+            dtype: len(matches) * self.disaster_keywords[dtype]["weight"]
+            for dtype, matches in matched.items()
+        }
         
         if not scores:
             return "other", [], 0.0
@@ -243,7 +282,8 @@ class ClassificationService:
         total_score = sum(scores.values())
         normalized_score = min(total_score / 5.0, 1.0)
         
-        return best_type, list(set(all_matched)), normalized_score
+        # Ordered de-dup: a set's order depends on the process hash seed
+        return best_type, list(dict.fromkeys(all_matched)), normalized_score
     
     def _detect_severity(self, text: str) -> Tuple[str, Dict]:
         """Phát hiện mức độ nghiêm trọng"""
@@ -296,13 +336,17 @@ class ClassificationService:
         
         return "low", details
     
-    def _detect_region(self, text: str) -> Optional[str]:
+    def _detect_region(self, text: str, province: Optional[str] = None) -> Optional[str]:
         """Phát hiện vùng miền"""
-        for region, provinces in self.region_mapping.items():
-            for province in provinces:
-                if province in text:
-                    return region
-        return None
+        if province:
+            return gazetteer.region_of(province)
+        found = [
+            (text.find(phrase), region)
+            for region, phrases in self.region_mapping.items()
+            for phrase in phrases
+            if phrase in text
+        ]
+        return min(found)[1] if found else None
     
     def _calculate_confidence(
         self, 
@@ -336,6 +380,70 @@ class ClassificationService:
         return results
 
 
+# =====================================================
+# BATCH MODE (multi-process)
+# =====================================================
+
+_worker_service: Optional[ClassificationService] = None
+
+
+def _classify_chunk(pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Worker process: classify (title, content) pairs"""
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = ClassificationService()
+    return [_worker_service.classify(title, content) for title, content in pairs]
+
+
+class BatchClassificationService:
+    """
+    Rule-based classification of large batches on every CPU core
+    
+    Offline imports and backfills go through the same engine as live
+    ingest (ClassificationService.classify), so they get identical labels;
+    the batch is split into chunks classified in a process pool.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: a fork of the API process would copy its
+            # event loop and the MongoDB driver's threads
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+    
+    async def classify_batch(self, articles: List[Dict]) -> List[ClassificationResult]:
+        """Phân loại nhiều bài báo song song"""
+        pairs = [
+            (article.get('title', ''), article.get('content', '') or article.get('text', ''))
+            for article in articles
+        ]
+        if self.workers <= 1 or len(pairs) <= self.chunk_size:
+            labels = _classify_chunk(pairs)
+        else:
+            loop = asyncio.get_running_loop()
+            parts = await asyncio.gather(*[
+                loop.run_in_executor(self.pool, _classify_chunk, chunk) for chunk in self._chunks(pairs)
+            ])
+            labels = [label for part in parts for label in part]
+        return [ClassificationResult(**label) for label in labels]
+    
+    def _chunks(self, pairs: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """Enough chunks to keep every worker busy, none larger than chunk_size"""
+        size = min(self.chunk_size, max(1, -(-len(pairs) // self.workers)))
+        return [pairs[i:i + size] for i in range(0, len(pairs), size)]
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
 class HybridClassificationService:
     """
     Hybrid Classification Service
@@ -0,0 +1,348 @@
+"""
+Crawl Queue - chia một lượt crawl thành nhiều đơn vị cho nhiều crawler
+
+A sweep (manual or daily crawl) is split into units - one per direct feed
+URL or Google News keyword - stored in the ``crawl_units`` collection. Any
+number of workers (the API process, ``crawl-worker`` replicas) claim units
+with an atomic find_one_and_update that sets a lease; a worker that dies
+leaves its lease to expire and the unit is claimed again. Every unit
+records its own outcome, so a sweep's progress - and whether any crawl is
+running at all - is aggregated from the queue rather than kept in a
+per-process global.
+"""
+
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import socket
+
+from pymongo import ReturnDocument
+
+from mongodb.api.config.database import Database
+from mongodb.api.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SWEEP_COLLECTION = "crawl_sweeps"
+UNIT_COLLECTION = "crawl_units"
+
+KIND_FEED = "feed"
+KIND_KEYWORD = "keyword"
+
+UNIT_PENDING = "pending"
+UNIT_LEASED = "leased"
+UNIT_DONE = "done"
+UNIT_FAILED = "failed"
+
+# Per-unit counters, as returned by CrawlService for one feed or keyword
+STAT_FIELDS = ("total_fetched", "extracted", "disasters", "stored", "duplicates", "errors")
+
+
+@dataclass
+class CrawlUnit:
+    """One feed or keyword of a sweep"""
+    id: str
+    sweep_id: str
+    kind: str
+    target: str  # feed URL or search keyword
+    source: Optional[str] = None  # DIRECT_RSS_SOURCES key of a feed
+    state: str = UNIT_PENDING
+    attempts: int = 0
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None  # naive UTC
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    stats: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
+
+    def to_doc(self) -> Dict[str, Any]:
+        doc = asdict(self)
+        doc["_id"] = doc.pop("id")
+        return doc
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "CrawlUnit":
+        fields = {k: v for k, v in doc.items() if k in cls.__dataclass_fields__}
+        return cls(id=doc["_id"], **fields)
+
+
+def sweep_units(
+    sweep_id: str,
+    keywords: Iterable[str] = (),
+    feeds: Iterable[Tuple[str, str]] = (),
+    now: Optional[datetime] = None
+) -> List[CrawlUnit]:
+    """Units of a sweep: one per keyword and one per (source key, feed URL)"""
+    now = now or datetime.utcnow()
+    units = [
+        CrawlUnit(f"{sweep_id}:{KIND_KEYWORD}:{keyword}", sweep_id, KIND_KEYWORD, keyword, created_at=now)
+        for keyword in keywords
+    ]
+    units += [
+        CrawlUnit(f"{sweep_id}:{KIND_FEED}:{url}", sweep_id, KIND_FEED, url, source=source, created_at=now)
+        for source, url in feeds
+    ]
+    return units
+
+
+class CrawlQueue:
+    """Sweeps and their units in MongoDB"""
+
+    def __init__(
+        self,
+        db: Any = None,
+        lease_s: Optional[int] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self._db = db
+        self.lease_s = lease_s or settings.crawl_claim_timeout_s
+        self.max_attempts = max_attempts or settings.crawl_unit_max_attempts
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else Database.get_db()
+
+    @property
+    def sweeps(self):
+        return self.db[SWEEP_COLLECTION]
+
+    @property
+    def units(self):
+        return self.db[UNIT_COLLECTION]
+
+    # ========================================
+    # Producing
+    # ========================================
+
+    async def enqueue(self, sweep_id: str, kind: str, units: List[CrawlUnit]) -> bool:
+        """
+        Create a sweep and its units. Returns False if the sweep already
+        exists - the API and crawler schedulers both enqueue the daily sweep,
+        the second one just joins it.
+        """
+        result = await self.sweeps.update_one(
+            {"_id": sweep_id},
+            {"$setOnInsert": {"kind": kind, "created_at": datetime.utcnow(), "total": len(units)}},
+            upsert=True
+        )
+        if result.upserted_id is None:
+            return False
+        if units:
+            await self.units.insert_many([unit.to_doc() for unit in units], ordered=False)
+        logger.info(f"📋 Enqueued crawl sweep {sweep_id}: {len(units)} units")
+        return True
+
+    # ========================================
+    # Consuming
+    # ========================================
+
+    async def claim(self, owner: str, now: datetime, sweep_id: Optional[str] = None) -> Optional[CrawlUnit]:
+        """Lease the oldest pending unit (or one whose lease expired)"""
+        query: Dict[str, Any] = {"$or": [
+            {"state": UNIT_PENDING},
+            {"state": UNIT_LEASED, "lease_expires_at": {"$lte": now}}
+        ]}
+        if sweep_id:
+            query["sweep_id"] = sweep_id
+
+        while True:
+            doc = await self.units.find_one_and_update(
+                query,
+                {
+                    "$set": {
+                        "state": UNIT_LEASED,
+                        "lease_owner": owner,
+                        "lease_expires_at": now + timedelta(seconds=self.lease_s)
+                    },
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("created_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if doc is None:
+                return None
+            unit = CrawlUnit.from_doc(doc)
+            if unit.attempts <= self.max_attempts:
+                return unit
+            # Every lease so far expired (the crawls died) - stop retrying
+            await self.fail(unit, "lease expired", now)
+
+    async def complete(self, unit: CrawlUnit, stats: Dict[str, int], now: datetime) -> bool:
+        """Record a finished unit; False if the lease was lost to another worker"""
+        result = await self.units.update_one(
+            {"_id": unit.id, "state": UNIT_LEASED, "lease_owner": unit.lease_owner},
+            {"$set": {"state": UNIT_DONE, "stats": stats, "finished_at": now, "error": None}}
+        )
+        return result.modified_count == 1
+
+    async def fail(self, unit: CrawlUnit, error: str, now: datetime) -> bool:
+        """Release a failed unit for another attempt, or give up on it"""
+        final = unit.attempts >= self.max_attempts
+        result = await self.units.update_one(
+            {"_id": unit.id, "state": UNIT_LEASED, "lease_owner": unit.lease_owner},
+            {"$set": {
+                "state": UNIT_FAILED if final else UNIT_PENDING,
+                "error": error[:500],
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "finished_at": now if final else None
+            }}
+        )
+        return result.modified_count == 1
+
+    # ========================================
+    # Status
+    # ========================================
+
+    async def running_sweeps(self) -> List[str]:
+        """Sweeps with units still pending or leased"""
+        return await self.units.distinct("sweep_id", {"state": {"$in": [UNIT_PENDING, UNIT_LEASED]}})
+
+    async def latest_sweep_id(self) -> Optional[str]:
+        doc = await self.sweeps.find_one({}, {"_id": 1}, sort=[("created_at", -1)])
+        return doc["_id"] if doc else None
+
+    async def sweep_status(self, sweep_id: str) -> Optional[Dict[str, Any]]:
+        """Unit counts per state and crawl stats per kind, summed over the units"""
+        sweep = await self.sweeps.find_one({"_id": sweep_id})
+        if sweep is None:
+            return None
+        group: Dict[str, Any] = {
+            "_id": {"kind": "$kind", "state": "$state"},
+            "units": {"$sum": 1},
+            "finished_at": {"$max": "$finished_at"}
+        }
+        for name in STAT_FIELDS:
+            group[name] = {"$sum": f"$stats.{name}"}
+        rows = await self.units.aggregate([
+            {"$match": {"sweep_id": sweep_id}},
+            {"$group": group}
+        ]).to_list(length=None)
+        return summarize_sweep(sweep, rows)
+
+    async def wait(self, sweep_id: str, timeout: float, poll_s: float = 2.0) -> bool:
+        """Wait until no unit of the sweep is pending or leased"""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            remaining = await self.units.count_documents(
+                {"sweep_id": sweep_id, "state": {"$in": [UNIT_PENDING, UNIT_LEASED]}}
+            )
+            if not remaining:
+                return True
+            if asyncio.get_running_loop().time() >= deadline:
+                return False
+            await asyncio.sleep(poll_s)
+
+
+def summarize_sweep(sweep: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sweep status from the ``$group`` rows of ``sweep_status``"""
+    units = {UNIT_PENDING: 0, UNIT_LEASED: 0, UNIT_DONE: 0, UNIT_FAILED: 0}
+    by_kind = {kind: {name: 0 for name in STAT_FIELDS} for kind in (KIND_KEYWORD, KIND_FEED)}
+    finished = [row["finished_at"] for row in rows if row.get("finished_at")]
+    for row in rows:
+        units[row["_id"]["state"]] = units.get(row["_id"]["state"], 0) + row["units"]
+        stats = by_kind.setdefault(row["_id"]["kind"], {name: 0 for name in STAT_FIELDS})
+        for name in STAT_FIELDS:
+            stats[name] += row.get(name) or 0
+
+    running = units[UNIT_PENDING] + units[UNIT_LEASED] > 0
+    google, direct = by_kind[KIND_KEYWORD], by_kind[KIND_FEED]
+    return {
+        "sweep_id": sweep["_id"],
+        "type": sweep.get("kind"),
+        "created_at": sweep.get("created_at"),
+        "running": running,
+        "units": units,
+        "google_news": google,
+        "direct_sources": direct,
+        "total": {
+            "fetched": google["total_fetched"] + direct["total_fetched"],
+            **{name: google[name] + direct[name] for name in STAT_FIELDS if name != "total_fetched"}
+        },
+        "completed_at": None if running or not finished else max(finished)
+    }
+
+
+class CrawlWorker:
+    """
+    Claims and crawls units until the queue is empty.
+
+    ``concurrency`` units are crawled at once per worker; more throughput
+    comes from more replicas, each claiming its own units.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[CrawlQueue] = None,
+        owner: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        run_unit: Optional[Callable[[CrawlUnit], Awaitable[Dict[str, int]]]] = None
+    ):
+        self.queue = queue or crawl_queue
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency or settings.crawl_worker_concurrency
+        self._run_unit = run_unit
+        self._service = None
+
+    async def drain(self, sweep_id: Optional[str] = None) -> int:
+        """Crawl claimable units (of one sweep, or any) until none is left"""
+        try:
+            done = await asyncio.gather(*[self._drain(sweep_id) for _ in range(self.concurrency)])
+        finally:
+            if self._service is not None:
+                await self._service.close()
+                self._service = None
+        return sum(done)
+
+    async def _drain(self, sweep_id: Optional[str]) -> int:
+        done = 0
+        while True:
+            unit = await self.queue.claim(self.owner, datetime.utcnow(), sweep_id)
+            if unit is None:
+                return done
+            try:
+                stats = await self.run(unit)
+            except Exception as e:
+                logger.error(f"Crawl unit {unit.id} failed (attempt {unit.attempts}): {e}")
+                await self.queue.fail(unit, str(e), datetime.utcnow())
+                continue
+            if await self.queue.complete(unit, stats, datetime.utcnow()):
+                done += 1
+            else:
+                logger.warning(f"Lease on {unit.id} expired before it finished")
+
+    async def run(self, unit: CrawlUnit) -> Dict[str, int]:
+        """Crawl one unit, returns its stats"""
+        if self._run_unit is not None:
+            return await self._run_unit(unit)
+
+        if self._service is None:
+            from mongodb.api.services.crawl_service import CrawlService
+            self._service = CrawlService()
+        if unit.kind == KIND_FEED:
+            result = await self._service.crawl_feed(unit.source, unit.target)
+            if result.get("fetch_failed"):
+                raise RuntimeError(f"could not fetch {unit.target}")
+        else:
+            result = await self._service.crawl_keyword(unit.target)
+        return {name: result.get(name, 0) for name in STAT_FIELDS}
+
+    async def run_forever(self, poll_s: Optional[float] = None):
+        """Crawler replicas: drain whatever is queued, then look again"""
+        poll_s = poll_s or settings.crawl_worker_poll_seconds
+        logger.info(f"🧺 Crawl worker {self.owner} waiting for units")
+        while True:
+            try:
+                if await self.drain():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Crawl worker error: {e}")
+            await asyncio.sleep(poll_s)
+
+
+crawl_queue = CrawlQueue()
@@ -0,0 +1,247 @@
+"""
+Adaptive Crawl Scheduler - lịch crawl riêng cho từng RSS feed
+
+Instead of polling every feed on one fixed interval, each feed is polled
+about as often as it publishes: the scheduler keeps an exponentially
+weighted estimate of the feed's item arrival rate (items/hour, learned from
+the entries' publish dates on each crawl) and waits until roughly
+``target_items`` new entries are expected. Busy feeds (vnexpress) are polled
+every few minutes, quiet ones (hanoimoi) every few hours. A feed that just
+produced a high-severity disaster is polled at the minimum interval for the
+boost period, to follow the story as it develops. A crawl that fails (the
+feed could not be fetched, or the crawl raised) leaves the learned rate
+alone and is retried with exponential backoff.
+
+Schedules are stored in the ``crawl_schedule`` collection; a due feed is
+claimed atomically by moving its ``next_due_at`` forward, so the API and
+the crawler container can both run the scheduler without polling a feed
+twice.
+"""
+
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from pymongo import ReturnDocument
+
+from mongodb.api.config.database import Database
+from mongodb.api.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_COLLECTION = "crawl_schedule"
+
+
+@dataclass
+class FeedSchedule:
+    """Polling state of one feed"""
+    url: str
+    source: str
+    rate_per_hour: float = 0.0  # EWMA of new entries per hour
+    interval_s: int = 0
+    next_due_at: Optional[datetime] = None  # naive UTC
+    last_crawled_at: Optional[datetime] = None
+    last_new_items: int = 0
+    boost_until: Optional[datetime] = None
+    crawls: int = 0
+    failures: int = 0  # consecutive failed crawls
+
+    def to_doc(self) -> Dict[str, Any]:
+        doc = asdict(self)
+        doc["_id"] = doc.pop("url")
+        return doc
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "FeedSchedule":
+        fields = {k: v for k, v in doc.items() if k in cls.__dataclass_fields__}
+        return cls(url=doc["_id"], **fields)
+
+
+class AdaptivePolicy:
+    """Turns crawl observations into the next polling interval (no I/O)"""
+
+    def __init__(
+        self,
+        target_items: Optional[float] = None,
+        min_interval_s: Optional[int] = None,
+        max_interval_s: Optional[int] = None,
+        initial_interval_s: Optional[int] = None,
+        boost_s: Optional[int] = None,
+        alpha: float = 0.3
+    ):
+        self.target_items = target_items or settings.crawl_target_items_per_poll
+        self.min_interval_s = min_interval_s or settings.crawl_min_interval_minutes * 60
+        self.max_interval_s = max_interval_s or settings.crawl_max_interval_minutes * 60
+        self.initial_interval_s = initial_interval_s or settings.crawl_interval_minutes * 60
+        self.boost_s = boost_s or settings.crawl_severity_boost_minutes * 60
+        self.alpha = alpha
+
+    def observe(
+        self,
+        schedule: FeedSchedule,
+        published: Iterable[datetime],
+        high_severity: int,
+        now: datetime,
+        incremental: bool = False
+    ) -> FeedSchedule:
+        """
+        Update ``schedule`` after a successful crawl at ``now`` (naive UTC).
+
+        ``incremental``: ``published`` only holds the entries that are new
+        since the last crawl (backdated ones included), so all of them count.
+        """
+        stamps = sorted(_epoch(p) for p in published if p)
+        now_ts = _epoch(now)
+
+        if schedule.last_crawled_at is not None:
+            since = _epoch(schedule.last_crawled_at)
+            if incremental:
+                new_items = len(stamps)
+            else:
+                new_items = sum(1 for t in stamps if since < t <= now_ts)
+            sample = new_items / max((now_ts - since) / 3600, 1 / 60)
+        else:
+            # First crawl: spacing of the entries the feed currently lists
+            new_items = len(stamps)
+            span_h = (stamps[-1] - stamps[0]) / 3600 if len(stamps) > 1 else 0
+            sample = (len(stamps) - 1) / span_h if span_h > 0 else 0.0
+
+        if schedule.crawls == 0:
+            schedule.rate_per_hour = sample
+        else:
+            schedule.rate_per_hour = self.alpha * sample + (1 - self.alpha) * schedule.rate_per_hour
+
+        if high_severity:
+            schedule.boost_until = now + timedelta(seconds=self.boost_s)
+
+        schedule.interval_s = self.interval_for(schedule, now)
+        schedule.next_due_at = now + timedelta(seconds=schedule.interval_s)
+        schedule.last_crawled_at = now
+        schedule.last_new_items = new_items
+        schedule.crawls += 1
+        schedule.failures = 0
+        return schedule
+
+    def backoff(self, schedule: FeedSchedule, now: datetime) -> FeedSchedule:
+        """Retry a failed crawl later; the learned rate and interval are kept"""
+        schedule.failures += 1
+        delay = min(self.max_interval_s, self.min_interval_s * 2 ** (schedule.failures - 1))
+        schedule.next_due_at = now + timedelta(seconds=delay)
+        return schedule
+
+    def interval_for(self, schedule: FeedSchedule, now: datetime) -> int:
+        """Seconds until about ``target_items`` new entries are expected"""
+        if schedule.boost_until and schedule.boost_until > now:
+            return self.min_interval_s
+        if schedule.rate_per_hour <= 0:
+            return self.max_interval_s
+        interval = self.target_items / schedule.rate_per_hour * 3600
+        return int(min(self.max_interval_s, max(self.min_interval_s, interval)))
+
+
+class AdaptiveCrawlScheduler:
+    """Crawls the feeds that are due according to their learned rate"""
+
+    def __init__(self, policy: Optional[AdaptivePolicy] = None):
+        self.policy = policy or AdaptivePolicy()
+
+    @property
+    def collection(self):
+        return Database.get_db()[SCHEDULE_COLLECTION]
+
+    def feeds(self) -> List[Tuple[str, str]]:
+        """(source key, feed URL) of every direct RSS feed"""
+        from mongodb.api.services.crawl_service import direct_feeds
+        return direct_feeds()
+
+    async def ensure_schedules(self, now: datetime):
+        """Create schedules for new feeds, staggered over the initial interval"""
+        feeds = self.feeds()
+        existing = set(await self.collection.distinct("_id"))
+        missing = [(key, url) for key, url in feeds if url not in existing]
+        for i, (key, url) in enumerate(missing):
+            offset = self.policy.initial_interval_s * i / max(len(missing), 1)
+            schedule = FeedSchedule(
+                url=url,
+                source=key,
+                interval_s=self.policy.initial_interval_s,
+                next_due_at=now + timedelta(seconds=offset)
+            )
+            await self.collection.update_one(
+                {"_id": url}, {"$setOnInsert": schedule.to_doc()}, upsert=True
+            )
+
+    async def claim(self, url: str, now: datetime) -> Optional[FeedSchedule]:
+        """Take a due feed; other runners skip it until the claim expires"""
+        doc = await self.collection.find_one_and_update(
+            {"_id": url, "next_due_at": {"$lte": now}},
+            {"$set": {"next_due_at": now + timedelta(seconds=settings.crawl_claim_timeout_s)}},
+            return_document=ReturnDocument.BEFORE
+        )
+        return FeedSchedule.from_doc(doc) if doc else None
+
+    async def run_due(self, max_feeds: Optional[int] = None) -> Dict[str, Any]:
+        """Crawl every feed whose ``next_due_at`` has passed"""
+        from mongodb.api.services.crawl_service import CrawlService
+
+        now = datetime.utcnow()
+        await self.ensure_schedules(now)
+        cursor = self.collection.find({"next_due_at": {"$lte": now}}, {"_id": 1}).sort("next_due_at", 1)
+        due = [doc["_id"] for doc in await cursor.to_list(length=max_feeds)]
+
+        summary = {"due": len(due), "crawled": 0, "stored": 0, "high_severity": 0, "errors": 0}
+        if not due:
+            return summary
+
+        service = CrawlService()
+        try:
+            for url in due:
+                schedule = await self.claim(url, datetime.utcnow())
+                if schedule is None:
+                    continue  # taken by another runner
+                try:
+                    result = await service.crawl_feed(schedule.source, url, incremental=True)
+                except Exception as e:
+                    logger.error(f"Adaptive crawl of {url} failed: {e}")
+                    result = None
+
+                if result is None or result.get("fetch_failed"):
+                    # Not an empty feed: keep the rate, try again soon
+                    summary["errors"] += 1
+                    schedule = self.policy.backoff(schedule, datetime.utcnow())
+                    await self.collection.replace_one({"_id": url}, schedule.to_doc(), upsert=True)
+                    logger.warning(f"Crawl of {url} failed {schedule.failures}x, retrying at {schedule.next_due_at}")
+                    continue
+
+                schedule = self.policy.observe(
+                    schedule, result["published"], result["high_severity"], datetime.utcnow(), incremental=True
+                )
+                await self.collection.replace_one({"_id": url}, schedule.to_doc(), upsert=True)
+
+                summary["crawled"] += 1
+                summary["stored"] += result.get("stored", 0)
+                summary["high_severity"] += result["high_severity"]
+                logger.info(
+                    f"Crawled {url}: {schedule.last_new_items} new, "
+                    f"{schedule.rate_per_hour:.2f}/h, next in {schedule.interval_s // 60} min"
+                )
+        finally:
+            await service.close()
+
+        return summary
+
+    async def get_schedules(self) -> List[Dict[str, Any]]:
+        """All feed schedules, soonest first"""
+        cursor = self.collection.find().sort("next_due_at", 1)
+        return [asdict(FeedSchedule.from_doc(doc)) for doc in await cursor.to_list(length=None)]
+
+
+def _epoch(value: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+adaptive_scheduler = AdaptiveCrawlScheduler()
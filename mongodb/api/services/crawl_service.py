@@ -16,7 +16,7 @@ Hỗ trợ:
 import feedparser
 import asyncio
 import aiohttp
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime, timedelta
 from urllib.parse import quote, urljoin
 import logging
@@ -28,7 +28,15 @@ from newspaper import Article as NewspaperArticle
 from newspaper import Config as NewspaperConfig
 
 from mongodb.api.config.database import Database
+from mongodb.api.config.settings import settings
 from mongodb.api.services.classification_service import ClassificationService
+from mongodb.api.services.cache_service import invalidate_tags, ARTICLE_WRITE_TAGS
+from mongodb.api.services.event_bus import EventBus
+from mongodb.api.services.crawl_queue import CrawlWorker, crawl_queue, sweep_units
+from mongodb.api.services.feed_reader import FeedCheckpoint, FeedCheckpointStore, ReadResult, read_new_items
+from mongodb.api.services.event_service import event_service
+from mongodb.api.services.story_index import signature as story_signature, story_index
+from mongodb.api.websockets.hub import EVENT_NEW_DISASTER
 
 logger = logging.getLogger(__name__)
 
@@ -163,6 +171,12 @@ DIRECT_RSS_SOURCES = {
     },
 }
 
+
+def direct_feeds(sources: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """(source key, feed URL) of every feed of the given direct sources (default: all)"""
+    keys = sources or list(DIRECT_RSS_SOURCES.keys())
+    return [(key, url) for key in keys for url in DIRECT_RSS_SOURCES[key]['rss_urls']]
+
 # Newspaper3k configuration for Vietnamese
 NEWSPAPER_CONFIG = NewspaperConfig()
 NEWSPAPER_CONFIG.browser_user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -211,7 +225,12 @@ class ClassifiedArticle(ExtractedArticle):
     severity: Optional[str] = None
     confidence: float = 0.0
     region: Optional[str] = None
+    provinces: List[str] = field(default_factory=list)  # most mentioned first
+    province: Optional[str] = None
     matched_keywords: List[str] = field(default_factory=list)
+    details: Dict[str, Any] = field(default_factory=dict)  # casualty figures
+    story_id: Optional[str] = None  # shared by near-duplicate copies of one story
+    story_signature: Optional[List[int]] = None  # MinHash of title + lead
 
 
 # =====================================================
@@ -233,6 +252,14 @@ class CrawlService:
     def __init__(self):
         self.classifier = ClassificationService()
         self.session: Optional[aiohttp.ClientSession] = None
+        # Stored disasters are announced on the event bus in batches
+        self.events = EventBus()
+        # Per-feed high-water marks for incremental crawls
+        self.checkpoints = FeedCheckpointStore()
+        # Near-duplicate detection across outlets
+        self.stories = story_index
+        # Disaster events the stored articles are folded into
+        self.event_aggregator = event_service
         
     @property
     def db(self):
@@ -255,7 +282,8 @@ class CrawlService:
         return self.session
     
     async def close(self):
-        """Close aiohttp session"""
+        """Flush pending bus events and close aiohttp session"""
+        await self.events.flush()
         if self.session and not self.session.closed:
             await self.session.close()
     
@@ -328,30 +356,107 @@ class CrawlService:
             return articles
         
         for rss_url in source_config['rss_urls']:
-            try:
-                session = await self._get_session()
-                async with session.get(rss_url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        feed = feedparser.parse(content)
-                        
-                        for entry in feed.entries[:30]:  # Limit 30 per feed
-                            raw = RawArticle(
-                                url=entry.get('link', ''),
-                                title=entry.get('title', ''),
-                                source=source_config['domain'],
-                                published_date=self._parse_date(entry.get('published', '')),
-                                summary=entry.get('summary', ''),
-                                rss_source='direct_rss'
-                            )
-                            articles.append(raw)
-                            
-            except Exception as e:
-                logger.error(f"Error fetching RSS from {rss_url}: {e}")
+            articles.extend(await self.fetch_feed(source_config, rss_url) or [])
         
         logger.info(f"Fetched {len(articles)} articles from {source_config['name']}")
         return articles
     
+    async def fetch_feed(self, source_config: Dict[str, Any], rss_url: str) -> Optional[List[RawArticle]]:
+        """
+        Fetch one RSS feed of a direct source
+        
+        Args:
+            source_config: Entry of DIRECT_RSS_SOURCES
+            rss_url: Feed URL
+            
+        Returns:
+            List of RawArticle, None if the feed could not be fetched
+        """
+        articles = []
+        try:
+            session = await self._get_session()
+            async with session.get(rss_url) as response:
+                if response.status != 200:
+                    logger.error(f"Error fetching RSS from {rss_url}: HTTP {response.status}")
+                    return None
+                content = await response.text()
+                feed = feedparser.parse(content)
+                
+                for entry in feed.entries[:30]:  # Limit 30 per feed
+                    raw = RawArticle(
+                        url=entry.get('link', ''),
+                        title=entry.get('title', ''),
+                        source=source_config['domain'],
+                        published_date=self._parse_date(entry.get('published', '')),
+                        summary=entry.get('summary', ''),
+                        rss_source='direct_rss'
+                    )
+                    articles.append(raw)
+                    
+        except Exception as e:
+            logger.error(f"Error fetching RSS from {rss_url}: {e}")
+            return None
+        
+        return articles
+    
+    async def fetch_feed_incremental(
+        self,
+        source_config: Dict[str, Any],
+        rss_url: str
+    ) -> Tuple[List[RawArticle], Optional[FeedCheckpoint], Optional[ReadResult]]:
+        """
+        Fetch only the entries added since the feed's last checkpoint
+        
+        Args:
+            source_config: Entry of DIRECT_RSS_SOURCES
+            rss_url: Feed URL
+            
+        Returns:
+            (new RawArticles, checkpoint, read result) - pass the last two
+            to _advance_checkpoint once the articles are processed. Both
+            are None if the feed could not be read.
+        """
+        try:
+            checkpoint = await self.checkpoints.get(rss_url)
+            session = await self._get_session()
+            result = await read_new_items(session, rss_url, checkpoint, limit=30, parse_date=self._parse_date)
+        except Exception as e:
+            logger.error(f"Error fetching RSS from {rss_url}: {e}")
+            return [], None, None
+        
+        articles = [
+            RawArticle(
+                url=item.link,
+                title=item.title,
+                source=source_config['domain'],
+                published_date=published,
+                summary=item.summary,
+                rss_source='direct_rss'
+            )
+            for item, published in zip(result.items, result.published)
+            if item.link
+        ]
+        if result.not_modified:
+            logger.debug(f"{rss_url} not modified")
+        else:
+            logger.debug(
+                f"{rss_url}: {len(articles)} new entries, {result.bytes_read} bytes read"
+                f"{' (stopped at last seen entry)' if result.stopped_early else ''}"
+            )
+        return articles, checkpoint, result
+    
+    async def _advance_checkpoint(self, checkpoint: FeedCheckpoint, result: ReadResult, failed_urls: Iterable[str]):
+        """Move the feed's mark past the entries that did not fail, then save it"""
+        if result.not_modified:
+            return
+        failed_urls = set(failed_urls)
+        failed = [item.guid for item in result.items if item.link and item.link in failed_urls]
+        checkpoint.advance(
+            result.items, result.published, failed=failed,
+            etag=result.etag, last_modified=result.last_modified
+        )
+        await self.checkpoints.save(checkpoint)
+    
     # -------------------------------------------------
     # CONTENT EXTRACTION
     # -------------------------------------------------
@@ -455,7 +560,10 @@ class CrawlService:
             severity=result.severity,
             confidence=result.confidence,
             region=result.region,
-            matched_keywords=result.matched_keywords
+            provinces=result.provinces,
+            province=result.province,
+            matched_keywords=result.matched_keywords,
+            details=result.details
         )
         
         return classified
@@ -475,32 +583,46 @@ class CrawlService:
             True if stored successfully, False if duplicate or error
         """
         try:
-            # Check for duplicate
-            existing = await self.articles_collection.find_one({"url": article.url})
-            if existing:
-                logger.debug(f"Duplicate article: {article.url}")
-                return False
-            
-            # Convert to dict
-            doc = asdict(article)
-            
-            # Add metadata
-            doc['_id'] = self._generate_id(article.url)
-            doc['created_at'] = datetime.now()
-            
-            # Convert datetime to string for MongoDB
-            if doc.get('publish_date'):
-                doc['publish_date'] = doc['publish_date'].isoformat() if isinstance(doc['publish_date'], datetime) else doc['publish_date']
-            if doc.get('collected_at'):
-                doc['collected_at'] = doc['collected_at'].isoformat() if isinstance(doc['collected_at'], datetime) else doc['collected_at']
-            
-            await self.articles_collection.insert_one(doc)
-            logger.info(f"Stored article: {article.title[:50]}... (disaster={article.is_disaster})")
-            return True
-            
+            stored = await self._insert_article(article)
         except Exception as e:
             logger.error(f"Error storing article: {e}")
             return False
+        if stored:
+            await invalidate_tags(*ARTICLE_WRITE_TAGS)
+        return stored
+    
+    async def _insert_article(self, article: ClassifiedArticle) -> bool:
+        """
+        Insert article; False for a duplicate, raises on database errors.
+        Cache tags are left to the caller (bumped once per batch).
+        """
+        # Check for duplicate
+        existing = await self.articles_collection.find_one({"url": article.url})
+        if existing:
+            logger.debug(f"Duplicate article: {article.url}")
+            return False
+        
+        # Convert to dict
+        doc = asdict(article)
+        
+        # Add metadata
+        doc['_id'] = self._generate_id(article.url)
+        doc['created_at'] = datetime.now()
+        
+        # Convert datetime to string for MongoDB
+        if doc.get('publish_date'):
+            doc['publish_date'] = doc['publish_date'].isoformat() if isinstance(doc['publish_date'], datetime) else doc['publish_date']
+        if doc.get('collected_at'):
+            doc['collected_at'] = doc['collected_at'].isoformat() if isinstance(doc['collected_at'], datetime) else doc['collected_at']
+        
+        if article.is_disaster:
+            doc['event_id'] = await self.event_aggregator.assign(doc)
+        
+        await self.articles_collection.insert_one(doc)
+        if article.is_disaster:
+            await self.events.add(EVENT_NEW_DISASTER, self._event_data(doc))
+        logger.info(f"Stored article: {article.title[:50]}... (disaster={article.is_disaster})")
+        return True
     
     # -------------------------------------------------
     # MAIN CRAWL METHODS
@@ -541,46 +663,54 @@ class CrawlService:
         logger.info(f"Total unique articles from Google News: {len(all_raw_articles)}")
         
         # Process each article
-        for url, raw in all_raw_articles.items():
-            try:
-                # Quick pre-filter: check title for disaster keywords
-                if not self._quick_disaster_check(raw.title + " " + raw.summary):
-                    continue
-                
-                # Extract full content
-                extracted = await self.extract_article_content(raw)
-                if not extracted or not extracted.text:
-                    stats['errors'] += 1
-                    continue
-                stats['extracted'] += 1
-                
-                # Classify
-                classified = await self.classify_article(extracted)
-                
-                # Only store disaster articles (or high confidence)
-                if classified.is_disaster or classified.confidence > 0.3:
-                    stats['disasters'] += 1
-                    
-                    stored = await self.store_article(classified)
-                    if stored:
-                        stats['stored'] += 1
-                    else:
-                        stats['duplicates'] += 1
-                
-                await asyncio.sleep(0.5)  # Be nice to servers
-                
-            except Exception as e:
-                logger.error(f"Error processing {url}: {e}")
-                stats['errors'] += 1
+        try:
+            await self._process_articles(all_raw_articles.values(), stats, delay=0.5)
+        finally:
+            # Endpoints call this without close() - announce the run's disasters now
+            await self.events.flush()
+        
+        return stats
+    
+    async def crawl_keyword(self, keyword: str) -> Dict[str, int]:
+        """
+        Crawl the Google News results of one keyword (a crawl queue unit)
+        
+        Args:
+            keyword: Từ khóa tìm kiếm
+            
+        Returns:
+            Stats dict with counts
+        """
+        stats = {
+            'total_fetched': 0,
+            'extracted': 0,
+            'disasters': 0,
+            'stored': 0,
+            'duplicates': 0,
+            'errors': 0
+        }
+        raw_articles = await self.fetch_google_news_rss(keyword)
+        stats['total_fetched'] = len(raw_articles)
+        
+        try:
+            await self._process_articles(raw_articles, stats, delay=0.5)
+        finally:
+            await self.events.flush()
         
         return stats
     
-    async def crawl_direct_sources(self, sources: Optional[List[str]] = None) -> Dict[str, int]:
+    async def crawl_direct_sources(
+        self,
+        sources: Optional[List[str]] = None,
+        incremental: bool = False
+    ) -> Dict[str, int]:
         """
         Crawl from direct RSS sources
         
         Args:
             sources: List of source keys, or None for all
+            incremental: Only read entries added since each feed's last
+                checkpoint (checkpoints are saved after processing)
             
         Returns:
             Stats dict
@@ -596,10 +726,21 @@ class CrawlService:
         
         source_keys = sources or list(DIRECT_RSS_SOURCES.keys())
         all_raw_articles: Dict[str, RawArticle] = {}
+        reads: List[Tuple[FeedCheckpoint, ReadResult]] = []
         
         # Fetch from each source
         for source_key in source_keys:
-            raw_articles = await self.fetch_direct_rss(source_key)
+            if incremental and source_key in DIRECT_RSS_SOURCES:
+                raw_articles = []
+                for rss_url in DIRECT_RSS_SOURCES[source_key]['rss_urls']:
+                    new_articles, checkpoint, result = await self.fetch_feed_incremental(
+                        DIRECT_RSS_SOURCES[source_key], rss_url
+                    )
+                    raw_articles.extend(new_articles)
+                    if result:
+                        reads.append((checkpoint, result))
+            else:
+                raw_articles = await self.fetch_direct_rss(source_key)
             for raw in raw_articles:
                 if raw.url not in all_raw_articles:
                     all_raw_articles[raw.url] = raw
@@ -610,43 +751,154 @@ class CrawlService:
         logger.info(f"Total unique articles from direct sources: {len(all_raw_articles)}")
         
         # Process each article
-        for url, raw in all_raw_articles.items():
+        try:
+            _, failed = await self._process_articles(all_raw_articles.values(), stats, delay=0.3)
+        finally:
+            # Endpoints call this without close() - announce the run's disasters now
+            await self.events.flush()
+        
+        for checkpoint, result in reads:
+            await self._advance_checkpoint(checkpoint, result, failed)
+        
+        return stats
+    
+    async def crawl_feed(self, source_key: str, rss_url: str, incremental: bool = False) -> Dict[str, Any]:
+        """
+        Crawl a single feed of a direct source (used by the adaptive scheduler)
+        
+        Args:
+            source_key: Key from DIRECT_RSS_SOURCES
+            rss_url: Feed URL
+            incremental: Only read entries added since the last checkpoint
+            
+        Returns:
+            Stats dict plus the feed entries' publish dates, the number of
+            stored high-severity disasters and ``fetch_failed`` when the feed
+            could not be read
+        """
+        stats = {
+            'total_fetched': 0,
+            'extracted': 0,
+            'disasters': 0,
+            'stored': 0,
+            'duplicates': 0,
+            'errors': 0
+        }
+        source_config = DIRECT_RSS_SOURCES.get(source_key)
+        if not source_config:
+            logger.warning(f"Unknown source: {source_key}")
+            return {**stats, 'published': [], 'high_severity': 0, 'fetch_failed': True}
+        
+        result = None
+        if incremental:
+            raw_articles, checkpoint, result = await self.fetch_feed_incremental(source_config, rss_url)
+            fetch_failed = result is None
+        else:
+            raw_articles = await self.fetch_feed(source_config, rss_url)
+            fetch_failed = raw_articles is None
+        if fetch_failed:
+            return {**stats, 'published': [], 'high_severity': 0, 'fetch_failed': True}
+        stats['total_fetched'] = len(raw_articles)
+        
+        try:
+            stored, failed = await self._process_articles(raw_articles, stats, delay=0.3)
+        finally:
+            await self.events.flush()
+        
+        if result:
+            await self._advance_checkpoint(checkpoint, result, failed)
+        
+        return {
+            **stats,
+            'published': [raw.published_date for raw in raw_articles if raw.published_date],
+            'high_severity': sum(1 for a in stored if a.is_disaster and a.severity == "high"),
+            'fetch_failed': False
+        }
+    
+    async def _process_articles(
+        self,
+        raw_articles: Iterable[RawArticle],
+        stats: Dict[str, int],
+        delay: float = 0.3
+    ) -> Tuple[List[ClassifiedArticle], List[str]]:
+        """
+        Pre-filter, extract, classify and store articles, updating ``stats``
+        
+        Returns:
+            (newly stored articles, URLs that failed and should be retried).
+            Articles rejected by the pre-filter or the threshold and
+            duplicates are not failures.
+        """
+        stored_articles = []
+        failed_urls = []
+        try:
+            # Pick up the stories other crawlers stored since the last run
+            await self.stories.sync(self.articles_collection)
+        except Exception as e:
+            logger.warning(f"Story index sync failed: {e}")
+        
+        for raw in raw_articles:
             try:
-                # Quick pre-filter
+                # Quick pre-filter: check title for disaster keywords
                 if not self._quick_disaster_check(raw.title + " " + raw.summary):
                     continue
                 
-                # Extract content
+                # Near-duplicate of a recent story (same event, another outlet)?
+                signature = story_signature(self._story_title(raw), raw.summary)
+                story_id = self.stories.match(signature) if signature else None
+                if story_id and settings.story_skip_near_duplicates:
+                    logger.debug(f"Near-duplicate of story {story_id}: {raw.url}")
+                    stats['duplicates'] += 1
+                    continue
+                
+                # Extract full content
                 extracted = await self.extract_article_content(raw)
                 if not extracted or not extracted.text:
                     stats['errors'] += 1
+                    failed_urls.append(raw.url)
                     continue
                 stats['extracted'] += 1
                 
                 # Classify
                 classified = await self.classify_article(extracted)
                 
+                # Only store disaster articles (or high confidence)
                 if classified.is_disaster or classified.confidence > 0.3:
                     stats['disasters'] += 1
                     
-                    stored = await self.store_article(classified)
+                    article_id = self._generate_id(classified.url)
+                    classified.story_id = story_id or article_id
+                    classified.story_signature = signature
+                    stored = await self._insert_article(classified)
                     if stored:
                         stats['stored'] += 1
+                        stored_articles.append(classified)
+                        if signature:
+                            self.stories.add(article_id, classified.story_id, signature)
                     else:
                         stats['duplicates'] += 1
                 
-                await asyncio.sleep(0.3)
+                await asyncio.sleep(delay)  # Be nice to servers
                 
             except Exception as e:
-                logger.error(f"Error processing {url}: {e}")
+                logger.error(f"Error processing {raw.url}: {e}")
                 stats['errors'] += 1
+                failed_urls.append(raw.url)
         
-        return stats
+        # One tag bump for the whole run instead of one per article
+        if stored_articles:
+            await invalidate_tags(*ARTICLE_WRITE_TAGS)
+        
+        return stored_articles, failed_urls
     
-    async def crawl_all(self) -> Dict[str, Any]:
+    async def crawl_all(self, include_direct: bool = True) -> Dict[str, Any]:
         """
         Full crawl from all sources
         
+        Args:
+            include_direct: Also crawl the direct RSS sources (skipped when
+                the adaptive scheduler polls them)
+        
         Returns:
             Combined stats from all sources
         """
@@ -658,7 +910,10 @@ class CrawlService:
             google_stats = await self.crawl_google_news(max_keywords=10)
             
             # Crawl direct sources
-            direct_stats = await self.crawl_direct_sources()
+            if include_direct:
+                direct_stats = await self.crawl_direct_sources()
+            else:
+                direct_stats = {key: 0 for key in google_stats}
             
             # Combine stats
             combined_stats = {
@@ -686,6 +941,22 @@ class CrawlService:
     # HELPER METHODS
     # -------------------------------------------------
     
+    def _event_data(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Payload of a new_disaster event (same fields as the pipeline's)"""
+        return {
+            "id": doc["_id"],
+            "title": doc.get("title"),
+            "source": doc.get("source"),
+            "url": doc.get("url"),
+            "disaster_type": doc.get("disaster_type"),
+            "severity": doc.get("severity"),
+            "region": doc.get("region"),
+            "confidence": doc.get("confidence"),
+            "matched_keywords": doc.get("matched_keywords", []),
+            "published_at": doc.get("publish_date"),
+            "processed_at": doc["created_at"].isoformat()
+        }
+    
     def _extract_google_news_url(self, google_url: str) -> Optional[str]:
         """Extract actual article URL from Google News redirect URL"""
         # Google News URLs look like: https://news.google.com/rss/articles/CBMi...
@@ -744,6 +1015,12 @@ class CrawlService:
             logger.debug(f"Could not extract URL from Google News: {e}")
             return google_url
     
+    def _story_title(self, raw: RawArticle) -> str:
+        """Title without the outlet name Google News appends"""
+        if raw.rss_source == 'google_news' and ' - ' in raw.title:
+            return raw.title.rsplit(' - ', 1)[0]
+        return raw.title
+    
     def _extract_source_from_title(self, title: str) -> str:
         """Extract source name from Google News title (usually at the end)"""
         # Google News titles format: "Article Title - Source Name"
@@ -807,18 +1084,37 @@ class DailyCrawlService:
     def db(self):
         return Database.get_db()
     
-    async def crawl_all_sources(self) -> Dict[str, Any]:
+    async def crawl_all_sources(self, include_direct: bool = True) -> Dict[str, Any]:
         """
         Execute full daily crawl
         Called by scheduler at 00:05
+        
+        The crawl is a sweep in the crawl queue: this process works on it
+        alongside any crawl-worker replicas, then waits for their units.
+        The sweep id is the date, so the API and crawler schedulers join
+        the same sweep instead of crawling twice.
+        
+        Args:
+            include_direct: Also crawl the direct RSS sources
         """
         logger.info("🌐 Starting daily crawl job...")
         
         try:
-            stats = await self.crawl_service.crawl_all()
+            sweep_id = f"daily-{datetime.utcnow():%Y-%m-%d}"
+            units = sweep_units(
+                sweep_id,
+                keywords=DISASTER_SEARCH_KEYWORDS[:10],
+                feeds=direct_feeds() if include_direct else ()
+            )
+            created = await crawl_queue.enqueue(sweep_id, "daily_crawl", units)
+            
+            await CrawlWorker().drain(sweep_id)
+            await crawl_queue.wait(sweep_id, timeout=settings.crawl_claim_timeout_s)
+            stats = await crawl_queue.sweep_status(sweep_id)
             
-            # Store crawl stats
-            await self._store_crawl_stats(stats)
+            # Store crawl stats (once, by the scheduler that created the sweep)
+            if created:
+                await self._store_crawl_stats(stats)
             
             logger.info(f"✅ Daily crawl completed: {stats['total']['stored']} new articles")
             return stats
@@ -827,12 +1123,34 @@ class DailyCrawlService:
             logger.error(f"❌ Daily crawl failed: {e}")
             return {'error': str(e)}
     
-    async def _store_crawl_stats(self, stats: Dict[str, Any]):
+    async def crawl_source(self, source: str, mode: str = "full") -> Dict[str, Any]:
+        """
+        Crawl one direct source on demand
+        
+        Args:
+            source: Key from DIRECT_RSS_SOURCES
+            mode: "full" (first entries of every feed) or "incremental"
+                (only entries added since the last crawl)
+        """
+        if source not in DIRECT_RSS_SOURCES:
+            raise ValueError(f"Unknown source: {source}. Valid sources: {list(DIRECT_RSS_SOURCES.keys())}")
+        if mode not in ("full", "incremental"):
+            raise ValueError(f"Unknown crawl mode: {mode}")
+        
+        try:
+            stats = await self.crawl_service.crawl_direct_sources([source], incremental=mode == "incremental")
+        finally:
+            await self.crawl_service.close()
+        
+        await self._store_crawl_stats(stats, crawl_type=f"{mode}_crawl:{source}")
+        return stats
+    
+    async def _store_crawl_stats(self, stats: Dict[str, Any], crawl_type: str = 'daily_crawl'):
         """Store crawl statistics for monitoring"""
         try:
             collection = self.db['crawl_logs']
             await collection.insert_one({
-                'type': 'daily_crawl',
+                'type': crawl_type,
                 'stats': stats,
                 'timestamp': datetime.now()
             })
@@ -0,0 +1,357 @@
+"""
+Event Bus - durable ingest events over Redis Streams
+
+Pub/sub channels drop whatever is published while a worker is restarting.
+Producers (pipeline, crawler container) append events to one stream with
+batched XADD, trimmed by approximate MAXLEN. API workers read it through a
+consumer group with XREADGROUP and ACK after handling, so an event is
+handled by exactly one worker at least once; entries left pending by a
+crashed worker are claimed by the others (XAUTOCLAIM).
+
+Without Redis, events are published straight to the in-process realtime hub.
+An API worker keeps doing so until its own consumer is reading: a consumer
+group created later starts after any entry written before it.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+
+from redis.exceptions import ResponseError
+
+from mongodb.api.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between reconnect attempts once Redis was found unavailable
+RECONNECT_INTERVAL = 30
+
+
+@dataclass
+class BusMessage:
+    """One stream entry"""
+    id: str
+    event: str
+    data: Any
+
+
+class EventBus:
+    """
+    Producer/consumer helper for one stream.
+
+    ``add`` buffers events and writes them in one pipelined XADD batch once
+    ``batch_size`` are pending (or on ``flush``); ``publish_many`` writes
+    immediately.
+    """
+
+    # Shared by all instances: when to try connecting to Redis again
+    _retry_at: float = 0.0
+    # Shared: set while this process's realtime consumer is not reading yet;
+    # publishing fails over to the local hub meanwhile
+    local_only: bool = False
+
+    def __init__(
+        self,
+        stream: Optional[str] = None,
+        maxlen: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        client: Any = None,
+        approximate: bool = True
+    ):
+        self.stream = stream or settings.event_bus_stream
+        self.maxlen = maxlen or settings.event_bus_maxlen
+        self.batch_size = batch_size or settings.event_bus_batch_size
+        self.approximate = approximate
+        self._client = client
+        self._buffer: List[Tuple[str, Any]] = []
+
+    # ========================================
+    # Connection
+    # ========================================
+
+    async def get_client(self):
+        """Redis client (connects lazily - the crawler container has no startup hook)"""
+        if self._client is not None:
+            return self._client
+
+        from mongodb.api.services.redis_service import RedisService
+        try:
+            return RedisService.get_client()
+        except RuntimeError:
+            pass
+
+        if time.monotonic() < EventBus._retry_at:
+            raise RuntimeError("Redis unavailable")
+        try:
+            await RedisService.connect()
+        except Exception:
+            EventBus._retry_at = time.monotonic() + RECONNECT_INTERVAL
+            raise
+        return RedisService.get_client()
+
+    # ========================================
+    # Producing
+    # ========================================
+
+    async def publish(self, event: str, data: Any) -> str:
+        """Append one event, returns its stream id"""
+        return (await self.publish_many([(event, data)]))[0]
+
+    async def publish_many(self, events: Sequence[Tuple[str, Any]]) -> List[str]:
+        """Append events with one pipelined round trip"""
+        if not events:
+            return []
+        if EventBus.local_only:
+            raise RuntimeError("event bus consumer not running")
+        client = await self.get_client()
+        pipe = client.pipeline(transaction=False)
+        for event, data in events:
+            pipe.xadd(
+                self.stream,
+                {"event": event, "data": json.dumps(data, default=str, ensure_ascii=False)},
+                maxlen=self.maxlen,
+                approximate=self.approximate
+            )
+        return await pipe.execute()
+
+    async def add(self, event: str, data: Any):
+        """Buffer an event; writes the batch once ``batch_size`` are pending"""
+        self._buffer.append((event, data))
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write buffered events. If Redis is unavailable they are published to
+        the local realtime hub instead (no-op in processes without clients).
+        """
+        events, self._buffer = self._buffer, []
+        if not events:
+            return 0
+        try:
+            await self.publish_many(events)
+        except Exception as e:
+            logger.warning(f"Event bus unavailable ({e}) - publishing {len(events)} events locally")
+            from mongodb.api.websockets.hub import publish_event
+            for event, data in events:
+                await publish_event(event, data)
+        return len(events)
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    # ========================================
+    # Consuming
+    # ========================================
+
+    async def ensure_group(self, group: str, start_id: str = "$"):
+        """Create the consumer group (and the stream) if missing"""
+        client = await self.get_client()
+        try:
+            await client.xgroup_create(self.stream, group, id=start_id, mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(
+        self,
+        group: str,
+        consumer: str,
+        count: Optional[int] = None,
+        block_ms: Optional[int] = None,
+        from_id: str = ">"
+    ) -> List[BusMessage]:
+        """
+        XREADGROUP. ``from_id=">"`` reads new entries; any other id re-reads
+        this consumer's own pending entries after that id.
+        """
+        client = await self.get_client()
+        response = await client.xreadgroup(
+            group, consumer, {self.stream: from_id},
+            count=count or self.batch_size, block=block_ms
+        )
+        if isinstance(response, dict):
+            entries = [e for stream_entries in response.values() for e in stream_entries[0]]
+        else:
+            entries = [e for _, stream_entries in response or [] for e in stream_entries]
+        return _parse(entries)
+
+    async def claim_stale(
+        self,
+        group: str,
+        consumer: str,
+        min_idle_ms: Optional[int] = None,
+        count: Optional[int] = None
+    ) -> List[BusMessage]:
+        """Take over entries pending longer than ``min_idle_ms`` on any consumer"""
+        client = await self.get_client()
+        response = await client.xautoclaim(
+            self.stream, group, consumer,
+            min_idle_time=min_idle_ms or settings.event_bus_claim_idle_ms,
+            start_id="0-0",
+            count=count or self.batch_size
+        )
+        return _parse(response[1] if response else [])
+
+    async def ack(self, group: str, ids: Sequence[str]) -> int:
+        if not ids:
+            return 0
+        client = await self.get_client()
+        return await client.xack(self.stream, group, *ids)
+
+
+class EventBusConsumer:
+    """
+    Background task feeding stream entries to a batch handler.
+
+    Entries are ACKed only after the handler returns; a failed batch stays
+    pending and is picked up again by ``claim_stale`` after the idle timeout.
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        group: str,
+        handler: Callable[[List[BusMessage]], Awaitable[None]],
+        consumer: Optional[str] = None,
+        block_ms: Optional[int] = None
+    ):
+        self.bus = bus
+        self.group = group
+        self.handler = handler
+        # Stable per process; after a restart the old name's pending
+        # entries are claimed by whichever worker is idle first
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.block_ms = settings.event_bus_block_ms if block_ms is None else block_ms
+        self._task: Optional[asyncio.Task] = None
+        # Checked every iteration: a cancel that lands inside a blocking
+        # XREADGROUP/XAUTOCLAIM can be swallowed by the redis client
+        self._stopping = asyncio.Event()
+        self.handled = 0
+        self.failed = 0
+        self.claimed = 0
+
+    async def start(self):
+        """Create the group and start consuming (idempotent)"""
+        if self._task and not self._task.done():
+            return
+        await self.bus.ensure_group(self.group)
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📥 Event bus consumer {self.consumer} reading {self.bus.stream} ({self.group})")
+
+    async def stop(self):
+        """Stop after the current read (bounded by ``block_ms``)"""
+        if not self._task:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        _, pending = await asyncio.wait({self._task}, timeout=self.block_ms / 1000 + 1)
+        if pending:
+            logger.warning(f"Event bus consumer {self.consumer} did not stop in time")
+        self._task = None
+
+    async def _run(self):
+        # Own pending entries first (a handler failed before ACK)
+        backlog_id: Optional[str] = "0"
+        while not self._stopping.is_set():
+            try:
+                if backlog_id is not None:
+                    messages = await self.bus.read(self.group, self.consumer, from_id=backlog_id)
+                    backlog_id = messages[-1].id if messages else None
+                else:
+                    messages = await self.bus.read(self.group, self.consumer, block_ms=self.block_ms)
+                    if not messages:
+                        messages = await self.bus.claim_stale(self.group, self.consumer)
+                        self.claimed += len(messages)
+                if messages:
+                    await self.handle(messages)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if self._stopping.is_set():
+                    break
+                logger.error(f"Event bus consumer error: {e}")
+                await asyncio.sleep(1)
+
+    async def handle(self, messages: List[BusMessage]) -> bool:
+        """Run the handler on a batch and ACK it on success"""
+        valid = [m for m in messages if m.event]
+        try:
+            if valid:
+                await self.handler(valid)
+        except Exception as e:
+            self.failed += len(valid)
+            logger.error(f"Event bus handler failed for {len(valid)} events: {e}")
+            return False
+        # Entries trimmed before they were claimed come back empty - ACK them too
+        await self.bus.ack(self.group, [m.id for m in messages])
+        self.handled += len(valid)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "stream": self.bus.stream,
+            "group": self.group,
+            "consumer": self.consumer,
+            "running": bool(self._task and not self._task.done()),
+            "handled": self.handled,
+            "failed": self.failed,
+            "claimed": self.claimed
+        }
+
+
+def _parse(entries) -> List[BusMessage]:
+    messages = []
+    for entry_id, fields in entries:
+        fields = fields or {}
+        data = fields.get("data")
+        try:
+            data = json.loads(data) if data is not None else None
+        except (json.JSONDecodeError, TypeError):
+            pass
+        messages.append(BusMessage(id=entry_id, event=fields.get("event", ""), data=data))
+    return messages
+
+
+# ========================================
+# Realtime forwarding (API workers)
+# ========================================
+
+async def forward_to_hub(messages: List[BusMessage]):
+    """
+    Handler for API workers: hand events to the realtime hub. The batch is
+    broadcast before returning (not left in the coalescing window), so an
+    ACKed entry has been delivered.
+    """
+    from mongodb.api.websockets.hub import hub
+    await hub.publish_now([(message.event, message.data) for message in messages])
+
+
+event_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    """Get the shared event bus"""
+    return event_bus
+
+
+def realtime_consumer() -> EventBusConsumer:
+    """Consumer that feeds bus events to this worker's realtime hub"""
+    return EventBusConsumer(event_bus, settings.event_bus_group, forward_to_hub)
+
+
+async def emit(event: str, data: Any):
+    """Append one event to the bus (local hub fallback without Redis)"""
+    try:
+        await event_bus.publish(event, data)
+    except Exception as e:
+        logger.debug(f"Event bus unavailable ({e}) - publishing {event} locally")
+        from mongodb.api.websockets.hub import publish_event
+        await publish_event(event, data)
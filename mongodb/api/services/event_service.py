@@ -0,0 +1,183 @@
+"""
+Event Service - gom các bài báo thiên tai thành sự kiện (event)
+
+Operators follow events ("Bão số 3 ở Quảng Ninh"), not articles. Every
+disaster article stored is assigned to an open event of the same
+disaster_type and region whose last article is at most
+``event_window_hours`` old and which already holds the article's story or
+has a recent title similar enough (word-level MinHash, see story_index).
+Otherwise the article opens a new event.
+
+An event document keeps running aggregates, updated with one ``update_one``
+per article ($inc / $min / $max / $addToSet): article count, sources,
+provinces mentioned, first and last seen, the highest severity and the
+largest casualty figures reported. Figures are maxed, not summed - outlets
+repeat, and revise, the same toll. Dashboard event views read ``events`` without scanning articles.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from mongodb.api.config.database import Database
+from mongodb.api.config.settings import settings
+from mongodb.api.services.gazetteer import gazetteer
+from mongodb.api.services.story_index import signature, similarity
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "events"
+
+# Casualty figures ClassificationService._detect_severity extracts
+CASUALTY_FIELDS = ("deaths", "missing", "injured", "houses_affected")
+
+SEVERITY_LEVELS = ("none", "low", "medium", "high")
+
+EVENT_SIGNATURES = 5  # recent title signatures an event is matched against
+EVENT_CANDIDATES = 20  # open events compared per article
+
+_LIST_PROJECTION = {"signatures": 0, "story_ids": 0}
+
+
+def title_signature(title: str) -> Optional[List[int]]:
+    """Word-level MinHash: reports of one event share words, rarely phrases"""
+    return signature(title, size=1)
+
+
+class EventService:
+    """Incremental clustering of disaster articles into events"""
+
+    def __init__(self, db: Any = None, window_hours: Optional[int] = None, threshold: Optional[float] = None):
+        self._db = db
+        self.window = timedelta(hours=window_hours or settings.event_window_hours)
+        self.threshold = threshold or settings.event_similarity
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else Database.get_db()
+
+    @property
+    def events(self):
+        return self.db[EVENTS_COLLECTION]
+
+    async def assign(self, article: Dict[str, Any]) -> Optional[str]:
+        """
+        Fold a disaster article into its event; returns the event id.
+
+        Errors are logged and give None: the article is stored regardless.
+        """
+        try:
+            at = article.get("created_at") or datetime.now()
+            sig = title_signature(article.get("title") or "")
+            event_id = await self._match(article, sig, at) or ObjectId()
+            await self.events.update_one({"_id": event_id}, self._update(article, sig, at), upsert=True)
+            return str(event_id)
+        except Exception as e:
+            logger.warning(f"Event assignment failed for {article.get('url')}: {e}")
+            return None
+
+    async def _match(self, article: Dict[str, Any], sig: Optional[List[int]], at: datetime) -> Optional[ObjectId]:
+        """The open event of the article's story, else the most similar one"""
+        cursor = self.events.find(
+            {
+                "disaster_type": article.get("disaster_type"),
+                "region": article.get("region"),
+                "last_seen_at": {"$gte": at - self.window}
+            },
+            {"signatures": 1, "story_ids": 1}
+        ).sort("last_seen_at", -1).limit(EVENT_CANDIDATES)
+
+        best, best_score = None, self.threshold
+        story_id = article.get("story_id")
+        async for event in cursor:
+            if story_id and story_id in event.get("story_ids", ()):
+                return event["_id"]
+            if sig is None:
+                continue
+            score = max((similarity(sig, other) for other in event.get("signatures", ())), default=0.0)
+            if score >= best_score:
+                best, best_score = event["_id"], score
+        return best
+
+    def _update(self, article: Dict[str, Any], sig: Optional[List[int]], at: datetime) -> Dict[str, Any]:
+        details = article.get("details") or {}
+        severity = article.get("severity")
+        update: Dict[str, Any] = {
+            "$setOnInsert": {
+                "disaster_type": article.get("disaster_type"),
+                "region": article.get("region"),
+                "title": article.get("title")
+            },
+            "$inc": {"article_count": 1},
+            "$min": {"first_seen_at": at},
+            "$max": {
+                "last_seen_at": at,
+                "severity_rank": SEVERITY_LEVELS.index(severity) if severity in SEVERITY_LEVELS else 0,
+                **{name: int(details.get(name) or 0) for name in CASUALTY_FIELDS}
+            }
+        }
+        add: Dict[str, Any] = {
+            name: article[key] for name, key in (("sources", "source"), ("story_ids", "story_id")) if article.get(key)
+        }
+        if article.get("provinces"):
+            add["provinces"] = {"$each": article["provinces"]}
+        if add:
+            update["$addToSet"] = add
+        if sig is not None:
+            update["$push"] = {"signatures": {"$each": [sig], "$slice": -EVENT_SIGNATURES}}
+        return update
+
+    # -------------------------------------------------
+    # DASHBOARD VIEWS
+    # -------------------------------------------------
+
+    async def get_events(
+        self,
+        disaster_type: Optional[str] = None,
+        region: Optional[str] = None,
+        since_hours: Optional[int] = None,
+        limit: int = 50,
+        skip: int = 0,
+        province: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Events, most recently active first"""
+        query: Dict[str, Any] = {}
+        if disaster_type:
+            query["disaster_type"] = disaster_type
+        if region:
+            query["region"] = region
+        if province:
+            query["provinces"] = gazetteer.resolve(province) or province
+        if since_hours:
+            query["last_seen_at"] = {"$gte": datetime.now() - timedelta(hours=since_hours)}
+        cursor = self.events.find(query, _LIST_PROJECTION).sort("last_seen_at", -1).skip(skip).limit(limit)
+        return [self._serialize_event(e) for e in await cursor.to_list(length=limit)]
+
+    async def get_event(self, event_id: str, article_limit: int = 50) -> Optional[Dict[str, Any]]:
+        """An event with its latest articles"""
+        try:
+            oid = ObjectId(event_id)
+        except (InvalidId, TypeError):
+            return None
+        event = await self.events.find_one({"_id": oid}, _LIST_PROJECTION)
+        if event is None:
+            return None
+        articles = await self.db["articles"].find(
+            {"event_id": event_id},
+            {"title": 1, "url": 1, "source": 1, "severity": 1, "created_at": 1}
+        ).sort("created_at", -1).to_list(length=article_limit)
+        event = self._serialize_event(event)
+        event["articles"] = [{**a, "_id": str(a["_id"])} for a in articles]
+        return event
+
+    def _serialize_event(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        doc["_id"] = str(doc["_id"])
+        rank = doc.pop("severity_rank", 0)
+        doc["severity"] = SEVERITY_LEVELS[rank] if 0 <= rank < len(SEVERITY_LEVELS) else "none"
+        return doc
+
+
+event_service = EventService()
@@ -0,0 +1,325 @@
+"""
+Feed Reader - đọc RSS/Atom tăng dần theo high-water mark của từng feed
+
+A full crawl downloads and parses the whole feed every time and sends the
+first 20-30 entries downstream, even though most of them were seen on the
+previous run. The incremental reader keeps a checkpoint per feed URL (the
+newest ``published`` time, the GUIDs of the most recent entries and the
+HTTP validators) and:
+
+1. sends ``If-None-Match`` / ``If-Modified-Since`` - an unchanged feed is a
+   bodyless 304;
+2. parses the body as it streams in, item by item, and stops at the first
+   entry that was already handled (feeds list newest first) - the rest of
+   the body is neither downloaded nor parsed.
+
+The checkpoint only advances past entries that were processed (stored or
+deliberately rejected); entries that failed are retried on the next read.
+
+Feeds that are not well-formed XML fall back to feedparser on the full body
+with the same cut-off.
+"""
+
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import logging
+import xml.etree.ElementTree as ET
+
+import aiohttp
+import feedparser
+
+from mongodb.api.config.database import Database
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_COLLECTION = "feed_checkpoints"
+
+# Handled GUIDs remembered per feed: enough to cover every entry above the
+# watermark while a failed entry holds it back
+MAX_SEEN_GUIDS = 200
+
+# Processing attempts before a failing entry is given up on
+MAX_ATTEMPTS = 3
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_RSS1 = "{http://purl.org/rss/1.0/}"
+_DC = "{http://purl.org/dc/elements/1.1/}"
+_CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+_ITEM_TAGS = {"item", _RSS1 + "item", _ATOM + "entry"}
+
+
+@dataclass
+class FeedItem:
+    """One feed entry"""
+    guid: str
+    link: str
+    title: str = ""
+    summary: str = ""
+    published: str = ""
+
+
+@dataclass
+class FeedCheckpoint:
+    """
+    High-water mark of one feed.
+
+    ``newest_published`` is a low watermark: every entry published before
+    it has been handled. Entries that failed (extraction, classification or
+    storage errors) stay in ``pending`` with their publish date and hold
+    the watermark back until they succeed or run out of attempts.
+    """
+    url: str
+    newest_published: Optional[datetime] = None  # naive UTC
+    guids: List[str] = field(default_factory=list)  # handled entries, newest first
+    pending: List[Dict[str, Any]] = field(default_factory=list)  # {guid, published, attempts}
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+    @property
+    def is_new(self) -> bool:
+        return self.newest_published is None and not self.guids and not self.pending
+
+    def is_handled(self, item: FeedItem) -> bool:
+        return item.guid in self.guids
+
+    def is_below_mark(self, published: Optional[datetime]) -> bool:
+        """Older than the watermark (same-second entries are still read)"""
+        if published is None or self.newest_published is None:
+            return False
+        return _utc(published) < self.newest_published
+
+    def advance(
+        self,
+        items: List[FeedItem],
+        published: List[Optional[datetime]],
+        failed: Iterable[str] = (),
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """
+        Record the outcome of processing ``items`` (newest first): entries
+        whose GUID is in ``failed`` are retried on the next read, all others
+        count as handled (stored or deliberately rejected).
+        """
+        failed = set(failed)
+        dates = dict(zip((i.guid for i in items), published))
+        done = [i.guid for i in items if i.guid not in failed]
+
+        # Earlier failures not retried successfully this time use up an attempt
+        pending = {p["guid"]: p for p in self.pending if p["guid"] not in done}
+        for entry in pending.values():
+            entry["attempts"] += 1
+        for guid in failed:
+            if guid in pending:
+                continue
+            date = dates.get(guid)
+            pending[guid] = {"guid": guid, "published": _utc(date) if date else None, "attempts": 1}
+        given_up = [g for g, p in pending.items() if p["attempts"] >= MAX_ATTEMPTS]
+        for guid in given_up:
+            logger.warning(f"Giving up on {guid} from {self.url} after {MAX_ATTEMPTS} attempts")
+            del pending[guid]
+        self.pending = list(pending.values())
+        self.guids = (done + given_up + [g for g in self.guids if g not in done])[:MAX_SEEN_GUIDS]
+
+        pending_dates = [p["published"] for p in self.pending if p["published"] is not None]
+        if pending_dates:
+            # Nothing older than the oldest failure may count as handled
+            self.newest_published = min(pending_dates)
+        else:
+            done_dates = [_utc(d) for g, d in dates.items() if d is not None and g not in failed]
+            if done_dates and (self.newest_published is None or max(done_dates) > self.newest_published):
+                self.newest_published = max(done_dates)
+
+        # An unchanged-feed 304 would hide the entries still to retry
+        if not self.pending:
+            self.etag, self.last_modified = etag, last_modified
+        self.updated_at = datetime.utcnow()
+
+    def to_doc(self) -> Dict[str, Any]:
+        doc = asdict(self)
+        doc["_id"] = doc.pop("url")
+        return doc
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "FeedCheckpoint":
+        fields = {k: v for k, v in doc.items() if k in cls.__dataclass_fields__}
+        return cls(url=doc["_id"], **fields)
+
+
+class FeedCheckpointStore:
+    """Checkpoints in MongoDB, one document per feed URL"""
+
+    @property
+    def collection(self):
+        return Database.get_db()[CHECKPOINT_COLLECTION]
+
+    async def get(self, url: str) -> FeedCheckpoint:
+        doc = await self.collection.find_one({"_id": url})
+        return FeedCheckpoint.from_doc(doc) if doc else FeedCheckpoint(url=url)
+
+    async def save(self, checkpoint: FeedCheckpoint):
+        await self.collection.replace_one({"_id": checkpoint.url}, checkpoint.to_doc(), upsert=True)
+
+    async def reset(self, url: Optional[str] = None) -> int:
+        """Forget one feed's mark (or all) so the next crawl reads it fully"""
+        result = await self.collection.delete_many({"_id": url} if url else {})
+        return result.deleted_count
+
+
+@dataclass
+class ReadResult:
+    """New entries of one incremental read"""
+    items: List[FeedItem]
+    published: List[Optional[datetime]]
+    not_modified: bool = False
+    bytes_read: int = 0
+    stopped_early: bool = False
+    etag: Optional[str] = None  # validators to store with the advanced checkpoint
+    last_modified: Optional[str] = None
+
+
+async def read_new_items(
+    session: aiohttp.ClientSession,
+    url: str,
+    checkpoint: FeedCheckpoint,
+    limit: int = 30,
+    parse_date: Optional[Callable[[str], Optional[datetime]]] = None
+) -> ReadResult:
+    """
+    Fetch ``url`` and return the entries not handled yet.
+
+    The read stops at the first handled entry (or, while earlier failures
+    are pending, at the first entry older than the watermark). ``limit``
+    only caps the first read of a feed; later reads continue down to the
+    mark so no entry is cut off. The checkpoint is not modified - call
+    ``checkpoint.advance`` once the entries are processed.
+    """
+    parse_date = parse_date or _parse_date
+    headers = {}
+    if checkpoint.etag:
+        headers["If-None-Match"] = checkpoint.etag
+    if checkpoint.last_modified:
+        headers["If-Modified-Since"] = checkpoint.last_modified
+    first_read = checkpoint.is_new
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            return ReadResult([], [], not_modified=True, etag=checkpoint.etag, last_modified=checkpoint.last_modified)
+        response.raise_for_status()
+
+        items: List[FeedItem] = []
+        published: List[Optional[datetime]] = []
+        body = bytearray()
+        parser = ET.XMLPullParser(events=("end",))
+        stopped = streaming = True
+
+        def take(item: FeedItem) -> bool:
+            """Collect one entry; False once the reader should stop"""
+            date = parse_date(item.published)
+            if checkpoint.is_below_mark(date):
+                return False
+            if checkpoint.is_handled(item):
+                # Past the handled head, unless failures further down await a retry
+                return bool(checkpoint.pending)
+            if first_read and len(items) >= limit:
+                return False
+            items.append(item)
+            published.append(date)
+            return True
+
+        async for chunk in response.content.iter_chunked(16 * 1024):
+            body.extend(chunk)
+            if not streaming:
+                continue
+            try:
+                parser.feed(chunk)
+                if not all(take(item) for item in _pull_items(parser)):
+                    break
+            except ET.ParseError as e:
+                logger.debug(f"Streaming parse of {url} failed ({e}), using feedparser")
+                streaming = False
+        else:
+            stopped = False
+
+        if not streaming:
+            # Malformed XML: parse everything leniently, same cut-off
+            items.clear()
+            published.clear()
+            for item in _feedparser_items(bytes(body)):
+                if not take(item):
+                    break
+
+        return ReadResult(
+            items, published,
+            bytes_read=len(body),
+            stopped_early=stopped and streaming,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+
+
+def _pull_items(parser: ET.XMLPullParser) -> Iterator[FeedItem]:
+    """Entries completed by the data fed so far"""
+    for _, elem in parser.read_events():
+        if elem.tag in _ITEM_TAGS:
+            yield _to_item(elem)
+            elem.clear()
+
+
+def _to_item(elem: ET.Element) -> FeedItem:
+    def text(*tags: str) -> str:
+        for tag in tags:
+            child = elem.find(tag)
+            if child is not None and child.text:
+                return child.text.strip()
+        return ""
+
+    link = text("link", _RSS1 + "link")
+    if not link:
+        for atom_link in elem.findall(_ATOM + "link"):
+            if atom_link.get("rel", "alternate") == "alternate":
+                link = atom_link.get("href", "")
+                break
+    guid = text("guid", _ATOM + "id") or elem.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about", "") or link
+    return FeedItem(
+        guid=guid,
+        link=link,
+        title=text("title", _RSS1 + "title", _ATOM + "title"),
+        summary=text("description", _RSS1 + "description", _ATOM + "summary", _CONTENT + "encoded"),
+        published=text("pubDate", _DC + "date", _ATOM + "published", _ATOM + "updated")
+    )
+
+
+def _feedparser_items(body: bytes) -> Iterator[FeedItem]:
+    for entry in feedparser.parse(body).entries:
+        link = entry.get("link", "")
+        yield FeedItem(
+            guid=entry.get("id") or link,
+            link=link,
+            title=entry.get("title", ""),
+            summary=entry.get("summary", ""),
+            published=entry.get("published") or entry.get("updated", "")
+        )
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive UTC (naive input is taken as UTC already)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
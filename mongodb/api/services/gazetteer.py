@@ -0,0 +1,219 @@
+"""
+Gazetteer - nhận diện tỉnh/thành được nhắc tới trong bài báo
+
+The 63 provinces (the division the news archive is written in), with
+abbreviations ("TP.HCM", "BR-VT"), short names ("Huế"), spelling variants
+("Đăk Lăk") and the districts / cities disaster news names most often.
+Every name is compiled once into a word trie, keyed both with diacritics
+and without them (slugs, unaccented posts), so tagging an article is one
+longest-match pass over its words: every mention, with its position,
+resolved to its province.
+
+District names shared by several provinces are left out, and names that
+are also common words only count when capitalized.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import re
+import unicodedata
+
+_WORD = re.compile(r"\w+")
+
+# Old-style tone placement ("hoà", "thuỷ") -> the form used in the names below
+_TONE = re.compile(r"(o[àáảãạ]|o[èéẻẽẹ]|u[ỳýỷỹỵ])\b")
+_TONE_MOVE = {
+    "oà": "òa", "oá": "óa", "oả": "ỏa", "oã": "õa", "oạ": "ọa",
+    "oè": "òe", "oé": "óe", "oẻ": "ỏe", "oẽ": "õe", "oẹ": "ọe",
+    "uỳ": "ùy", "uý": "úy", "uỷ": "ủy", "uỹ": "ũy", "uỵ": "ụy",
+}
+
+_TERMINAL = ""  # trie key of the province a path resolves to
+
+
+@dataclass(frozen=True)
+class Province:
+    name: str
+    region: str
+    aliases: Tuple[str, ...] = ()
+    districts: Tuple[str, ...] = ()
+
+
+PROVINCES: Tuple[Province, ...] = (
+    # Miền Bắc
+    Province("Hà Nội", "north", (), ("ba vì", "sóc sơn", "long biên", "hoàn kiếm", "cầu giấy",
+                                     "đông anh", "gia lâm", "chương mỹ", "mỹ đức")),
+    Province("Hải Phòng", "north", (), ("cát hải", "thủy nguyên", "đồ sơn", "bạch long vĩ", "kiến thụy")),
+    Province("Quảng Ninh", "north", (), ("hạ long", "cẩm phả", "móng cái", "vân đồn", "cô tô",
+                                         "uông bí", "quảng yên")),
+    Province("Hải Dương", "north", (), ("chí linh", "kinh môn")),
+    Province("Hưng Yên", "north", (), ("văn giang", "khoái châu")),
+    Province("Thái Bình", "north", (), ("tiền hải", "thái thụy")),
+    Province("Hà Nam", "north", (), ("phủ lý", "kim bảng")),
+    Province("Nam Định", "north", (), ("hải hậu", "giao thủy", "nghĩa hưng")),
+    Province("Ninh Bình", "north", (), ("kim sơn", "nho quan", "tam điệp")),
+    Province("Vĩnh Phúc", "north", (), ("vĩnh yên", "tam đảo")),
+    Province("Bắc Ninh", "north", (), ("từ sơn",)),
+    Province("Bắc Giang", "north", (), ("lục ngạn", "sơn động", "yên thế")),
+    Province("Thái Nguyên", "north", (), ("đại từ", "võ nhai", "định hóa")),
+    Province("Lạng Sơn", "north", (), ("cao lộc", "đình lập", "hữu lũng")),
+    Province("Cao Bằng", "north", (), ("bảo lạc", "hà quảng")),
+    Province("Bắc Kạn", "north", ("bắc cạn",), ("ba bể", "pác nặm", "chợ đồn")),
+    Province("Hà Giang", "north", (), ("đồng văn", "mèo vạc", "hoàng su phì", "xín mần", "bắc mê")),
+    Province("Tuyên Quang", "north", (), ("na hang", "lâm bình", "chiêm hóa")),
+    Province("Lào Cai", "north", (), ("sa pa", "sapa", "bát xát", "bắc hà", "si ma cai", "mường khương")),
+    Province("Yên Bái", "north", (), ("mù cang chải", "trạm tấu", "văn chấn", "lục yên", "nghĩa lộ")),
+    Province("Điện Biên", "north", (), ("điện biên phủ", "mường nhé", "tuần giáo", "mường lay")),
+    Province("Lai Châu", "north", (), ("mường tè", "sìn hồ", "phong thổ", "tam đường")),
+    Province("Sơn La", "north", (), ("mường la", "mộc châu", "bắc yên", "sông mã", "phù yên", "quỳnh nhai")),
+    Province("Hòa Bình", "north", (), ("mai châu", "đà bắc", "kim bôi")),
+    Province("Phú Thọ", "north", (), ("việt trì", "thanh sơn", "tân sơn")),
+    # Miền Trung
+    Province("Thanh Hóa", "central", (), ("mường lát", "quan hóa", "quan sơn", "bá thước", "lang chánh",
+                                          "sầm sơn", "nghi sơn")),
+    Province("Nghệ An", "central", (), ("tp vinh", "thành phố vinh", "tương dương", "quế phong",
+                                        "con cuông", "quỳ châu", "cửa lò", "diễn châu", "quỳnh lưu")),
+    Province("Hà Tĩnh", "central", (), ("hương khê", "hương sơn", "kỳ anh", "cẩm xuyên", "vũ quang", "thạch hà")),
+    Province("Quảng Bình", "central", (), ("đồng hới", "lệ thủy", "minh hóa", "tuyên hóa", "bố trạch",
+                                           "phong nha")),
+    Province("Quảng Trị", "central", (), ("đông hà", "hướng hóa", "đakrông", "đa krông", "gio linh",
+                                          "vĩnh linh", "hải lăng", "triệu phong", "cồn cỏ", "khe sanh")),
+    Province("Thừa Thiên Huế", "central", ("huế", "thừa thiên", "tt huế"), ("a lưới", "quảng điền", "phú vang",
+                                                                            "phú lộc", "nam đông", "hương trà")),
+    Province("Đà Nẵng", "central", (), ("hòa vang", "liên chiểu", "sơn trà", "hải châu", "ngũ hành sơn",
+                                        "hoàng sa")),
+    Province("Quảng Nam", "central", (), ("hội an", "tam kỳ", "nam trà my", "bắc trà my", "phước sơn",
+                                          "nam giang", "tây giang", "đông giang", "đại lộc", "nông sơn",
+                                          "hiệp đức")),
+    Province("Quảng Ngãi", "central", (), ("lý sơn", "ba tơ", "trà bồng", "minh long", "bình sơn",
+                                           "đức phổ", "dung quất")),
+    Province("Bình Định", "central", (), ("quy nhơn", "hoài nhơn", "vân canh")),
+    Province("Phú Yên", "central", (), ("tuy hòa", "sơn hòa", "đồng xuân")),
+    Province("Khánh Hòa", "central", (), ("nha trang", "cam ranh", "ninh hòa", "vạn ninh", "khánh vĩnh",
+                                          "khánh sơn", "trường sa")),
+    Province("Ninh Thuận", "central", (), ("phan rang", "ninh hải", "ninh phước", "bác ái", "thuận bắc")),
+    Province("Bình Thuận", "central", (), ("phan thiết", "la gi", "tuy phong", "phú quý", "hàm thuận bắc",
+                                           "hàm thuận nam", "hàm tân", "bắc bình")),
+    # Tây Nguyên
+    Province("Kon Tum", "highlands", ("kontum",), ("đắk glei", "kon plông", "sa thầy", "đắk tô", "ngọc hồi")),
+    Province("Gia Lai", "highlands", (), ("pleiku", "an khê", "ayun pa", "chư sê", "kbang", "krông pa")),
+    Province("Đắk Lắk", "highlands", ("đăk lăk", "đắc lắc", "daklak"), ("buôn ma thuột", "buôn mê thuột",
+                                                                       "krông bông", "krông pắc", "ea kar",
+                                                                       "ea súp", "buôn đôn")),
+    Province("Đắk Nông", "highlands", ("đăk nông", "daknong"), ("gia nghĩa", "đắk mil", "tuy đức", "krông nô",
+                                                                "đắk song")),
+    Province("Lâm Đồng", "highlands", (), ("đà lạt", "bảo lộc", "di linh", "đức trọng", "lạc dương", "đam rông")),
+    # Miền Nam
+    Province("TP Hồ Chí Minh", "south", ("thành phố hồ chí minh", "tp hồ chí minh", "tp.hcm", "tphcm", "hcm",
+                                         "sài gòn", "tân sơn nhất"),
+             ("thủ đức", "cần giờ", "củ chi", "bình chánh", "nhà bè", "hóc môn", "gò vấp", "tân bình",
+              "bình thạnh")),
+    Province("Bình Dương", "south", (), ("thủ dầu một", "dĩ an", "bến cát")),
+    Province("Đồng Nai", "south", (), ("biên hòa", "long khánh", "nhơn trạch", "định quán", "long thành")),
+    Province("Bà Rịa - Vũng Tàu", "south", ("bà rịa", "vũng tàu", "brvt", "br vt"),
+             ("côn đảo", "xuyên mộc", "long điền", "đất đỏ", "phú mỹ")),
+    Province("Tây Ninh", "south", (), ("gò dầu", "trảng bàng", "tân biên")),
+    Province("Bình Phước", "south", (), ("đồng xoài", "bù đăng", "bù đốp", "bình long", "phước long", "lộc ninh")),
+    Province("Long An", "south", (), ("tân an", "cần giuộc", "cần đước", "đức hòa", "bến lức", "tân hưng")),
+    Province("Tiền Giang", "south", (), ("mỹ tho", "gò công", "cái bè", "cai lậy")),
+    Province("Bến Tre", "south", (), ("ba tri", "bình đại", "thạnh phú", "mỏ cày")),
+    Province("Vĩnh Long", "south", (), ("vũng liêm", "trà ôn", "long hồ")),
+    Province("Trà Vinh", "south", (), ("cầu ngang", "trà cú", "tiểu cần")),
+    Province("Đồng Tháp", "south", (), ("cao lãnh", "sa đéc", "hồng ngự", "tháp mười")),
+    Province("An Giang", "south", (), ("long xuyên", "châu đốc", "tịnh biên", "tri tôn", "an phú")),
+    Province("Kiên Giang", "south", (), ("phú quốc", "rạch giá", "hà tiên", "kiên lương", "u minh thượng")),
+    Province("Cần Thơ", "south", (), ("ninh kiều", "cái răng", "ô môn", "thốt nốt", "bình thủy")),
+    Province("Hậu Giang", "south", (), ("vị thanh", "ngã bảy", "long mỹ")),
+    Province("Sóc Trăng", "south", (), ("vĩnh châu", "trần đề", "cù lao dung")),
+    Province("Bạc Liêu", "south", (), ("giá rai", "đông hải")),
+    Province("Cà Mau", "south", (), ("ngọc hiển", "đất mũi", "u minh", "trần văn thời", "thới bình")),
+)
+
+# Names that are also everyday words: a mention must be capitalized
+CASED = frozenset({
+    "hòa bình", "thái bình", "đại từ", "phong thổ", "sông mã", "sơn trà", "la gi", "phú quý", "nhà bè",
+    "đất đỏ", "long hồ", "cầu ngang", "an phú", "cái răng", "ngã bảy", "đông hải",
+})
+
+
+class Mention(NamedTuple):
+    province: str
+    start: int  # character offsets in the tagged text
+    end: int
+
+
+def normalize_word(word: str) -> str:
+    word = unicodedata.normalize("NFC", word).lower()
+    return _TONE.sub(lambda m: _TONE_MOVE[m.group(1)], word)
+
+
+def fold(word: str) -> str:
+    """``word`` without diacritics ("đắk" -> "dak")"""
+    decomposed = unicodedata.normalize("NFD", word.replace("đ", "d").replace("Đ", "D"))
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+class Gazetteer:
+    """Province names compiled into a word trie"""
+
+    def __init__(self, provinces: Iterable[Province] = PROVINCES):
+        self.provinces: Dict[str, Province] = {p.name: p for p in provinces}
+        self._trie: Dict[str, dict] = {}
+        # Province names first: they win a key shared with a district once
+        # folded ("Phu Yen": Phú Yên, not Phù Yên of Sơn La)
+        for province in self.provinces.values():
+            for name in (province.name, *province.aliases):
+                self._add(name, province.name)
+        for province in self.provinces.values():
+            for name in province.districts:
+                self._add(name, province.name)
+
+    def _add(self, name: str, province: str):
+        words = [normalize_word(w) for w in _WORD.findall(name)]
+        entry = (province, " ".join(words) in CASED)
+        for key in {tuple(words), tuple(fold(w) for w in words)}:
+            node = self._trie
+            for word in key:
+                node = node.setdefault(word, {})
+            node.setdefault(_TERMINAL, entry)
+
+    def find(self, text: str) -> List[Mention]:
+        """Every province mention in ``text``, longest name first at each position"""
+        tokens = list(_WORD.finditer(text or ""))
+        words = [normalize_word(t.group()) for t in tokens]
+        mentions = []
+        i = 0
+        while i < len(words):
+            node, match = self._trie, None
+            for j in range(i, len(words)):
+                node = node.get(words[j])
+                if node is None:
+                    break
+                if _TERMINAL in node:
+                    match = (j, node[_TERMINAL])
+            if match:
+                j, (province, cased) = match
+                if not cased or tokens[i].group()[0].isupper():
+                    mentions.append(Mention(province, tokens[i].start(), tokens[j].end()))
+                    i = j + 1
+                    continue
+            i += 1
+        return mentions
+
+    def tag(self, text: str) -> List[str]:
+        """Provinces mentioned in ``text``, most mentioned (then earliest) first"""
+        counts = Counter(m.province for m in self.find(text))
+        return sorted(counts, key=lambda name: -counts[name])  # stable: ties keep first-mention order
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Canonical province of a name, alias or district ("tp.hcm", "Hue")"""
+        mentions = self.find(name)
+        return mentions[0].province if mentions else None
+
+    def region_of(self, province: Optional[str]) -> Optional[str]:
+        entry = self.provinces.get(province) if province else None
+        return entry.region if entry else None
+
+
+gazetteer = Gazetteer()
@@ -0,0 +1,247 @@
+"""
+JSON Import - nhập file JSON / NDJSON lớn theo luồng
+
+The importers used to ``json.load`` a whole archive and then run a
+``find_one`` + ``insert_one`` round trip per article. Here the file is
+decoded record by record from a bounded text buffer (a top-level JSON array,
+NDJSON, or concatenated objects), records are classified a batch at a time
+and written with one unordered ``bulk_write`` of ``url`` upserts per batch
+- an existing URL is left untouched and counted as a duplicate. Memory is
+bounded by the batch size and the largest single record, not the file.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+import json
+import logging
+import time
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from mongodb.api.services.classification_service import LABEL_FIELDS, ClassificationService
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_BATCH_SIZE = 500
+
+# A record larger than this is treated as a malformed file rather than read
+# into memory until EOF
+MAX_RECORD_BYTES = 16 * 1024 * 1024
+
+DUPLICATE_KEY = 11000
+
+_WHITESPACE = " \t\r\n"
+
+Classifier = Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]
+
+
+class ImportFormatError(ValueError):
+    """The file is not a JSON array, NDJSON or a sequence of JSON values"""
+
+
+def iter_json_records(
+    fp: TextIO,
+    chunk_size: int = CHUNK_SIZE,
+    max_record_bytes: int = MAX_RECORD_BYTES
+) -> Iterator[Any]:
+    """
+    Yield the values of a top-level JSON array, or of NDJSON / concatenated
+    JSON values, reading ``fp`` in chunks.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos = "", 0
+    in_array: Optional[bool] = None
+    need_comma = False
+    consumed = 0  # characters dropped from the front of buf, for error offsets
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos == len(buf):
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                if in_array:
+                    raise ImportFormatError("Unterminated JSON array")
+                return
+            consumed += len(buf)
+            buf, pos = chunk, 0
+            continue
+
+        char = buf[pos]
+        if in_array is None:
+            in_array = char == "["
+            if in_array:
+                pos += 1
+                continue
+        if in_array:
+            if char == "]":
+                return
+            if need_comma:
+                if char != ",":
+                    raise ImportFormatError(f"Expected ',' at offset {consumed + pos}")
+                pos += 1
+                need_comma = False
+                continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            # Most likely the record continues in the next chunk
+            if len(buf) - pos > max_record_bytes:
+                raise ImportFormatError(f"Record at offset {consumed + pos} is too large or malformed: {e}")
+            chunk = fp.read(max(chunk_size, len(buf) - pos))  # grow geometrically
+            if not chunk:
+                raise ImportFormatError(f"Malformed JSON at offset {consumed + e.pos}: {e.msg}")
+            consumed += pos
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        pos = end
+        need_comma = True
+        yield value
+        if pos >= chunk_size:
+            consumed += pos
+            buf, pos = buf[pos:], 0
+
+
+@dataclass
+class ImportStats:
+    """Counters of one import"""
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    disasters: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Records per second"""
+        return self.read / max(self.elapsed_s, 1e-6)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_in_file": self.read,
+            "processed": self.inserted,
+            "skipped_duplicates": self.duplicates,
+            "failed": self.failed,
+            "disaster_articles": self.disasters,
+            "elapsed_seconds": round(self.elapsed_s, 2),
+            "docs_per_second": round(self.rate, 1)
+        }
+
+
+def service_classifier(service: Any = None) -> Classifier:
+    """Batch classifier backed by ClassificationService"""
+    service = service or ClassificationService()
+
+    async def classify(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        inputs = [
+            {"title": r.get("title") or "", "content": r.get("text") or r.get("summary") or ""}
+            for r in records
+        ]
+        texts = [i for i in inputs if i["title"] or i["content"]]
+        results = iter(await service.classify_batch(texts))
+        labels = []
+        for item in inputs:
+            if item["title"] or item["content"]:
+                result = next(results)
+                labels.append({name: getattr(result, name) for name in LABEL_FIELDS})
+            else:
+                labels.append({"is_disaster": False})
+        return labels
+
+    return classify
+
+
+class JsonImporter:
+    """Streams records into the articles collection in batches"""
+
+    def __init__(
+        self,
+        collection: Any,
+        classify: Optional[Classifier] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        on_progress: Optional[Callable[[ImportStats], None]] = None
+    ):
+        self.collection = collection
+        self.classify = classify
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.stats: Optional[ImportStats] = None  # of the running / last import
+
+    async def import_file(self, path: str) -> ImportStats:
+        with open(path, "r", encoding="utf-8-sig") as fp:  # tolerate a BOM
+            return await self.import_records(iter_json_records(fp))
+
+    async def import_records(self, records: Iterable[Any]) -> ImportStats:
+        stats = self.stats = ImportStats()
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            stats.read += 1
+            if not isinstance(record, dict):
+                stats.failed += 1
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                await self._write(batch, stats)
+                batch = []
+        if batch:
+            await self._write(batch, stats)
+        return stats
+
+    async def _write(self, batch: List[Dict[str, Any]], stats: ImportStats):
+        """Classify and upsert one batch"""
+        # The same URL twice in one unordered bulk would race on the unique index
+        seen = set()
+        unique = []
+        for record in batch:
+            url = record.get("url")
+            if url and url in seen:
+                stats.duplicates += 1
+                continue
+            seen.add(url)
+            unique.append(record)
+
+        if self.classify is not None:
+            try:
+                for record, labels in zip(unique, await self.classify(unique)):
+                    record.update(labels)
+            except Exception as e:
+                logger.error(f"Classification of an import batch failed: {e}")
+                stats.failed += len(unique)
+                return
+
+        ops = [
+            UpdateOne({"url": r["url"]}, {"$setOnInsert": r}, upsert=True) if r.get("url") else InsertOne(r)
+            for r in unique
+        ]
+        inserts = {i for i, op in enumerate(ops) if isinstance(op, InsertOne)}
+        try:
+            result = await self.collection.bulk_write(ops, ordered=False)
+            written = set(result.upserted_ids or {}) | inserts
+            errors = []
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            failed_ops = {err["index"] for err in errors}
+            written = {u["index"] for u in e.details.get("upserted", [])} | (inserts - failed_ops)
+
+        failed = 0
+        for err in errors:
+            # A concurrent writer won the upsert: the URL exists, so it is a duplicate
+            if err.get("code") != DUPLICATE_KEY:
+                failed += 1
+                logger.warning(f"Import write failed: {err.get('errmsg')}")
+        stats.inserted += len(written)
+        stats.failed += failed
+        stats.duplicates += len(unique) - len(written) - failed
+        stats.disasters += sum(1 for i in written if unique[i].get("is_disaster"))
+
+        if self.on_progress:
+            self.on_progress(stats)
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 import logging
 from mongodb.api.config.database import Database
+from mongodb.api.services.cache_service import invalidate_tags, ARTICLE_WRITE_TAGS
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -20,6 +21,8 @@ class MaintenanceService:
             # Define the cutoff date for old articles (e.g., 30 days ago)
             cutoff_date = datetime.now() - timedelta(days=30)
             result = await self.db.articles.delete_many({"published_at": {"$lt": cutoff_date}})
+            if result.deleted_count:
+                await invalidate_tags(*ARTICLE_WRITE_TAGS)
             logger.info(f"✅ Deleted {result.deleted_count} old articles from the database.")
             return {"deleted_count": result.deleted_count}
         except Exception as e:
@@ -17,7 +17,10 @@ import asyncio
 from mongodb.api.config.database import Database
 from mongodb.api.services.normalizer_service import NormalizerService, NormalizedArticle
 from mongodb.api.services.classification_service import ClassificationService, ClassificationResult
-from mongodb.api.services.websocket_service import WebSocketService
+from mongodb.api.services.event_bus import EventBus
+from mongodb.api.services.event_service import event_service
+from mongodb.api.websockets.hub import EVENT_NEW_DISASTER
+from mongodb.api.services.cache_service import invalidate_tags, ARTICLE_WRITE_TAGS
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -40,7 +43,10 @@ class ProcessedArticle(BaseModel):
     severity: str
     confidence: float
     region: Optional[str] = None
+    provinces: List[str] = []
+    province: Optional[str] = None
     matched_keywords: List[str] = []
+    details: Dict[str, Any] = {}
     
     # Metadata
     processed_at: datetime
@@ -71,7 +77,9 @@ class PipelineService:
     def __init__(self):
         self.normalizer = NormalizerService()
         self.classifier = ClassificationService()
-        self.websocket = WebSocketService()
+        self.events = EventBus()
+        # Articles written since the cache tags were last bumped
+        self._pending_writes = 0
         
         # Pipeline stats
         self.stats = PipelineStats()
@@ -90,6 +98,13 @@ class PipelineService:
         Returns:
             ProcessedArticle nếu thành công, None nếu thất bại
         """
+        processed = await self._process_article(raw_article)
+        await self.events.flush()
+        await self._invalidate_cache()
+        return processed
+    
+    async def _process_article(self, raw_article: Dict[str, Any]) -> Optional[ProcessedArticle]:
+        """Pipeline for one article; bus events stay buffered until flush"""
         start_time = datetime.now()
         
         try:
@@ -118,7 +133,10 @@ class PipelineService:
                 severity=classification.severity,
                 confidence=classification.confidence,
                 region=classification.region,
+                provinces=classification.provinces,
+                province=classification.province,
                 matched_keywords=classification.matched_keywords,
+                details=classification.details,
                 processed_at=datetime.now()
             )
             
@@ -164,10 +182,14 @@ class PipelineService:
         results = []
         
         for raw in raw_articles:
-            processed = await self.process_article(raw)
+            processed = await self._process_article(raw)
             if processed:
                 results.append(processed)
         
+        # Disaster events go to the bus in XADD batches, cache tags once per batch
+        await self.events.flush()
+        await self._invalidate_cache()
+        
         logger.info(f"Batch processed: {len(results)}/{len(raw_articles)} successful")
         return results
     
@@ -190,30 +212,37 @@ class PipelineService:
                 doc = article.model_dump()
                 doc["url"] = article.original_url
                 doc["created_at"] = datetime.now()
+                if article.is_disaster:
+                    doc["event_id"] = await event_service.assign(doc)
                 await collection.insert_one(doc)
+            
+            self._pending_writes += 1
                 
         except Exception as e:
             logger.error(f"Error storing article: {e}")
     
+    async def _invalidate_cache(self):
+        """Bump the article cache tags once for everything written since the last call"""
+        if self._pending_writes:
+            self._pending_writes = 0
+            await invalidate_tags(*ARTICLE_WRITE_TAGS)
+    
     async def _broadcast_disaster(self, article: ProcessedArticle):
-        """Broadcast bài báo thiên tai qua WebSocket"""
+        """Đưa bài báo thiên tai vào event bus (API workers broadcast qua WebSocket)"""
         try:
-            message = {
-                "type": "new_disaster",
-                "data": {
-                    "title": article.title,
-                    "source": article.source,
-                    "url": article.original_url,
-                    "disaster_type": article.disaster_type,
-                    "severity": article.severity,
-                    "region": article.region,
-                    "confidence": article.confidence,
-                    "matched_keywords": article.matched_keywords,
-                    "published_at": article.published_at.isoformat() if article.published_at else None,
-                    "processed_at": article.processed_at.isoformat()
-                }
+            data = {
+                "title": article.title,
+                "source": article.source,
+                "url": article.original_url,
+                "disaster_type": article.disaster_type,
+                "severity": article.severity,
+                "region": article.region,
+                "confidence": article.confidence,
+                "matched_keywords": article.matched_keywords,
+                "published_at": article.published_at.isoformat() if article.published_at else None,
+                "processed_at": article.processed_at.isoformat()
             }
-            await self.websocket.broadcast(message)
+            await self.events.add(EVENT_NEW_DISASTER, data)
         except Exception as e:
             logger.error(f"Error broadcasting: {e}")
     
@@ -0,0 +1,226 @@
+"""
+Reclassify Service - phân loại lại bài báo đã lưu theo lô, có thể tiếp tục
+
+When the keyword tables or the classification logic change, stored articles
+keep the labels they were ingested with. The backfill walks ``articles`` in
+``_id`` order, a batch at a time: the batch is classified in the process
+pool (BatchClassificationService, the live engine), only articles whose
+labels changed are rewritten with one unordered ``bulk_write``, and the last
+``_id`` is checkpointed in ``reclassify_jobs``. A restarted or crashed job
+resumes after its checkpoint; a job is leased, so only one runner walks the
+collection. Once done, the daily stats and the dashboard caches are
+refreshed.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+import os
+import socket
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from mongodb.api.config.database import Database
+from mongodb.api.config.settings import settings
+from mongodb.api.services.cache_service import invalidate_tags, ARTICLE_WRITE_TAGS
+from mongodb.api.services.classification_service import (
+    LABEL_FIELDS,
+    BatchClassificationService,
+    classifier_fingerprint,
+)
+from mongodb.api.services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+JOB_COLLECTION = "reclassify_jobs"
+JOB_ID = "articles"
+
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_DONE = "done"
+
+_PROJECTION = {"title": 1, "text": 1, "content": 1, "summary": 1, **{name: 1 for name in LABEL_FIELDS}}
+
+
+def labels_changed(doc: Dict[str, Any], labels: Dict[str, Any]) -> bool:
+    return any(doc.get(name) != labels[name] for name in LABEL_FIELDS)
+
+
+class ReclassifyService:
+    """Resumable relabeling of the articles collection"""
+
+    def __init__(
+        self,
+        db: Any = None,
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        lease_s: Optional[int] = None,
+        owner: Optional[str] = None
+    ):
+        self._db = db
+        self.batch_size = batch_size or settings.reclassify_batch_size
+        self.workers = workers or settings.reclassify_workers or None
+        self.lease_s = lease_s or settings.reclassify_lease_s
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}"
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else Database.get_db()
+
+    @property
+    def jobs(self):
+        return self.db[JOB_COLLECTION]
+
+    @property
+    def articles(self):
+        return self.db["articles"]
+
+    async def status(self) -> Optional[Dict[str, Any]]:
+        job = await self.jobs.find_one({"_id": JOB_ID})
+        if job is not None:
+            job["current"] = job.get("fingerprint") == classifier_fingerprint()
+            job["last_id"] = str(job["last_id"]) if job.get("last_id") is not None else None
+        return job
+
+    async def pause(self) -> bool:
+        """Stop the running job after its current batch; run() resumes it"""
+        result = await self.jobs.update_one(
+            {"_id": JOB_ID, "state": JOB_RUNNING},
+            {"$set": {"state": JOB_PAUSED, "updated_at": datetime.utcnow()}}
+        )
+        return result.modified_count == 1
+
+    async def run_if_needed(self) -> Optional[Dict[str, Any]]:
+        """
+        Scheduler entry: relabel after a rules change, or finish a job that
+        was interrupted. A paused job stays paused.
+        """
+        return await self.run(resume_paused=False)
+
+    async def run(self, restart: bool = False, resume_paused: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Walk the collection from the checkpoint to the end.
+
+        ``restart`` starts over from the first article. Returns the job, or
+        None when another runner holds it or there is nothing to do.
+        """
+        job = await self._claim(restart, resume_paused)
+        if job is None:
+            return None
+
+        logger.info(f"🔁 Reclassifying articles after {job.get('last_id') or 'the start'} ({job['fingerprint']})")
+        classifier = BatchClassificationService(workers=self.workers)
+        try:
+            last_id = job.get("last_id")
+            while True:
+                query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+                docs = await self.articles.find(query, _PROJECTION).sort("_id", 1).to_list(length=self.batch_size)
+                if not docs:
+                    break
+                changed = await self._relabel(docs, classifier)
+                last_id = docs[-1]["_id"]
+                if not await self._checkpoint(last_id, len(docs), changed):
+                    logger.info("Reclassification paused or taken over, stopping")
+                    return await self.status()
+        except Exception as e:
+            logger.error(f"❌ Reclassification failed: {e}")
+            await self.jobs.update_one(
+                {"_id": JOB_ID, "owner": self.owner},
+                {"$set": {"error": str(e)[:500], "lease_expires_at": datetime.utcnow()}}
+            )
+            raise
+        finally:
+            classifier.close()
+
+        await self._finish()
+        return await self.status()
+
+    async def _claim(self, restart: bool, resume_paused: bool) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        fingerprint = classifier_fingerprint()
+        job = await self.jobs.find_one({"_id": JOB_ID})
+
+        fresh = restart or job is None or job.get("fingerprint") != fingerprint
+        if not fresh:
+            if job["state"] == JOB_DONE or (job["state"] == JOB_PAUSED and not resume_paused):
+                return None
+
+        update: Dict[str, Any] = {
+            "state": JOB_RUNNING,
+            "owner": self.owner,
+            "lease_expires_at": now + timedelta(seconds=self.lease_s),
+            "updated_at": now,
+            "error": None
+        }
+        if fresh:
+            update.update({
+                "fingerprint": fingerprint,
+                "last_id": None,
+                "scanned": 0,
+                "changed": 0,
+                "started_at": now,
+                "finished_at": None
+            })
+        try:
+            return await self.jobs.find_one_and_update(
+                {"_id": JOB_ID, "$or": [{"state": {"$ne": JOB_RUNNING}}, {"lease_expires_at": {"$lte": now}}]},
+                {"$set": update},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            return None  # running under another runner's lease
+
+    async def _relabel(self, docs: List[Dict[str, Any]], classifier: BatchClassificationService) -> int:
+        """Classify one batch and rewrite the articles whose labels changed"""
+        results = await classifier.classify_batch([
+            {"title": doc.get("title") or "", "content": doc.get("text") or doc.get("content") or doc.get("summary") or ""}
+            for doc in docs
+        ])
+        ops = []
+        for doc, result in zip(docs, results):
+            labels = {name: getattr(result, name) for name in LABEL_FIELDS}
+            if labels_changed(doc, labels):
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": labels}))
+        if ops:
+            await self.articles.bulk_write(ops, ordered=False)
+        return len(ops)
+
+    async def _checkpoint(self, last_id: Any, scanned: int, changed: int) -> bool:
+        """Record progress and renew the lease; False if the job is no longer ours"""
+        now = datetime.utcnow()
+        result = await self.jobs.update_one(
+            {"_id": JOB_ID, "state": JOB_RUNNING, "owner": self.owner},
+            {
+                "$set": {"last_id": last_id, "updated_at": now, "lease_expires_at": now + timedelta(seconds=self.lease_s)},
+                "$inc": {"scanned": scanned, "changed": changed}
+            }
+        )
+        return result.modified_count == 1
+
+    async def _finish(self):
+        now = datetime.utcnow()
+        job = await self.jobs.find_one_and_update(
+            {"_id": JOB_ID, "state": JOB_RUNNING, "owner": self.owner},
+            {"$set": {"state": JOB_DONE, "finished_at": now, "updated_at": now, "lease_expires_at": None}},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is None:
+            return
+        logger.info(f"✅ Reclassification done: {job['changed']}/{job['scanned']} articles relabeled")
+        if job["changed"]:
+            await self._refresh_rollups()
+
+    async def _refresh_rollups(self):
+        """Daily stats and cached dashboard panels were computed from the old labels"""
+        try:
+            total = await self.articles.count_documents({})
+            disasters = await self.articles.count_documents({"is_disaster": True})
+            await StatsService().update_daily_stats(total, disasters)
+        except Exception as e:
+            logger.warning(f"Stats refresh after reclassification failed: {e}")
+        await invalidate_tags(*ARTICLE_WRITE_TAGS)
+
+
+reclassify_service = ReclassifyService()
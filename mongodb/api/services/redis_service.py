@@ -13,6 +13,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Backoff (seconds) between raw listener resubscribe attempts
+RAW_RECONNECT_DELAY = 1.0
+RAW_RECONNECT_MAX_DELAY = 30.0
+
 
 class RedisService:
     """Redis client for pub/sub and caching"""
@@ -22,6 +26,13 @@ class RedisService:
     _pubsub: Optional[redis.client.PubSub] = None
     _subscribers: Dict[str, List[Callable]] = {}
     _listener_task: Optional[asyncio.Task] = None
+    # Binary connection for raw (pre-encoded) pub/sub payloads
+    _raw_client: Optional[redis.Redis] = None
+    _raw_pubsub: Optional[redis.client.PubSub] = None
+    _raw_subscribers: Dict[str, List[Callable]] = {}
+    _raw_listener_task: Optional[asyncio.Task] = None
+    # Called with False when the raw listener loses Redis, True once resubscribed
+    _raw_state_listeners: List[Callable[[bool], Any]] = []
     
     def __new__(cls):
         if cls._instance is None:
@@ -65,22 +76,29 @@ class RedisService:
         """Disconnect from Redis"""
         instance = cls()
         
-        if instance._listener_task:
-            instance._listener_task.cancel()
-            try:
-                await instance._listener_task
-            except asyncio.CancelledError:
-                pass
+        for task in (instance._listener_task, instance._raw_listener_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         
-        if instance._pubsub:
-            await instance._pubsub.close()
-            instance._pubsub = None
+        for pubsub in (instance._pubsub, instance._raw_pubsub):
+            if pubsub:
+                await pubsub.close()
+        instance._pubsub = None
+        instance._raw_pubsub = None
         
-        if instance._client:
-            await instance._client.close()
-            instance._client = None
+        for client in (instance._client, instance._raw_client):
+            if client:
+                await client.close()
+        instance._client = None
+        instance._raw_client = None
         
         instance._subscribers = {}
+        instance._raw_subscribers = {}
+        instance._raw_state_listeners = []
         logger.info("🔌 Disconnected from Redis")
     
     @classmethod
@@ -91,6 +109,24 @@ class RedisService:
             raise RuntimeError("Redis not connected. Call RedisService.connect() first.")
         return instance._client
     
+    @classmethod
+    def get_raw_client(cls) -> redis.Redis:
+        """Get a Redis client that returns bytes (no response decoding)"""
+        instance = cls()
+        if instance._client is None:
+            raise RuntimeError("Redis not connected. Call RedisService.connect() first.")
+        if instance._raw_client is None:
+            instance._raw_client = redis.Redis.from_url(
+                settings.redis_url,
+                db=settings.redis_db,
+                password=settings.redis_password,
+                decode_responses=False,
+                socket_timeout=5,
+                socket_connect_timeout=5,
+                retry_on_timeout=True,
+            )
+        return instance._raw_client
+    
     # ========================================
     # Pub/Sub Operations
     # ========================================
@@ -139,6 +175,130 @@ class RedisService:
         
         logger.info(f"🔇 Unsubscribed from channel: {channel}")
     
+    @classmethod
+    async def publish_raw(cls, channel: str, payload: bytes) -> int:
+        """Publish pre-encoded bytes as-is"""
+        return await cls.get_raw_client().publish(channel, payload)
+    
+    @classmethod
+    async def subscribe_raw(cls, channel: str, callback: Callable[[List[bytes]], Any]):
+        """
+        Subscribe with a batch callback receiving raw payload bytes.
+        
+        The listener drains up to ``redis_pubsub_batch_size`` buffered
+        messages per wakeup and calls the callback once per channel with
+        the whole batch - no JSON decoding on this path.
+        """
+        instance = cls()
+        
+        if instance._raw_pubsub is None:
+            instance._raw_pubsub = cls.get_raw_client().pubsub(ignore_subscribe_messages=True)
+        
+        if channel not in instance._raw_subscribers:
+            instance._raw_subscribers[channel] = []
+            await instance._raw_pubsub.subscribe(channel)
+        
+        instance._raw_subscribers[channel].append(callback)
+        
+        if instance._raw_listener_task is None or instance._raw_listener_task.done():
+            instance._raw_listener_task = asyncio.create_task(instance._listen_raw())
+        
+        logger.info(f"📢 Subscribed to raw channel: {channel}")
+    
+    @classmethod
+    def on_raw_state(cls, callback: Callable[[bool], Any]):
+        """Register a callback for raw listener health changes"""
+        instance = cls()
+        if callback not in instance._raw_state_listeners:
+            instance._raw_state_listeners.append(callback)
+    
+    def _set_raw_state(self, healthy: bool):
+        for callback in self._raw_state_listeners:
+            try:
+                callback(healthy)
+            except Exception as e:
+                logger.error(f"Error in raw state callback: {e}")
+    
+    async def _listen_raw(self):
+        """
+        Listen for raw pub/sub messages and dispatch them in batches.
+        A Redis error does not end the task: it reports the outage, then
+        resubscribes with backoff.
+        """
+        batch_size = max(1, settings.redis_pubsub_batch_size)
+        delay = RAW_RECONNECT_DELAY
+        while True:
+            try:
+                await self._drain_raw(batch_size)
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error(f"Redis raw listener error: {e} - resubscribing in {delay:.0f}s")
+                self._set_raw_state(False)
+            
+            try:
+                await asyncio.sleep(delay)
+                await self._resubscribe_raw()
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.warning(f"Redis raw resubscribe failed: {e}")
+                delay = min(delay * 2, RAW_RECONNECT_MAX_DELAY)
+                continue
+            
+            delay = RAW_RECONNECT_DELAY
+            logger.info("📢 Redis raw listener resubscribed")
+            self._set_raw_state(True)
+    
+    async def _resubscribe_raw(self):
+        """Fresh pub/sub connection subscribed to every raw channel"""
+        old = self._raw_pubsub
+        self._raw_pubsub = None
+        if old is not None:
+            try:
+                await old.close()
+            except Exception:
+                pass
+        pubsub = self.get_raw_client().pubsub(ignore_subscribe_messages=True)
+        if self._raw_subscribers:
+            await pubsub.subscribe(*self._raw_subscribers)
+        self._raw_pubsub = pubsub
+    
+    async def _drain_raw(self, batch_size: int):
+        """Read until an error; each wakeup dispatches what is buffered"""
+        while True:
+            message = await self._raw_pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=1.0
+            )
+            if message is None or message["type"] != "message":
+                continue
+            
+            batches: Dict[str, List[bytes]] = {}
+            count = 0
+            while message is not None:
+                if message["type"] == "message":
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    batches.setdefault(channel, []).append(message["data"])
+                    count += 1
+                if count >= batch_size:
+                    break
+                # Only take what is already buffered - never wait here
+                message = await self._raw_pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=0
+                )
+            
+            for channel, payloads in batches.items():
+                for callback in self._raw_subscribers.get(channel, []):
+                    try:
+                        if asyncio.iscoroutinefunction(callback):
+                            await callback(payloads)
+                        else:
+                            callback(payloads)
+                    except Exception as e:
+                        logger.error(f"Error in raw subscriber callback: {e}")
+    
     async def _listen(self):
         """Listen for pub/sub messages"""
         try:
@@ -263,18 +423,21 @@ class RedisService:
 # Disaster Event Channels
 # ========================================
 
+CHANNEL_EVENTS = "disaster:events"  # realtime hub fan-out
 CHANNEL_NEW_ARTICLE = "disaster:new_article"
 CHANNEL_ALERT = "disaster:alert"
 CHANNEL_STATS_UPDATE = "disaster:stats_update"
+CHANNEL_AUTH_INVALIDATE = "auth:invalidate"  # username whose cached principal is stale
+
 
+# The publish_* helpers append to the durable event bus (Redis Stream);
+# the channels above stay subscribed for external pub/sub publishers.
 
 async def publish_new_article(article: Dict[str, Any]):
-    """Publish new disaster article to Redis channel"""
+    """Publish new disaster article to the event bus"""
+    from mongodb.api.services.event_bus import emit
     try:
-        await RedisService.publish(CHANNEL_NEW_ARTICLE, {
-            "event": "new_disaster_article",
-            "data": article
-        })
+        await emit("new_disaster_article", article)
         logger.debug(f"Published article: {article.get('title', 'Unknown')[:50]}")
     except Exception as e:
         logger.error(f"Failed to publish article: {e}")
@@ -282,21 +445,17 @@ async def publish_new_article(article: Dict[str, Any]):
 
 async def publish_alert(alert: Dict[str, Any]):
     """Publish disaster alert"""
+    from mongodb.api.services.event_bus import emit
     try:
-        await RedisService.publish(CHANNEL_ALERT, {
-            "event": "disaster_alert",
-            "data": alert
-        })
+        await emit("disaster_alert", alert)
     except Exception as e:
         logger.error(f"Failed to publish alert: {e}")
 
 
 async def publish_stats_update(stats: Dict[str, Any]):
     """Publish stats update"""
+    from mongodb.api.services.event_bus import emit
     try:
-        await RedisService.publish(CHANNEL_STATS_UPDATE, {
-            "event": "stats_update",
-            "data": stats
-        })
+        await emit("stats_update", stats)
     except Exception as e:
         logger.error(f"Failed to publish stats: {e}")
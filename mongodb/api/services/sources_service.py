@@ -1,14 +1,22 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from fastapi import HTTPException
 from mongodb.api.models.source import Source
 from mongodb.api.schemas.source import SourceCreate, SourceUpdate
 from mongodb.api.config.database import Database
-from datetime import datetime
-import requests
+from mongodb.api.config.settings import settings
+from datetime import datetime, timedelta
+import aiohttp
+import asyncio
+import calendar
+import feedparser
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Time-series collection with one document per feed probe
+HEALTH_COLLECTION = "source_health"
+
 
 # Default news sources configuration (synced with crawler)
 DEFAULT_NEWS_SOURCES = [
@@ -262,25 +270,27 @@ class SourcesService:
 
     async def check_source_health(self, source_id: str) -> dict:
         source = await self.get_source(source_id)
-        
-        # Check RSS feed availability
-        rss_status = "unknown"
-        rss_feeds = source.get("rss_feeds", [])
-        
-        if rss_feeds:
-            try:
-                response = requests.head(rss_feeds[0], timeout=10)
-                rss_status = "healthy" if response.status_code == 200 else "error"
-            except:
-                rss_status = "unreachable"
-        
+        probes = await probe_sources([source])
+        native = [p for p in probes if p["meta"]["kind"] == "rss"]
+
+        # Status of the native RSS feeds (Google News is only a fallback)
+        if not native:
+            rss_status = "unknown"
+        elif all(p["ok"] for p in native):
+            rss_status = "healthy"
+        elif any(p["status_code"] for p in native):
+            rss_status = "error"
+        else:
+            rss_status = "unreachable"
+
         return {
             "source_id": source_id,
             "domain": source.get("domain"),
             "rss_status": rss_status,
             "has_native_rss": source.get("has_native_rss", False),
             "reliability_score": source.get("reliability_score", 5),
-            "status": "healthy" if rss_status == "healthy" else "warning"
+            "status": "healthy" if rss_status == "healthy" else "warning",
+            "feeds": [_probe_view(p) for p in probes]
         }
     
     async def init_default_sources(self) -> dict:
@@ -333,4 +343,223 @@ class SourcesHealthService:
             "with_google_rss": sum(1 for s in (sources or DEFAULT_NEWS_SOURCES) if s.get("google_news_rss")),
             "status": "healthy" if active_count > 0 else "warning",
             "checked_at": datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
+
+    async def check_all_sources(self) -> dict:
+        """
+        Probe every feed of every active source concurrently and store one
+        document per probe in the ``source_health`` time-series collection.
+        """
+        started = time.perf_counter()
+        cursor = self.collection.find({"is_active": True})
+        sources = await cursor.to_list(length=None)
+        if not sources:
+            sources = [s for s in DEFAULT_NEWS_SOURCES if s.get("is_active", True)]
+
+        probes = await probe_sources(sources)
+        if probes:
+            try:
+                await self.db[HEALTH_COLLECTION].insert_many(probes, ordered=False)
+            except Exception as e:
+                logger.error(f"Failed to store source health probes: {e}")
+
+        healthy = sum(1 for p in probes if p["ok"])
+        return {
+            "sources": len(sources),
+            "feeds": len(probes),
+            "healthy": healthy,
+            "failing": len(probes) - healthy,
+            "duration_s": round(time.perf_counter() - started, 2),
+            "checked_at": datetime.now().isoformat()
+        }
+
+    async def get_health_summary(self, hours: int = 24) -> dict:
+        """Per-feed availability, latency and freshness over the last ``hours``"""
+        since = datetime.utcnow() - timedelta(hours=hours)
+        pipeline = [
+            {"$match": {"checked_at": {"$gte": since}}},
+            {"$sort": {"checked_at": 1}},
+            {"$group": {
+                "_id": {"domain": "$meta.domain", "feed": "$meta.feed"},
+                "source": {"$last": "$meta.source"},
+                "kind": {"$last": "$meta.kind"},
+                "checks": {"$sum": 1},
+                "ok": {"$sum": {"$cond": ["$ok", 1, 0]}},
+                "avg_latency_ms": {"$avg": "$latency_ms"},
+                "max_latency_ms": {"$max": "$latency_ms"},
+                "last_checked_at": {"$last": "$checked_at"},
+                "last_ok": {"$last": "$ok"},
+                "last_status_code": {"$last": "$status_code"},
+                "last_error": {"$last": "$error"},
+                "last_bytes": {"$last": "$bytes"},
+                "newest_item_age_s": {"$last": "$newest_item_age_s"}
+            }},
+            {"$sort": {"_id.domain": 1, "_id.feed": 1}}
+        ]
+        rows = await self.db[HEALTH_COLLECTION].aggregate(pipeline).to_list(length=None)
+
+        feeds = []
+        for row in rows:
+            feeds.append({
+                "domain": row["_id"]["domain"],
+                "feed": row["_id"]["feed"],
+                "source": row.get("source"),
+                "kind": row.get("kind"),
+                "checks": row["checks"],
+                "availability": round(row["ok"] / row["checks"], 3) if row["checks"] else 0.0,
+                "avg_latency_ms": round(row["avg_latency_ms"] or 0, 1),
+                "max_latency_ms": round(row["max_latency_ms"] or 0, 1),
+                "last_checked_at": row["last_checked_at"],
+                "last_ok": row["last_ok"],
+                "last_status_code": row.get("last_status_code"),
+                "last_error": row.get("last_error"),
+                "last_bytes": row.get("last_bytes"),
+                "newest_item_age_s": row.get("newest_item_age_s")
+            })
+
+        failing = [f for f in feeds if not f["last_ok"]]
+        return {
+            "window_hours": hours,
+            "feeds": feeds,
+            "total_feeds": len(feeds),
+            "failing_feeds": len(failing),
+            "status": "healthy" if feeds and not failing else "warning",
+            "generated_at": datetime.now().isoformat()
+        }
+
+
+# ========================================
+# Feed probing
+# ========================================
+
+def source_feeds(source: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Every feed URL of a source with its kind (native ``rss`` or ``google_news``)"""
+    feeds = [{"url": url, "kind": "rss"} for url in source.get("rss_feeds") or []]
+    if source.get("google_news_rss"):
+        feeds.append({"url": source["google_news_rss"], "kind": "google_news"})
+    return feeds
+
+
+async def probe_sources(
+    sources: List[Dict[str, Any]],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    session: Optional[aiohttp.ClientSession] = None
+) -> List[Dict[str, Any]]:
+    """Probe all feeds of ``sources`` concurrently, at most ``concurrency`` at once"""
+    concurrency = concurrency or settings.source_health_concurrency
+    slots = asyncio.Semaphore(concurrency)
+    targets = [(source, feed) for source in sources for feed in source_feeds(source)]
+    if not targets:
+        return []
+
+    async def run(client: aiohttp.ClientSession, source: Dict[str, Any], feed: Dict[str, str]):
+        async with slots:
+            result = await probe_feed(client, feed["url"], timeout)
+        result["meta"] = {
+            "source": source.get("name"),
+            "domain": source.get("domain"),
+            "feed": feed["url"],
+            "kind": feed["kind"]
+        }
+        return result
+
+    if session is not None:
+        return list(await asyncio.gather(*(run(session, s, f) for s, f in targets)))
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=4, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        headers={"User-Agent": settings.crawler_user_agent}
+    ) as client:
+        return list(await asyncio.gather(*(run(client, s, f) for s, f in targets)))
+
+
+async def probe_feed(
+    session: aiohttp.ClientSession,
+    url: str,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Fetch one feed and measure it.
+
+    ``latency_ms`` is the time to the response headers; ``newest_item_age_s``
+    is how long ago the most recent entry was published (None when the feed
+    has no dated entries or could not be fetched).
+    """
+    result = {
+        "checked_at": datetime.utcnow(),
+        "ok": False,
+        "status_code": None,
+        "latency_ms": None,
+        "bytes": 0,
+        "items": 0,
+        "newest_item_age_s": None,
+        "error": None
+    }
+    started = time.perf_counter()
+    try:
+        client_timeout = aiohttp.ClientTimeout(total=timeout or settings.source_health_timeout)
+        async with session.get(url, timeout=client_timeout) as response:
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            result["status_code"] = response.status
+
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                body.extend(chunk)
+                if len(body) >= settings.source_health_max_bytes:
+                    break
+            result["bytes"] = len(body)
+
+            if response.status == 200:
+                # feedparser is CPU-bound; keep it off the event loop
+                items, newest = await asyncio.to_thread(_newest_entry, bytes(body))
+                result["items"] = items
+                if newest is not None:
+                    result["newest_item_age_s"] = max(0, int(time.time() - newest))
+                result["ok"] = items > 0
+                if not result["ok"]:
+                    result["error"] = "no feed entries"
+            else:
+                result["error"] = f"HTTP {response.status}"
+    except asyncio.TimeoutError:
+        result["error"] = "timeout"
+    except aiohttp.ClientError as e:
+        result["error"] = f"{type(e).__name__}: {e}"[:200]
+    except Exception as e:
+        # Anything else (bad URL, parser crash) still marks the feed unhealthy
+        logger.warning(f"Health probe of {url} failed: {e}")
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"[:200]
+
+    if result["latency_ms"] is None:
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _newest_entry(body: bytes):
+    """(entry count, newest published/updated unix time or None)"""
+    feed = feedparser.parse(body)
+    newest = None
+    for entry in feed.entries:
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        if parsed:
+            ts = calendar.timegm(parsed)
+            if newest is None or ts > newest:
+                newest = ts
+    return len(feed.entries), newest
+
+
+def _probe_view(probe: Dict[str, Any]) -> Dict[str, Any]:
+    """Probe document as returned by the API"""
+    return {
+        "feed": probe["meta"]["feed"],
+        "kind": probe["meta"]["kind"],
+        "ok": probe["ok"],
+        "status_code": probe["status_code"],
+        "latency_ms": probe["latency_ms"],
+        "bytes": probe["bytes"],
+        "items": probe["items"],
+        "newest_item_age_s": probe["newest_item_age_s"],
+        "error": probe["error"]
+    }
@@ -0,0 +1,152 @@
+"""
+Story Index - gom các bài báo gần trùng lặp thành một câu chuyện (story)
+
+Google News lists the same event from many outlets - often syndicated
+copies with only the outlet's name changed - and the crawl only dedupes by
+exact URL. Every article gets a MinHash signature of the word 3-shingles of
+its normalized title and lead. An LSH index (``BANDS`` bands of ``ROWS``
+signature rows) over the articles of the last ``story_window_days`` finds
+earlier articles whose estimated Jaccard similarity reaches
+``story_similarity``; the new article joins their ``story_id``, otherwise it
+starts a story of its own.
+
+The index lives in memory. Signatures are stored with the articles, so each
+process loads the recent ones at start and then, before every crawl run,
+those other processes stored since its last sync.
+"""
+
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from html import unescape
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import logging
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+from mongodb.api.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 96
+BANDS = 32
+ROWS = NUM_PERM // BANDS  # a pair at 0.5 similarity shares a band with ~99% probability
+SHINGLE_SIZE = 3
+LEAD_CHARS = 300
+
+# Fixed seed: signatures are stored and compared across processes
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(20240907)
+_A = _rng.randint(1, int(_PRIME), size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, int(_PRIME), size=NUM_PERM).astype(np.uint64)
+
+_TAGS = re.compile(r"<[^>]+>")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase words of ``text`` without markup or punctuation"""
+    text = _TAGS.sub(" ", unescape(text or ""))
+    text = unicodedata.normalize("NFC", text).lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    words = text.split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def signature(title: str, lead: str = "", size: int = SHINGLE_SIZE) -> Optional[List[int]]:
+    """MinHash of the title and the start of the lead; None for empty text"""
+    grams = shingles(normalize(f"{title} {(lead or '')[:LEAD_CHARS]}"), size)
+    if not grams:
+        return None
+    hashes = np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+    return ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1).tolist()
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def _bands(sig: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [(band, tuple(sig[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+
+@dataclass(eq=False)
+class _Entry:
+    article_id: str
+    story_id: str
+    signature: List[int]
+    at: datetime
+
+
+class StoryIndex:
+    """In-memory LSH index over the signatures of recent articles"""
+
+    def __init__(self, threshold: Optional[float] = None, window_days: Optional[int] = None):
+        self.threshold = threshold or settings.story_similarity
+        self.window = timedelta(days=window_days or settings.story_window_days)
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[_Entry]] = defaultdict(list)
+        self._entries: Deque[_Entry] = deque()  # oldest first
+        self._ids: Set[str] = set()
+        self._synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def match(self, sig: List[int]) -> Optional[str]:
+        """Story of the most similar indexed article, if similar enough"""
+        best, best_score = None, self.threshold
+        seen = set()
+        for key in _bands(sig):
+            for entry in self._buckets.get(key, ()):
+                if entry.article_id in seen:
+                    continue
+                seen.add(entry.article_id)
+                score = similarity(sig, entry.signature)
+                if score >= best_score:
+                    best, best_score = entry, score
+        return best.story_id if best else None
+
+    def add(self, article_id: str, story_id: str, sig: List[int], at: Optional[datetime] = None):
+        if article_id in self._ids:
+            return
+        entry = _Entry(article_id, story_id, sig, at or datetime.now())
+        for key in _bands(sig):
+            self._buckets[key].append(entry)
+        self._entries.append(entry)
+        self._ids.add(article_id)
+        self._evict(entry.at)
+
+    def _evict(self, now: datetime):
+        cutoff = now - self.window
+        while self._entries and self._entries[0].at < cutoff:
+            entry = self._entries.popleft()
+            self._ids.discard(entry.article_id)
+            for key in _bands(entry.signature):
+                bucket = self._buckets[key]
+                bucket.remove(entry)
+                if not bucket:
+                    del self._buckets[key]
+
+    async def sync(self, collection: Any):
+        """Index the articles stored (by any process) since the last sync"""
+        now = datetime.now()
+        since = self._synced_at - timedelta(minutes=1) if self._synced_at else now - self.window
+        cursor = collection.find(
+            {"created_at": {"$gt": since}, "story_signature": {"$ne": None}},
+            {"story_id": 1, "story_signature": 1, "created_at": 1}
+        ).sort("created_at", 1)
+        async for doc in cursor:
+            self.add(str(doc["_id"]), doc.get("story_id") or str(doc["_id"]), doc["story_signature"], doc["created_at"])
+        self._synced_at = now
+
+
+story_index = StoryIndex()
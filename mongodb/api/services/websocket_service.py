@@ -1,37 +1,16 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import List
-import json
+from typing import Any
 import logging
 
+from mongodb.api.websockets.hub import hub, EVENT_NEW_ARTICLE
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
 
-class WebSocketManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info("Client connected: %s", websocket.client)
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info("Client disconnected: %s", websocket.client)
-
-    async def send_message(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
-
-    async def broadcast(self, data: dict):
-        message = json.dumps(data)
-        await self.send_message(message)
-
-
-# Global WebSocket manager instance
-websocket_manager = WebSocketManager()
+# All WebSocket endpoints share the realtime hub, which handles Redis
+# fan-out across workers; kept under its old name for existing imports
+websocket_manager = hub
 
 
 class WebSocketService:
@@ -48,21 +27,29 @@ class WebSocketService:
         """Disconnect a WebSocket client"""
         self.manager.disconnect(websocket)
 
+    async def publish(self, event: str, data: Any):
+        """Publish an event to all connected clients on every worker"""
+        await self.manager.publish(event, data)
+
+    async def broadcast(self, message: dict):
+        """Broadcast a pre-built message to all connected clients"""
+        await self.manager.broadcast(message)
+
     async def broadcast_message(self, message: dict):
         """Broadcast a message to all connected clients"""
         await self.manager.broadcast(message)
 
     async def broadcast_disaster_article(self, article: dict):
         """Broadcast a new disaster article to all connected clients"""
-        message = {
-            "event": "new_disaster_article",
-            "data": article
-        }
-        await self.manager.broadcast(message)
+        await self.manager.publish(EVENT_NEW_ARTICLE, article)
 
     def get_connection_count(self) -> int:
         """Get the number of active connections"""
-        return len(self.manager.active_connections)
+        return self.manager.connection_count
+
+    def get_queue_metrics(self) -> dict:
+        """Get outbound queue metrics"""
+        return self.manager.broadcaster.metrics()
 
 
 async def handle_disaster_feed(websocket: WebSocket):
@@ -76,8 +63,4 @@ async def handle_disaster_feed(websocket: WebSocket):
 
 
 async def broadcast_disaster_article(article: dict):
-    message = json.dumps({
-        "event": "new_disaster_article",
-        "data": article
-    })
-    await websocket_manager.send_message(message)
\ No newline at end of file
+    await websocket_manager.publish(EVENT_NEW_ARTICLE, article)
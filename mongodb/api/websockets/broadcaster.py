@@ -0,0 +1,225 @@
+"""
+Concurrent WebSocket fan-out
+
+Each client gets a bounded outbound queue drained by its own writer task,
+so broadcasting is just "serialize once + put_nowait per client" and a
+slow socket can only ever delay itself.
+"""
+
+from fastapi import WebSocket
+from typing import Dict, Iterable, Optional, Union
+import asyncio
+import json
+import logging
+
+from mongodb.api.config.settings import settings
+from mongodb.api.websockets.wire import WireEvent
+
+logger = logging.getLogger(__name__)
+
+# Slow consumer policies (what to do when a client's queue is full)
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DISCONNECT = "disconnect"
+
+# "Try Again Later" - tells the client it was dropped for falling behind
+CLOSE_CODE_SLOW_CONSUMER = 1013
+
+# Wire formats
+FORMAT_JSON = "json"  # WebSocket text frame
+FORMAT_SSE = "sse"    # text/event-stream record
+
+
+class ClientChannel:
+    """Outbound queue and writer task for one WebSocket"""
+
+    def __init__(self, websocket: WebSocket, queue_size: int, fmt: str = FORMAT_JSON):
+        self.websocket = websocket
+        self.fmt = fmt
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+
+class Broadcaster:
+    """
+    Fan-out hub: serialize each message once, enqueue it for every client.
+
+    Policy when a client's queue is full:
+    - drop_oldest: discard the oldest queued frame and keep the client
+    - disconnect: close the client with code 1013 so it reconnects
+    """
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        policy: Optional[str] = None
+    ):
+        self.queue_size = queue_size or settings.ws_send_queue_size
+        self.policy = policy or settings.ws_slow_consumer_policy
+        self._channels: Dict[WebSocket, ClientChannel] = {}
+        self.total_dropped = 0
+        self.slow_disconnects = 0
+
+    def register(
+        self,
+        websocket: WebSocket,
+        fmt: str = FORMAT_JSON,
+        writer: bool = True
+    ) -> ClientChannel:
+        """
+        Start a writer task for an accepted WebSocket.
+
+        With ``writer=False`` nothing drains the queue; the caller reads
+        ``channel.queue`` itself (used by the SSE stream generator).
+        """
+        channel = self._channels.get(websocket)
+        if channel:
+            return channel
+
+        channel = ClientChannel(websocket, self.queue_size, fmt)
+        if writer:
+            channel.writer = asyncio.create_task(self._writer(channel))
+        self._channels[websocket] = channel
+        return channel
+
+    def unregister(self, websocket: WebSocket):
+        """Stop the writer task and forget the client"""
+        channel = self._channels.pop(websocket, None)
+        if channel and channel.writer and not channel.writer.done():
+            if channel.writer is not asyncio.current_task():
+                channel.writer.cancel()
+
+    def publish(self, message: Union[WireEvent, dict, str]) -> int:
+        """
+        Enqueue a message for every client without awaiting any socket.
+
+        Returns:
+            Number of clients the frame was queued for
+        """
+        if not self._channels:
+            return 0
+        return self.publish_to(list(self._channels), message)
+
+    def publish_to(self, websockets: Iterable[WebSocket], message: Union[WireEvent, dict, str]) -> int:
+        """Enqueue a message (serialized once per wire format) for a subset of clients"""
+        frames: Dict[str, str] = {}
+        delivered = 0
+        for websocket in websockets:
+            channel = self._channels.get(websocket)
+            if channel is None:
+                continue
+            text = frames.get(channel.fmt)
+            if text is None:
+                text = frames[channel.fmt] = encode(message, channel.fmt)
+            if self._enqueue(channel, text):
+                delivered += 1
+        return delivered
+
+    def send_to(self, websocket: WebSocket, message: Union[WireEvent, dict, str]) -> bool:
+        """Enqueue a message for one client (keeps writes on its writer task)"""
+        channel = self._channels.get(websocket)
+        if not channel:
+            return False
+        return self._enqueue(channel, encode(message, channel.fmt))
+
+    def _enqueue(self, channel: ClientChannel, text: str) -> bool:
+        try:
+            channel.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == POLICY_DISCONNECT:
+            self._drop_client(channel)
+            return False
+
+        # drop_oldest: make room by discarding the oldest frame
+        try:
+            channel.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        channel.dropped += 1
+        self.total_dropped += 1
+        channel.queue.put_nowait(text)
+        return True
+
+    def _drop_client(self, channel: ClientChannel):
+        """Disconnect a client that cannot keep up"""
+        self.slow_disconnects += 1
+        self.total_dropped += channel.depth
+        logger.warning(
+            f"🐢 Disconnecting slow WebSocket client "
+            f"(queue {channel.depth}/{self.queue_size})"
+        )
+        self.unregister(channel.websocket)
+        asyncio.create_task(self._close(channel.websocket))
+        # Replace the backlog with None so a reader-driven (SSE) client
+        # wakes up and ends its stream
+        while not channel.queue.empty():
+            channel.queue.get_nowait()
+        channel.queue.put_nowait(None)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=CLOSE_CODE_SLOW_CONSUMER)
+        except Exception:
+            pass
+
+    async def _writer(self, channel: ClientChannel):
+        """Drain one client's queue onto its socket"""
+        try:
+            while True:
+                text = await channel.queue.get()
+                await channel.websocket.send_text(text)
+                channel.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"WebSocket writer stopped: {e}")
+            self.unregister(channel.websocket)
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._channels)
+
+    def metrics(self) -> dict:
+        """Queue depth and drop counters for status endpoints"""
+        depths = [c.depth for c in self._channels.values()]
+        return {
+            "clients": len(depths),
+            "queue_size": self.queue_size,
+            "policy": self.policy,
+            "queue_depth_max": max(depths) if depths else 0,
+            "queue_depth_avg": round(sum(depths) / len(depths), 2) if depths else 0,
+            "queued_total": sum(depths),
+            "dropped_total": self.total_dropped,
+            "slow_disconnects": self.slow_disconnects
+        }
+
+
+def encode(message: Union[WireEvent, dict, str], fmt: str = FORMAT_JSON) -> str:
+    """Serialize a message once for all recipients of a wire format"""
+    if isinstance(message, WireEvent):
+        # Already serialized by the publishing worker
+        text, seq, event_type = message.body, message.seq, message.type
+    elif isinstance(message, dict):
+        text = json.dumps(message, default=str, ensure_ascii=False)
+        seq, event_type = message.get("seq"), message.get("type")
+    else:
+        text, seq, event_type = message, None, None
+
+    if fmt != FORMAT_SSE:
+        return text
+
+    lines = []
+    if seq is not None:
+        lines.append(f"id: {seq}")
+    if event_type:
+        lines.append(f"event: {event_type}")
+    lines.append(f"data: {text}")
+    return "\n".join(lines) + "\n\n"
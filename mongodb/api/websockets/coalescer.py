@@ -0,0 +1,117 @@
+"""
+Micro-batching for bursty feed events
+
+During a crawl or a batch ingest hundreds of ``new_disaster`` events are
+published within a second. The coalescer holds them for a short window
+(or until N are pending) and emits a single ``new_disasters`` frame with
+the items plus a stats delta, so each client gets one frame per burst
+instead of one per article.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import asyncio
+import logging
+
+from mongodb.api.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_NEW_DISASTERS = "new_disasters"
+
+
+class EventCoalescer:
+    """Collects events and flushes them as one batch per window"""
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], Awaitable[None]],
+        window_ms: Optional[int] = None,
+        max_events: Optional[int] = None
+    ):
+        self._flush = flush
+        self.window = (settings.ws_coalesce_window_ms if window_ms is None else window_ms) / 1000
+        self.max_events = max_events or settings.ws_coalesce_max_events
+        self._pending: List[Any] = []
+        self._timer: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    async def add(self, item: Any):
+        """Queue an item; flushes immediately once max_events are pending"""
+        self._pending.append(item)
+        if len(self._pending) >= self.max_events:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.window)
+        except asyncio.CancelledError:
+            return
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Emit everything pending as one batch"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        items, self._pending = self._pending, []
+        if not items:
+            return
+        self.batches += 1
+        self.coalesced += len(items)
+        try:
+            await self._flush(items)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(items)} coalesced events: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": int(self.window * 1000),
+            "max_events": self.max_events,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "coalesced_events": self.coalesced
+        }
+
+
+def batch_data(items: Sequence[Any]) -> dict:
+    """Payload of a ``new_disasters`` frame"""
+    return {
+        "items": list(items),
+        "count": len(items),
+        "stats_delta": stats_delta(items)
+    }
+
+
+def stats_delta(items: Sequence[Any]) -> Dict[str, Any]:
+    """Counter increments a dashboard can apply without refetching stats"""
+    by_severity: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+    by_region: Dict[str, int] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        for counts, field in ((by_severity, "severity"), (by_type, "disaster_type"), (by_region, "region")):
+            value = item.get(field)
+            if value:
+                counts[value] = counts.get(value, 0) + 1
+    return {
+        "disasters": len(items),
+        "by_severity": by_severity,
+        "by_type": by_type,
+        "by_region": by_region
+    }
+
+
+def subset_batch(message: dict, indices: Sequence[int]) -> dict:
+    """Same batch frame (same seq) narrowed to some of its items"""
+    items = message["data"]["items"]
+    return {**message, "data": batch_data([items[i] for i in indices])}
@@ -0,0 +1,136 @@
+"""
+Shared heartbeat for all realtime sockets
+
+One task per worker ticks every ``ws_heartbeat_interval`` seconds, encodes
+the heartbeat frame once and queues it for every client. Liveness is
+tracked on a timer wheel: each socket sits in the bucket of the tick it was
+last heard from, so expiring idle sockets only looks at the buckets that
+just aged out instead of every connection.
+"""
+
+from fastapi import WebSocket
+from typing import Dict, Optional, Set, TYPE_CHECKING
+from datetime import datetime
+import asyncio
+import logging
+
+from mongodb.api.config.settings import settings
+
+if TYPE_CHECKING:
+    from mongodb.api.websockets.hub import RealtimeHub
+
+logger = logging.getLogger(__name__)
+
+EVENT_HEARTBEAT = "heartbeat"
+
+# "Going Away" - sent to sockets evicted for inactivity
+CLOSE_CODE_IDLE = 1001
+
+
+class HeartbeatService:
+    """Single heartbeat timer + last-seen liveness wheel"""
+
+    def __init__(
+        self,
+        hub: "RealtimeHub",
+        interval: Optional[int] = None,
+        idle_timeout: Optional[int] = None
+    ):
+        self.hub = hub
+        self.interval = interval or settings.ws_heartbeat_interval
+        idle_timeout = settings.ws_idle_timeout if idle_timeout is None else idle_timeout
+        # 0 disables eviction: browsers answer protocol-level pings (handled
+        # by the ASGI server) but do not send application messages
+        self.idle_ticks = -(-idle_timeout // self.interval) if idle_timeout > 0 else 0
+        self.tick = 0
+        self._wheel: Dict[int, Set[WebSocket]] = {}
+        self._slot: Dict[WebSocket, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.evicted = 0
+
+    def start(self):
+        """Start the heartbeat task (idempotent)"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def touch(self, websocket: WebSocket):
+        """Record that a socket was heard from in the current tick"""
+        slot = self._slot.get(websocket)
+        if slot == self.tick:
+            return
+        if slot is not None:
+            self._discard(websocket, slot)
+        self._wheel.setdefault(self.tick, set()).add(websocket)
+        self._slot[websocket] = self.tick
+
+    def forget(self, websocket: WebSocket):
+        slot = self._slot.pop(websocket, None)
+        if slot is not None:
+            self._discard(websocket, slot)
+
+    def _discard(self, websocket: WebSocket, slot: int):
+        bucket = self._wheel.get(slot)
+        if bucket is not None:
+            bucket.discard(websocket)
+            if not bucket:
+                del self._wheel[slot]
+
+    async def _loop(self):
+        """Send periodic heartbeats"""
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                self.beat()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Heartbeat error: {e}")
+
+    def beat(self) -> int:
+        """
+        One tick: queue the heartbeat frame and evict idle sockets.
+        The frame is encoded once per wire format by the broadcaster.
+        """
+        self.tick += 1
+        if self.idle_ticks:
+            self._evict_idle()
+
+        if not self.hub.connection_count:
+            return 0
+        frame = {
+            "event": EVENT_HEARTBEAT,
+            "type": EVENT_HEARTBEAT,
+            "timestamp": datetime.utcnow().isoformat(),
+            "connections": self.hub.connection_count
+        }
+        return self.hub.broadcaster.publish(frame)
+
+    def _evict_idle(self):
+        cutoff = self.tick - self.idle_ticks
+        expired = [slot for slot in self._wheel if slot <= cutoff]
+        for slot in expired:
+            for websocket in self._wheel.pop(slot):
+                self._slot.pop(websocket, None)
+                self.evicted += 1
+                self.hub.disconnect(websocket)
+                asyncio.create_task(self._close(websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=CLOSE_CODE_IDLE)
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "idle_timeout_ticks": self.idle_ticks,
+            "tracked": len(self._slot),
+            "evicted": self.evicted
+        }
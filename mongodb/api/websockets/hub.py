@@ -0,0 +1,400 @@
+"""
+Realtime Hub - single WebSocket registry for every realtime endpoint
+
+Producers call ``publish(event, data)``. When Redis is connected the event
+only goes to Redis and every worker (including this one) fans it out to its
+local clients from the subscription, so each client receives it exactly
+once. Without Redis the event is fanned out locally.
+"""
+
+from fastapi import WebSocket
+from typing import Any, List, Optional, Sequence, Set, Tuple
+from datetime import datetime
+from collections import deque
+import logging
+
+from mongodb.api.config.settings import settings
+
+from mongodb.api.websockets.broadcaster import Broadcaster, ClientChannel, FORMAT_SSE
+from mongodb.api.websockets.heartbeat import HeartbeatService
+from mongodb.api.websockets.coalescer import (
+    EventCoalescer, EVENT_NEW_DISASTERS, batch_data, subset_batch
+)
+from mongodb.api.websockets.wire import WireEvent, resolve_wire_format
+from mongodb.api.websockets.subscriptions import Subscription, SubscriptionIndex
+
+logger = logging.getLogger(__name__)
+
+# Event names
+EVENT_NEW_DISASTER = "new_disaster"
+EVENT_NEW_ARTICLE = "new_disaster_article"
+EVENT_ALERT = "disaster_alert"
+EVENT_STATS_UPDATE = "stats_update"
+EVENT_REPLAY_GAP = "replay_gap"
+
+# Redis counter shared by all workers so every event has one global seq
+SEQ_KEY = "realtime:seq"
+
+
+class StreamClient:
+    """Hub participant for an SSE response (identity only; no socket to close)"""
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+class RealtimeHub:
+    """
+    Manages WebSocket connections with Redis pub/sub support.
+    Enables horizontal scaling across multiple workers.
+    """
+
+    def __init__(self):
+        self.active_connections: Set[WebSocket] = set()
+        self.broadcaster = Broadcaster()
+        self.subscriptions = SubscriptionIndex()
+        self.redis_connected: bool = False
+        self.heartbeat = HeartbeatService(self)
+        self.coalescer = EventCoalescer(self._publish_batch)
+        self.wire_format = resolve_wire_format(settings.realtime_wire_format)
+        # Sequenced events, oldest first; every worker sees every event
+        # through Redis, so each worker's buffer holds the same window
+        self.replay_buffer: deque = deque(maxlen=settings.ws_replay_buffer_size)
+        self.last_seq = 0
+
+    # ========================================
+    # Connections
+    # ========================================
+
+    async def connect(self, websocket: WebSocket):
+        """Accept and register a WebSocket connection"""
+        await websocket.accept()
+        self.active_connections.add(websocket)
+        self.broadcaster.register(websocket)
+        self.subscriptions.add(websocket)
+        self.heartbeat.touch(websocket)
+        self.heartbeat.start()
+        logger.info(f"🔌 WebSocket connected. Total: {len(self.active_connections)}")
+
+    def disconnect(self, websocket: WebSocket):
+        """Remove WebSocket connection"""
+        if websocket not in self.active_connections:
+            return
+        self.active_connections.discard(websocket)
+        self.broadcaster.unregister(websocket)
+        self.subscriptions.remove(websocket)
+        self.heartbeat.forget(websocket)
+        logger.info(f"🔌 WebSocket disconnected. Total: {len(self.active_connections)}")
+
+    def connect_stream(self, client: Any, filters: Optional[dict] = None) -> ClientChannel:
+        """
+        Register a read-only (SSE) client. The caller drains the returned
+        channel's queue; frames arrive pre-encoded as event-stream records.
+        Stream clients are not tracked by the heartbeat wheel - a closed
+        HTTP response ends the generator, which calls disconnect().
+        """
+        self.active_connections.add(client)
+        channel = self.broadcaster.register(client, fmt=FORMAT_SSE, writer=False)
+        self.subscriptions.add(client, Subscription.from_message(filters) if filters else None)
+        self.heartbeat.start()
+        logger.info(f"📺 Stream client connected. Total: {len(self.active_connections)}")
+        return channel
+
+    def touch(self, websocket: WebSocket):
+        """Mark a client as alive (call on every inbound message)"""
+        self.heartbeat.touch(websocket)
+
+    async def send_personal(self, websocket: WebSocket, message: dict):
+        """Queue a message for one client"""
+        self.broadcaster.send_to(websocket, message)
+
+    def subscribe(self, websocket: WebSocket, data: dict) -> dict:
+        """
+        Apply a client ``subscribe`` message.
+
+        Accepts ``{"topics": ["region:north", "disaster_type:flood",
+        "severity:medium"]}`` or explicit ``regions`` / ``disaster_types``
+        / ``min_severity`` fields. Returns the effective filters.
+        """
+        subscription = Subscription.from_message(data)
+        self.subscriptions.add(websocket, subscription)
+        return subscription.to_dict()
+
+    def unsubscribe(self, websocket: WebSocket) -> dict:
+        """Reset a client to the unfiltered feed"""
+        self.subscriptions.add(websocket)
+        return Subscription().to_dict()
+
+    # ========================================
+    # Publishing
+    # ========================================
+
+    async def publish(self, event: str, data: Any) -> None:
+        """
+        Publish an event to every client on every worker.
+
+        The envelope carries both ``event`` and ``type`` so dashboard
+        clients and the realtime test page read the same frame.
+        ``new_disaster`` events are coalesced into ``new_disasters``
+        batches when ws_coalesce_window_ms is set.
+        """
+        if event == EVENT_NEW_DISASTER and self.coalescer.enabled:
+            await self.coalescer.add(data)
+            return
+        await self.broadcast(_envelope(event, data))
+
+    async def publish_now(self, events: Sequence[Tuple[str, Any]]) -> None:
+        """
+        Publish events that arrived together (an event bus batch) without
+        waiting for the coalescing window: their ``new_disaster`` events
+        already form the burst and go out as one frame.
+        """
+        disasters = [data for event, data in events if event == EVENT_NEW_DISASTER]
+        for event, data in events:
+            if event != EVENT_NEW_DISASTER:
+                await self.broadcast(_envelope(event, data))
+        if not disasters:
+            return
+        if self.coalescer.enabled:
+            await self._publish_batch(disasters)
+        else:
+            for data in disasters:
+                await self.broadcast(_envelope(EVENT_NEW_DISASTER, data))
+
+    async def _publish_batch(self, items: List[Any]):
+        """Flush callback: a lone event keeps its plain new_disaster frame"""
+        if len(items) == 1:
+            await self.broadcast(_envelope(EVENT_NEW_DISASTER, items[0]))
+        else:
+            await self.broadcast(_envelope(EVENT_NEW_DISASTERS, batch_data(items)))
+
+    async def broadcast(self, message: dict) -> None:
+        """Publish a pre-built message envelope (assigned the next seq)"""
+        # Serialized once here; other workers forward this JSON body as-is
+        event = WireEvent.from_message({**message, "seq": await self._next_seq()})
+
+        if self.redis_connected:
+            try:
+                from mongodb.api.services.redis_service import RedisService, CHANNEL_EVENTS
+                await RedisService.publish_raw(CHANNEL_EVENTS, event.to_wire(self.wire_format))
+                return
+            except Exception as e:
+                # Other workers miss this one, but local clients still get it
+                logger.warning(f"Redis publish failed, broadcasting locally: {e}")
+
+        self.deliver_local(event)
+
+    def deliver_local(self, message: Any) -> int:
+        """Fan a message out to this worker's clients whose filters match"""
+        event = message if isinstance(message, WireEvent) else WireEvent.from_message(
+            message if isinstance(message, dict) else {"data": message}
+        )
+        if isinstance(event.seq, int):
+            self.replay_buffer.append(event)
+            self.last_seq = max(self.last_seq, event.seq)
+
+        if event.is_batch:
+            return self._deliver_batch(event)
+
+        targets = self.subscriptions.match(event.route)
+        if targets is None:
+            return self.broadcaster.publish(event)
+        return self.broadcaster.publish_to(targets, event)
+
+    def _deliver_batch(self, event: WireEvent) -> int:
+        """
+        Fan out a ``new_disasters`` batch. Sockets with identical filters
+        share one frame; each group gets only the items it subscribed to.
+        Routing uses the per-item header, so the body is only decoded when
+        some group needs a narrowed copy.
+        """
+        routes = event.route or []
+        delivered = 0
+        for subscription, sockets in list(self.subscriptions.groups()):
+            indices = [i for i, route in enumerate(routes) if subscription.matches(route)]
+            if not indices:
+                continue
+            frame = event if len(indices) == len(routes) else subset_batch(event.message, indices)
+            delivered += self.broadcaster.publish_to(sockets, frame)
+        return delivered
+
+    async def _next_seq(self) -> int:
+        """Next global sequence number (Redis INCR, local counter without Redis)"""
+        if self.redis_connected:
+            try:
+                from mongodb.api.services.redis_service import RedisService
+                return await RedisService.get_client().incr(SEQ_KEY)
+            except Exception as e:
+                logger.debug(f"Redis seq error: {e}")
+        self.last_seq += 1
+        return self.last_seq
+
+    # ========================================
+    # Replay
+    # ========================================
+
+    def replay(self, websocket: WebSocket, last_seq: int) -> int:
+        """
+        Queue every buffered event after ``last_seq`` that matches the
+        client's filters. Runs synchronously, so replayed frames are queued
+        before any live event that arrives afterwards.
+
+        If the buffer no longer reaches back to ``last_seq`` a
+        ``replay_gap`` frame is sent first so the client can backfill
+        from /realtime/recent.
+
+        Returns:
+            Number of events replayed
+        """
+        if last_seq >= self.last_seq:
+            return 0
+
+        oldest = self.replay_buffer[0].seq if self.replay_buffer else self.last_seq + 1
+        if oldest > last_seq + 1:
+            self.broadcaster.send_to(websocket, {
+                "event": EVENT_REPLAY_GAP,
+                "type": EVENT_REPLAY_GAP,
+                "data": {"last_seq": last_seq, "oldest_seq": oldest}
+            })
+
+        subscription = self.subscriptions.get(websocket)
+        missed = sorted(
+            (e for e in self.replay_buffer if e.seq > last_seq),
+            key=lambda e: e.seq
+        )
+        count = 0
+        for message in missed:
+            if subscription is not None:
+                message = _filter_for(subscription, message)
+                if message is None:
+                    continue
+            if self.broadcaster.send_to(websocket, message):
+                count += 1
+        return count
+
+    # ========================================
+    # Redis
+    # ========================================
+
+    async def setup_redis_subscriber(self):
+        """Setup Redis pub/sub subscription for scaling"""
+        try:
+            from mongodb.api.services.redis_service import (
+                RedisService,
+                CHANNEL_EVENTS,
+                CHANNEL_NEW_ARTICLE,
+                CHANNEL_ALERT,
+                CHANNEL_STATS_UPDATE
+            )
+
+            await RedisService.connect()
+
+            # CHANNEL_EVENTS carries hub.publish() envelopes as raw bytes,
+            # drained in batches; the legacy channels are kept for external
+            # publishers using redis_service.publish_* helpers
+            await RedisService.subscribe_raw(CHANNEL_EVENTS, self._on_redis_batch)
+            RedisService.on_raw_state(self._on_redis_state)
+            for channel in (CHANNEL_NEW_ARTICLE, CHANNEL_ALERT, CHANNEL_STATS_UPDATE):
+                await RedisService.subscribe(channel, self._on_redis_message)
+
+            self.redis_connected = True
+            logger.info("📡 Realtime hub connected to Redis pub/sub")
+
+        except Exception as e:
+            logger.warning(f"Redis pub/sub not available: {e}. Using local broadcast only.")
+            self.redis_connected = False
+
+    def _on_redis_state(self, healthy: bool):
+        """
+        Raw listener health. While it is down, broadcast() delivers locally
+        (publishing to Redis would reach no one on this worker, silently).
+        """
+        if healthy != self.redis_connected:
+            logger.warning(f"Realtime Redis fan-out {'restored' if healthy else 'lost - broadcasting locally'}")
+        self.redis_connected = healthy
+
+    async def _on_redis_message(self, message: Any):
+        """Handle messages from Redis pub/sub"""
+        self.deliver_local(message)
+
+    def _on_redis_batch(self, payloads: List[bytes]):
+        """Handle a batch of raw envelopes: parse headers, forward bodies"""
+        for raw in payloads:
+            try:
+                self.deliver_local(WireEvent.from_wire(raw))
+            except Exception as e:
+                logger.error(f"Bad realtime envelope: {e}")
+
+    # ========================================
+    # Heartbeat
+    # ========================================
+
+    async def start_heartbeat(self):
+        """Start the shared heartbeat task"""
+        self.heartbeat.start()
+
+    async def stop(self):
+        """Stop background tasks and drop every client"""
+        await self.coalescer.flush()
+        self.heartbeat.stop()
+        for websocket in list(self.active_connections):
+            self.disconnect(websocket)
+
+    # ========================================
+    # Status
+    # ========================================
+
+    @property
+    def connection_count(self) -> int:
+        return len(self.active_connections)
+
+    def status(self) -> dict:
+        """Connection and queue status for status endpoints"""
+        return {
+            "active_connections": self.connection_count,
+            "redis_connected": self.redis_connected,
+            "send_queues": self.broadcaster.metrics(),
+            "subscriptions": self.subscriptions.stats(),
+            "heartbeat": self.heartbeat.stats(),
+            "coalescing": self.coalescer.stats(),
+            "wire_format": self.wire_format,
+            "last_seq": self.last_seq,
+            "replay_buffered": len(self.replay_buffer)
+        }
+
+
+def _envelope(event: str, data: Any) -> dict:
+    return {
+        "event": event,
+        "type": event,
+        "data": data,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+def _filter_for(subscription: Subscription, event: WireEvent) -> Optional[Any]:
+    """Frame as this subscription should see it (None = filtered out)"""
+    if event.is_batch:
+        routes = event.route or []
+        indices = [i for i, route in enumerate(routes) if subscription.matches(route)]
+        if not indices:
+            return None
+        return event if len(indices) == len(routes) else subset_batch(event.message, indices)
+    return event if subscription.matches(event.route) else None
+
+
+# Global hub - the only WebSocket registry in the process
+hub = RealtimeHub()
+
+
+def get_hub() -> RealtimeHub:
+    """Get the realtime hub"""
+    return hub
+
+
+async def publish_event(event: str, data: Any):
+    """Publish an event to all realtime clients (all workers)"""
+    try:
+        await hub.publish(event, data)
+    except Exception as e:
+        logger.error(f"Failed to publish {event}: {e}")
@@ -0,0 +1,240 @@
+"""
+Topic subscriptions for the realtime feed
+
+Clients narrow the feed by region, disaster_type and minimum severity.
+The index maps each topic value to the set of sockets that asked for it
+(plus a wildcard set for sockets without that filter), so routing an
+event is a few set intersections instead of a scan over every client.
+"""
+
+from fastapi import WebSocket
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Severity order for min_severity filters
+SEVERITY_LEVELS = {"low": 0, "medium": 1, "high": 2}
+
+
+class Subscription:
+    """Filters for one socket (None means "everything")"""
+
+    def __init__(
+        self,
+        regions: Optional[Iterable[str]] = None,
+        disaster_types: Optional[Iterable[str]] = None,
+        min_severity: Optional[str] = None
+    ):
+        self.regions = _normalize(regions)
+        self.disaster_types = _normalize(disaster_types)
+        self.min_severity = min_severity if min_severity in SEVERITY_LEVELS else None
+
+    @classmethod
+    def from_topics(cls, topics: Iterable[str]) -> "Subscription":
+        """
+        Parse ``["region:north", "disaster_type:flood", "severity:medium"]``.
+        Unknown topic kinds are ignored.
+        """
+        regions, disaster_types, min_severity = [], [], None
+        for topic in topics or []:
+            kind, _, value = str(topic).partition(":")
+            kind, value = kind.strip().lower(), value.strip().lower()
+            if not value:
+                continue
+            if kind == "region":
+                regions.append(value)
+            elif kind in ("disaster_type", "type"):
+                disaster_types.append(value)
+            elif kind in ("severity", "min_severity"):
+                min_severity = value
+        return cls(regions or None, disaster_types or None, min_severity)
+
+    @classmethod
+    def from_message(cls, data: dict) -> "Subscription":
+        """Build from a client ``subscribe`` message (topics list or explicit fields)"""
+        topics = data.get("topics")
+        if isinstance(topics, str):
+            topics = [topics]
+        if isinstance(topics, (list, tuple)) and topics:
+            return cls.from_topics(topics)
+        min_severity = data.get("min_severity")
+        return cls(
+            data.get("regions"),
+            data.get("disaster_types"),
+            min_severity.strip().lower() if isinstance(min_severity, str) else None
+        )
+
+    def matches(self, data: Any) -> bool:
+        """Whether an event payload passes these filters"""
+        if not isinstance(data, dict):
+            return True
+        region = _value(data.get("region"))
+        disaster_type = _value(data.get("disaster_type"))
+        severity = _value(data.get("severity"))
+        if region is None and disaster_type is None and severity is None:
+            return True
+        if self.regions and region not in self.regions:
+            return False
+        if self.disaster_types and disaster_type not in self.disaster_types:
+            return False
+        if self.min_severity:
+            # Same rule as SubscriptionIndex.match: unknown counts as the lowest level
+            return SEVERITY_LEVELS.get(severity, 0) >= self.min_level
+        return True
+
+    @property
+    def key(self) -> tuple:
+        """Identical filters share a key (used to group sockets)"""
+        return (
+            frozenset(self.regions or ()),
+            frozenset(self.disaster_types or ()),
+            self.min_severity
+        )
+
+    @property
+    def min_level(self) -> int:
+        return SEVERITY_LEVELS.get(self.min_severity, 0)
+
+    def to_dict(self) -> dict:
+        return {
+            "regions": sorted(self.regions) if self.regions else None,
+            "disaster_types": sorted(self.disaster_types) if self.disaster_types else None,
+            "min_severity": self.min_severity
+        }
+
+
+class SubscriptionIndex:
+    """Topic -> subscriber set index used to route feed events"""
+
+    def __init__(self):
+        self._subs: Dict[WebSocket, Subscription] = {}
+        self._by_region: Dict[str, Set[WebSocket]] = {}
+        self._any_region: Set[WebSocket] = set()
+        self._by_type: Dict[str, Set[WebSocket]] = {}
+        self._any_type: Set[WebSocket] = set()
+        # _by_level[n] = sockets whose min severity is n
+        self._by_level: List[Set[WebSocket]] = [set() for _ in SEVERITY_LEVELS]
+        # Sockets grouped by identical filters
+        self._groups: Dict[tuple, Set[WebSocket]] = {}
+        self._group_subs: Dict[tuple, Subscription] = {}
+
+    def add(self, websocket: WebSocket, subscription: Optional[Subscription] = None):
+        """Register (or replace) a socket's filters"""
+        self.remove(websocket)
+        sub = subscription or Subscription()
+        self._subs[websocket] = sub
+
+        _index(self._by_region, self._any_region, sub.regions, websocket)
+        _index(self._by_type, self._any_type, sub.disaster_types, websocket)
+        self._by_level[sub.min_level].add(websocket)
+        self._groups.setdefault(sub.key, set()).add(websocket)
+        self._group_subs.setdefault(sub.key, sub)
+
+    def remove(self, websocket: WebSocket):
+        sub = self._subs.pop(websocket, None)
+        if sub is None:
+            return
+        _unindex(self._by_region, self._any_region, sub.regions, websocket)
+        _unindex(self._by_type, self._any_type, sub.disaster_types, websocket)
+        self._by_level[sub.min_level].discard(websocket)
+        group = self._groups.get(sub.key)
+        if group is not None:
+            group.discard(websocket)
+            if not group:
+                del self._groups[sub.key]
+                del self._group_subs[sub.key]
+
+    def get(self, websocket: WebSocket) -> Optional[Subscription]:
+        return self._subs.get(websocket)
+
+    def groups(self) -> Iterator[Tuple[Subscription, Set[WebSocket]]]:
+        """(filters, sockets) for each distinct set of filters"""
+        for key, sockets in self._groups.items():
+            yield self._group_subs[key], sockets
+
+    def match(self, data: Any) -> Optional[Set[WebSocket]]:
+        """
+        Sockets that should receive an event with this payload.
+
+        Returns None when the payload carries no routable fields
+        (heartbeats, stats), meaning "every client".
+        """
+        if not isinstance(data, dict):
+            return None
+        region = _value(data.get("region"))
+        disaster_type = _value(data.get("disaster_type"))
+        severity = _value(data.get("severity"))
+        if region is None and disaster_type is None and severity is None:
+            return None
+
+        candidates = [
+            _candidates(self._by_region, self._any_region, region),
+            _candidates(self._by_type, self._any_type, disaster_type),
+        ]
+
+        level = SEVERITY_LEVELS.get(severity)
+        if level is None:
+            # Unknown severity counts as the lowest level (no filter or "low")
+            candidates.append(self._by_level[0])
+        elif level < len(self._by_level) - 1:
+            candidates.append(set().union(*self._by_level[:level + 1]))
+
+        candidates.sort(key=len)
+        matched = set(candidates[0])
+        for group in candidates[1:]:
+            matched &= group
+            if not matched:
+                break
+        return matched
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subs),
+            "filtered": sum(
+                1 for s in self._subs.values()
+                if s.regions or s.disaster_types or s.min_severity
+            ),
+            "regions": {k: len(v) for k, v in self._by_region.items()},
+            "disaster_types": {k: len(v) for k, v in self._by_type.items()}
+        }
+
+
+def _normalize(values: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    if not values:
+        return None
+    if isinstance(values, str):
+        values = [values]
+    elif not isinstance(values, (list, tuple, set, frozenset)):
+        return None
+    normalized = {str(v).strip().lower() for v in values if str(v).strip()}
+    return normalized or None
+
+
+def _value(raw: Any) -> Optional[str]:
+    return str(raw).strip().lower() if raw else None
+
+
+def _index(by_value: Dict[str, Set[WebSocket]], wildcard: Set[WebSocket], values, websocket):
+    if not values:
+        wildcard.add(websocket)
+        return
+    for value in values:
+        by_value.setdefault(value, set()).add(websocket)
+
+
+def _unindex(by_value: Dict[str, Set[WebSocket]], wildcard: Set[WebSocket], values, websocket):
+    if not values:
+        wildcard.discard(websocket)
+        return
+    for value in values:
+        group = by_value.get(value)
+        if group is not None:
+            group.discard(websocket)
+            if not group:
+                del by_value[value]
+
+
+def _candidates(by_value: Dict[str, Set[WebSocket]], wildcard: Set[WebSocket], value: Optional[str]):
+    if value is None:
+        # Event without this field only reaches clients not filtering on it
+        return wildcard
+    group = by_value.get(value)
+    return wildcard | group if group else wildcard
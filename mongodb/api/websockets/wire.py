@@ -0,0 +1,125 @@
+"""
+Wire format for realtime events
+
+A feed event is serialized to JSON exactly once, by the worker that
+publishes it. Cross-worker delivery carries that JSON body untouched next to
+a tiny header (seq, type and the routing fields subscriptions filter on),
+so a receiving worker reads the header and forwards the body bytes to its
+clients without decoding and re-encoding the whole message.
+
+Envelopes:
+- json:    ``{"v":1,"seq":..,"type":..,"route":..}\\n<body>``
+- msgpack: ``[1, seq, type, route, body]`` (optional, needs ``msgpack``)
+"""
+
+from typing import Any, Optional, Union
+import json
+import logging
+
+from mongodb.api.websockets.coalescer import EVENT_NEW_DISASTERS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+WIRE_JSON = "json"
+WIRE_MSGPACK = "msgpack"
+
+WIRE_VERSION = 1
+_JSON_PREFIX = b'{"v":1,'
+
+# Payload fields subscriptions route on
+ROUTE_FIELDS = ("region", "disaster_type", "severity")
+
+
+class WireEvent:
+    """A published event: routing header + JSON body encoded once"""
+
+    __slots__ = ("seq", "type", "route", "body", "_message")
+
+    def __init__(
+        self,
+        seq: Optional[int],
+        type: Optional[str],
+        route: Any,
+        body: str,
+        message: Optional[dict] = None
+    ):
+        self.seq = seq
+        self.type = type
+        # dict of routing fields, None (route to everyone), or for a batch a
+        # list with one entry per item
+        self.route = route
+        self.body = body
+        self._message = message
+
+    @classmethod
+    def from_message(cls, message: dict) -> "WireEvent":
+        data = message.get("data")
+        if message.get("type") == EVENT_NEW_DISASTERS and isinstance(data, dict):
+            route = [_route(item) for item in data.get("items", [])]
+        else:
+            route = _route(data)
+        body = json.dumps(message, default=str, ensure_ascii=False)
+        return cls(message.get("seq"), message.get("type"), route, body, message)
+
+    @property
+    def is_batch(self) -> bool:
+        return self.type == EVENT_NEW_DISASTERS
+
+    @property
+    def message(self) -> dict:
+        """Full message, decoded lazily (only when a batch must be narrowed)"""
+        if self._message is None:
+            self._message = json.loads(self.body)
+        return self._message
+
+    def to_wire(self, fmt: str = WIRE_JSON) -> bytes:
+        if fmt == WIRE_MSGPACK and msgpack is not None:
+            return msgpack.packb([WIRE_VERSION, self.seq, self.type, self.route, self.body])
+        header = json.dumps(
+            {"v": WIRE_VERSION, "seq": self.seq, "type": self.type, "route": self.route},
+            separators=(",", ":"), ensure_ascii=False
+        )
+        return (header + "\n" + self.body).encode("utf-8")
+
+    @classmethod
+    def from_wire(cls, raw: Union[bytes, str]) -> "WireEvent":
+        """
+        Parse an envelope. Plain JSON messages from legacy publishers are
+        accepted too (and decoded fully, since they have no header).
+        """
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+
+        if raw[:1] == b"\x95" and msgpack is not None:
+            _, seq, type_, route, body = msgpack.unpackb(raw)
+            return cls(seq, type_, route, body)
+
+        if raw.startswith(_JSON_PREFIX):
+            header, _, body = raw.partition(b"\n")
+            meta = json.loads(header)
+            return cls(meta.get("seq"), meta.get("type"), meta.get("route"), body.decode("utf-8"))
+
+        message = json.loads(raw)
+        if not isinstance(message, dict):
+            message = {"data": message}
+        return cls.from_message(message)
+
+
+def resolve_wire_format(fmt: str) -> str:
+    """Configured envelope, falling back to json when msgpack is missing"""
+    if fmt == WIRE_MSGPACK and msgpack is None:
+        logger.warning("msgpack not installed - using json realtime envelope")
+        return WIRE_JSON
+    return fmt if fmt in (WIRE_JSON, WIRE_MSGPACK) else WIRE_JSON
+
+
+def _route(data: Any) -> Optional[dict]:
+    if not isinstance(data, dict):
+        return None
+    route = {k: data[k] for k in ROUTE_FIELDS if data.get(k)}
+    return route or None
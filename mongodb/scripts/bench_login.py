@@ -0,0 +1,79 @@
+"""
+Benchmark: concurrent logins vs. event-loop latency
+
+Runs a burst of concurrent bcrypt verifications the old way (inline on the
+event loop) and the new way (hash pool), while a probe coroutine measures
+how late the loop wakes it up - a stand-in for API/WebSocket latency.
+
+Usage: python mongodb/scripts/bench_login.py [logins] [concurrency]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from mongodb.api.auth.jwt_auth import get_password_hash, verify_password, verify_password_async
+
+PROBE_INTERVAL = 0.005  # seconds between probe wakeups
+
+
+async def probe(stop: asyncio.Event, lags: list):
+    """Record how late each scheduled wakeup actually runs"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def run(mode: str, hashed: str, logins: int, concurrency: int) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with slots:
+            if mode == "inline":
+                return verify_password("secret-password", hashed)
+            return await verify_password_async("secret-password", hashed)
+
+    stop, lags = asyncio.Event(), []
+    probe_task = asyncio.create_task(probe(stop, lags))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe_task
+    assert all(results)
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "logins_per_s": logins / elapsed,
+        "probe_p50_ms": statistics.median(lags) if lags else 0.0,
+        "probe_p99_ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0,
+        "probe_max_ms": lags[-1] if lags else 0.0,
+        "probe_samples": len(lags)
+    }
+
+
+async def main(logins: int, concurrency: int):
+    hashed = get_password_hash("secret-password")
+    print(f"{logins} logins, concurrency {concurrency}\n")
+    print(f"{'mode':<10}{'logins/s':>10}{'p50 lag ms':>12}{'p99 lag ms':>12}{'max lag ms':>12}")
+    for mode in ("inline", "executor"):
+        r = await run(mode, hashed, logins, concurrency)
+        print(
+            f"{r['mode']:<10}{r['logins_per_s']:>10.1f}{r['probe_p50_ms']:>12.2f}"
+            f"{r['probe_p99_ms']:>12.2f}{r['probe_max_ms']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    asyncio.run(main(logins, concurrency))
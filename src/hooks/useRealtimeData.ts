@@ -10,6 +10,7 @@ import type {
   ArticlesResponse, 
   Article as APIArticle, 
   RealtimeDisasterEvent,
+  RealtimeDisasterBatch,
   RealtimeStats,
   DashboardOverview
 } from '@/types/api';
@@ -73,8 +74,12 @@ export const useRealtimeWebSocket = () => {
   const [connectionAttempted, setConnectionAttempted] = useState(false);
   const queryClient = useQueryClient();
 
-  const handleMessage = useCallback((event: RealtimeDisasterEvent) => {
-    setEvents(prev => [event, ...prev].slice(0, 100)); // Keep last 100 events
+  const handleMessage = useCallback((message: RealtimeDisasterEvent | RealtimeDisasterBatch) => {
+    // Bursts arrive as one new_disasters frame; unpack into single events
+    const incoming: RealtimeDisasterEvent[] = message.type === 'new_disasters'
+      ? message.data.items.map(data => ({ type: 'new_disaster', data, timestamp: message.timestamp }))
+      : [message];
+    setEvents(prev => [...incoming.reverse(), ...prev].slice(0, 100)); // Keep last 100 events
     
     // Invalidate queries to refresh data
     queryClient.invalidateQueries({ queryKey: ['realtime-data'] });
@@ -163,6 +163,9 @@ export class WebSocketManager {
   private listeners: Map<string, Set<(data: unknown) => void>> = new Map();
   private messageCallbacks: Set<(data: unknown) => void> = new Set();
   private shouldReconnect = true;
+  // Highest event seq received; sent as ?last_seq= on reconnect so the
+  // server replays what was missed while disconnected
+  private lastSeq: number | null = null;
   
   constructor(endpoint: string) {
     this.url = `${WS_BASE_URL}${endpoint}`;
@@ -176,7 +179,10 @@ export class WebSocketManager {
       }
       
       try {
-        this.ws = new WebSocket(this.url);
+        const url = this.lastSeq !== null
+          ? `${this.url}${this.url.includes('?') ? '&' : '?'}last_seq=${this.lastSeq}`
+          : this.url;
+        this.ws = new WebSocket(url);
         
         this.ws.onopen = () => {
           console.log('✅ WebSocket connected to:', this.url);
@@ -189,6 +195,10 @@ export class WebSocketManager {
         this.ws.onmessage = (event) => {
           try {
             const data = JSON.parse(event.data);
+            // Only sequenced events advance the resume point
+            if (data.event && typeof data.seq === 'number') {
+              this.lastSeq = Math.max(this.lastSeq ?? 0, data.seq);
+            }
             this.emit(data.type || 'message', data);
             // Call all message callbacks
             this.messageCallbacks.forEach(callback => callback(data));
@@ -215,8 +215,26 @@ export interface RealtimeStats {
   active_connections: number;
 }
 
+export interface RealtimeDisasterBatch {
+  type: 'new_disasters';
+  seq?: number;
+  data: {
+    items: NonNullable<RealtimeDisasterEvent['data']>[];
+    count: number;
+    stats_delta: {
+      disasters: number;
+      by_severity: Record<string, number>;
+      by_type: Record<string, number>;
+      by_region: Record<string, number>;
+    };
+  };
+  timestamp?: string;
+}
+
 export interface RealtimeDisasterEvent {
   type: 'new_disaster' | 'heartbeat' | 'connected';
+  seq?: number;
+  head_seq?: number;  // connected frames: newest seq at connect time
   data?: {
     title: string;
     source: string;
@@ -15,6 +15,8 @@ os.environ["MONGO_URI"] = "mongodb://localhost:27017"
 os.environ["DATABASE_NAME"] = "disaster_monitor_test"
 os.environ["SECRET_KEY"] = "test-secret-key-for-testing-only"
 os.environ["DEBUG"] = "true"
+# API tests log in repeatedly from one address; the limiter has its own tests
+os.environ["RATE_LIMIT_ENABLED"] = "false"
 
 
 @pytest.fixture(scope="session")
@@ -120,3 +122,13 @@ def sample_source() -> dict:
         "is_active": True,
         "categories": ["Thời sự", "Thiên tai"]
     }
+
+
+@pytest.fixture
+async def fake_redis():
+    """In-memory Redis (fakeredis) for stream / pub-sub tests"""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield client
+    await client.flushall()
+    await client.aclose()
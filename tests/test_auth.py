@@ -0,0 +1,113 @@
+"""
+Tests for cached principal resolution and password hashing
+"""
+
+import asyncio
+import json
+import pytest
+from fastapi import HTTPException
+
+from mongodb.api.auth import jwt_auth
+from mongodb.api.auth.principal_cache import PrincipalCache
+
+
+class CountingLoader:
+    """Stands in for get_user_by_username"""
+
+    def __init__(self, users: dict):
+        self.users = users
+        self.calls = 0
+
+    async def __call__(self, username: str):
+        self.calls += 1
+        user = self.users.get(username)
+        return dict(user) if user else None
+
+
+class TestPrincipalCache:
+    """Test the per-worker principal cache"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_skip_the_database(self):
+        """Only the first resolution of a subject loads the user"""
+        cache = PrincipalCache(ttl=30)
+        loader = CountingLoader({"crawler": {"username": "crawler", "role": "crawler"}})
+
+        for _ in range(5):
+            user = await cache.get_or_load("crawler", loader)
+
+        assert user["role"] == "crawler"
+        assert loader.calls == 1
+        assert cache.stats()["hits"] == 4
+
+    @pytest.mark.asyncio
+    async def test_invalidation_applies_role_change(self):
+        """A forgotten principal is reloaded with its new role"""
+        users = {"bob": {"username": "bob", "role": "admin", "is_active": True}}
+        cache = PrincipalCache(ttl=30)
+        loader = CountingLoader(users)
+        await cache.get_or_load("bob", loader)
+
+        users["bob"]["role"] = "user"
+        # What a worker receives from the Redis invalidation channel
+        await cache._on_redis_message(json.loads(json.dumps("bob")))
+
+        assert (await cache.get_or_load("bob", loader))["role"] == "user"
+        assert loader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_load_racing_an_invalidation_is_not_cached(self):
+        """A user read before an invalidation must not be cached after it"""
+        cache = PrincipalCache(ttl=30)
+
+        async def slow_loader(username):
+            cache.forget(username)  # invalidation lands mid-load
+            return {"username": username, "is_active": True}
+
+        await cache.get_or_load("eve", slow_loader)
+        assert cache.stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_users_and_mutations_are_not_cached(self):
+        """Misses are not cached and callers get their own copy"""
+        cache = PrincipalCache(ttl=30, max_size=1)
+        loader = CountingLoader({"a": {"username": "a"}, "b": {"username": "b"}})
+
+        assert await cache.get_or_load("ghost", loader) is None
+        user = await cache.get_or_load("a", loader)
+        user["role"] = "admin"
+        assert "role" not in await cache.get_or_load("a", loader)
+
+        await cache.get_or_load("b", loader)
+        assert cache.stats()["size"] == 1
+
+
+class TestPasswordHashing:
+    """Test bcrypt offloading"""
+
+    @pytest.mark.asyncio
+    async def test_async_hash_round_trip_keeps_loop_responsive(self):
+        """Hashing runs off the loop; other coroutines keep running meanwhile"""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        hashed = await jwt_auth.get_password_hash_async("s3cret")
+        assert await jwt_auth.verify_password_async("s3cret", hashed)
+        assert not await jwt_auth.verify_password_async("wrong", hashed)
+        task.cancel()
+
+        assert ticks > 3
+
+    @pytest.mark.asyncio
+    async def test_queue_overflow_is_rejected(self, monkeypatch):
+        """Beyond auth_hash_max_pending, logins get 503 instead of queueing"""
+        monkeypatch.setattr(jwt_auth.settings, "auth_hash_max_pending", 0)
+        with pytest.raises(HTTPException) as exc:
+            await jwt_auth.verify_password_async("s3cret", "$2b$12$invalid")
+        assert exc.value.status_code == 503
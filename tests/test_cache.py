@@ -0,0 +1,276 @@
+"""
+Test Cache Service
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from mongodb.api.services import cache_service
+from mongodb.api.services.cache_service import (
+    CacheService,
+    CacheSpec,
+    invalidate_cache,
+    TAG_ARTICLES,
+)
+
+
+@pytest.fixture
+def memory_cache() -> CacheService:
+    """Cache service using the in-memory fallback only"""
+    cache = CacheService()
+    cache._redis = False
+    return cache
+
+
+class CountingLoader:
+    """Async loader that counts calls and takes a while to finish"""
+
+    def __init__(self, value="fresh", delay: float = 0.05):
+        self.calls = 0
+        self.value = value
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"value": self.value, "call": self.calls}
+
+
+class TestStampedeProtection:
+    """Test single-flight recompute and stale-while-revalidate"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_recompute(self, memory_cache: CacheService):
+        """Concurrent misses on the same key run the loader once"""
+        loader = CountingLoader()
+
+        results = await asyncio.gather(*[
+            memory_cache.get_or_set("dashboard:overview", loader, ttl=60)
+            for _ in range(20)
+        ])
+
+        assert loader.calls == 1
+        assert all(r == {"value": "fresh", "call": 1} for r in results)
+        assert memory_cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_fresh_hit_skips_loader(self, memory_cache: CacheService):
+        """Fresh entries are returned without recomputing"""
+        loader = CountingLoader()
+
+        await memory_cache.get_or_set("k", loader, ttl=60)
+        await memory_cache.get_or_set("k", loader, ttl=60)
+
+        assert loader.calls == 1
+        assert await memory_cache.get("k") == {"value": "fresh", "call": 1}
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self, memory_cache: CacheService):
+        """Expired entries are served stale and refreshed once in background"""
+        loader = CountingLoader()
+        await memory_cache.get_or_set("k", loader, ttl=60, stale_ttl=60)
+
+        # Expire the entry without dropping it from the grace window
+        memory_cache._memory_cache["k"]["fresh_until"] = time.time() - 1
+
+        stale = await asyncio.gather(*[
+            memory_cache.get_or_set("k", loader, ttl=60, stale_ttl=60)
+            for _ in range(10)
+        ])
+        assert all(r["call"] == 1 for r in stale)
+        # Plain get() treats a stale entry as a miss
+        assert await memory_cache.get("k") is None
+
+        await asyncio.sleep(0.1)
+        assert loader.calls == 2
+        assert (await memory_cache.get_or_set("k", loader, ttl=60))["call"] == 2
+
+    @pytest.mark.asyncio
+    async def test_loader_error_propagates_and_clears_inflight(self, memory_cache: CacheService):
+        """A failing loader raises for every waiter and can be retried"""
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            memory_cache.get_or_set("k", failing),
+            memory_cache.get_or_set("k", failing),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert memory_cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_cross_worker_lock_coalesces_recompute(self):
+        """Two workers sharing Redis recompute a missing key only once"""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+
+        workers = []
+        for _ in range(2):
+            cache = CacheService()
+            cache._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            workers.append(cache)
+
+        loader = CountingLoader(delay=0.2)
+        results = await asyncio.gather(*[
+            workers[i % 2].get_or_set("dashboard:severity", loader, ttl=60)
+            for i in range(6)
+        ])
+
+        assert loader.calls == 1
+        assert all(r["call"] == 1 for r in results)
+        assert await workers[0]._redis.get("lock:cache:dashboard:severity") is None
+
+    @pytest.mark.asyncio
+    async def test_miss_joining_abandoned_refresh_gets_value(self):
+        """A miss that joins a background refresh blocked by another worker's lock still gets a value"""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        workers = []
+        for _ in range(2):
+            cache = CacheService()
+            cache._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            workers.append(cache)
+        local, other = workers
+
+        # The other worker is recomputing the key; slow lock round trips keep
+        # the local refresh in flight when the miss arrives
+        await other._redis.set("lock:cache:k", "other-token")
+        redis_set = local._redis.set
+
+        async def slow_set(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            return await redis_set(*args, **kwargs)
+
+        local._redis.set = slow_set
+        loader = CountingLoader()
+        local._start_recompute("k", loader, 60, 60, wait=False)
+
+        async def publish():
+            await asyncio.sleep(0.1)
+            await other._set_entry("k", {"value": "from-other"}, 60, 60)
+
+        result, _ = await asyncio.gather(local.get_or_set("k", loader, ttl=60), publish())
+
+        assert result == {"value": "from-other"}
+        assert loader.calls == 0
+
+
+class TestTagInvalidation:
+    """Test tag-generation based invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_bump_tag_invalidates_dependent_keys(self, memory_cache: CacheService):
+        """Bumping a tag makes every entry tagged with it miss"""
+        loader = CountingLoader(delay=0)
+
+        await memory_cache.get_or_set("dashboard:severity", loader, ttl=3600, tags=[TAG_ARTICLES])
+        await memory_cache.get_or_set("dashboard:severity", loader, ttl=3600, tags=[TAG_ARTICLES])
+        assert loader.calls == 1
+
+        await memory_cache.bump_tags(TAG_ARTICLES)
+
+        result = await memory_cache.get_or_set("dashboard:severity", loader, ttl=3600, tags=[TAG_ARTICLES])
+        assert loader.calls == 2
+        assert result["call"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unrelated_tag_keeps_entry(self, memory_cache: CacheService):
+        """Entries are only invalidated by their own tags"""
+        loader = CountingLoader(delay=0)
+
+        await memory_cache.get_or_set("k", loader, ttl=3600, tags=[TAG_ARTICLES])
+        await memory_cache.bump_tags("sources")
+        await memory_cache.get_or_set("k", loader, ttl=3600, tags=[TAG_ARTICLES])
+
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_tag_versions_shared_through_redis(self):
+        """A bump on one worker invalidates the key for every worker"""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        workers = []
+        for _ in range(2):
+            cache = CacheService()
+            cache._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            workers.append(cache)
+
+        loader = CountingLoader(delay=0)
+        await workers[0].get_or_set("k", loader, ttl=3600, tags=[TAG_ARTICLES])
+        await workers[1].get_or_set("k", loader, ttl=3600, tags=[TAG_ARTICLES])
+        assert loader.calls == 1
+
+        await workers[1].bump_tags(TAG_ARTICLES)
+        await workers[0].get_or_set("k", loader, ttl=3600, tags=[TAG_ARTICLES])
+
+        assert loader.calls == 2
+        assert await workers[0].get_tag_versions([TAG_ARTICLES]) == {TAG_ARTICLES: 1}
+
+    @pytest.mark.asyncio
+    async def test_invalidate_cache_decorator_bumps_tags(self, memory_cache: CacheService, monkeypatch):
+        """Write functions decorated with invalidate_cache bump their tags"""
+        monkeypatch.setattr(cache_service, "_cache_service", memory_cache)
+
+        @invalidate_cache(tags=[TAG_ARTICLES])
+        async def write():
+            return "ok"
+
+        assert await write() == "ok"
+        assert await memory_cache.get_tag_versions([TAG_ARTICLES]) == {TAG_ARTICLES: 1}
+
+
+class TestBatchedOperations:
+    """Test pipelined / batched cache primitives"""
+
+    @staticmethod
+    def _redis_cache() -> CacheService:
+        fakeredis = pytest.importorskip("fakeredis")
+        cache = CacheService()
+        cache._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        return cache
+
+    @pytest.mark.asyncio
+    async def test_mget_omits_missing_keys(self):
+        """mget reads several keys in one round trip"""
+        cache = self._redis_cache()
+
+        await cache.set("a", 1, ttl=60)
+        await cache.set("b", {"x": 2}, ttl=60)
+
+        assert await cache.mget(["a", "b", "missing"]) == {"a": 1, "b": {"x": 2}}
+        assert await cache._redis.ttl("cache:a") > 0
+
+    @pytest.mark.asyncio
+    async def test_delete_pattern_unlinks_in_chunks(self):
+        """delete_pattern removes every match across several SCAN batches"""
+        cache = self._redis_cache()
+        pipe = cache._redis.pipeline(transaction=False)
+        for i in range(1200):
+            pipe.setex(f"cache:dashboard:{i}", 60, i)
+        await pipe.execute()
+        await cache.set("articles:1", "keep", ttl=60)
+
+        assert await cache.delete_pattern("dashboard:*") == 1200
+        assert await cache._redis.dbsize() == 1
+        assert await cache.get("articles:1") == "keep"
+
+    @pytest.mark.asyncio
+    async def test_get_many_runs_only_missing_loaders(self, memory_cache: CacheService):
+        """get_many returns values in order and loads only the misses"""
+        cached_loader = CountingLoader("cached", delay=0)
+        missing_loader = CountingLoader("missing", delay=0)
+        await memory_cache.get_or_set("a", cached_loader, ttl=60, tags=[TAG_ARTICLES])
+
+        results = await memory_cache.get_many([
+            CacheSpec("a", cached_loader, ttl=60, tags=[TAG_ARTICLES]),
+            CacheSpec("b", missing_loader, ttl=60),
+        ])
+
+        assert [r["value"] for r in results] == ["cached", "missing"]
+        assert cached_loader.calls == 1
+        assert missing_loader.calls == 1
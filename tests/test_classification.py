@@ -4,6 +4,7 @@ Test Classification Service
 
 import pytest
 from mongodb.api.services.classification_service import (
+    BatchClassificationService,
     ClassificationService,
     DISASTER_KEYWORDS,
     SEVERITY_INDICATORS,
@@ -97,3 +98,39 @@ class TestClassificationService:
         for region in required_regions:
             assert region in REGION_MAPPING
             assert len(REGION_MAPPING[region]) > 0
+
+
+class TestBatchClassificationService:
+    """Test multi-process batch classification"""
+    
+    ARTICLES = [
+        {"title": "Bão số 3 đổ bộ Quảng Ninh", "content": "2 người chết, 10 người bị thương, sơ tán khẩn cấp"},
+        {"title": "Lũ quét ở Sơn La", "text": "Sạt lở đất nghiêm trọng, 3 người mất tích"},
+        {"title": "Đội tuyển Việt Nam giành chiến thắng", "content": "Trận đấu tại Hà Nội"},
+        {"title": "Động đất mạnh tại Kon Tum", "content": "Rung lắc, nứt đất"},
+    ] * 40
+    
+    @pytest.mark.asyncio
+    async def test_same_labels_as_service(self):
+        """Worker processes produce exactly the labels of live classification"""
+        service = ClassificationService()
+        expected = [
+            await service.classify_article(a["title"], a.get("content") or a.get("text", ""))
+            for a in self.ARTICLES
+        ]
+        batch = BatchClassificationService(workers=2, chunk_size=16)
+        try:
+            results = await batch.classify_batch(self.ARTICLES)
+        finally:
+            batch.close()
+        
+        assert results == expected
+    
+    def test_chunks_cover_batch(self):
+        batch = BatchClassificationService(workers=4, chunk_size=16)
+        pairs = [("t", "c")] * 50
+        
+        chunks = batch._chunks(pairs)
+        
+        assert sum(len(c) for c in chunks) == 50
+        assert len(chunks) >= 4 and max(len(c) for c in chunks) <= 16
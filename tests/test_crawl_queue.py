@@ -0,0 +1,153 @@
+"""
+Tests for the distributed crawl queue
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from mongodb.api.services.crawl_queue import (
+    KIND_FEED,
+    KIND_KEYWORD,
+    UNIT_DONE,
+    UNIT_FAILED,
+    UNIT_LEASED,
+    UNIT_PENDING,
+    CrawlQueue,
+    CrawlWorker,
+    summarize_sweep,
+    sweep_units,
+)
+
+
+def feeds(count: int):
+    return [("vnexpress", f"https://vnexpress.net/rss/{i}.rss") for i in range(count)]
+
+
+def unit_stats(stored: int = 1) -> dict:
+    return {"total_fetched": 5, "extracted": 3, "disasters": 2, "stored": stored, "duplicates": 1, "errors": 0}
+
+
+class TestSweepUnits:
+    """Test sweep splitting and status aggregation (no database)"""
+
+    def test_units_per_keyword_and_feed(self):
+        units = sweep_units("s1", keywords=["bão Việt Nam"], feeds=feeds(2))
+
+        assert [u.kind for u in units] == [KIND_KEYWORD, KIND_FEED, KIND_FEED]
+        assert units[0].id == "s1:keyword:bão Việt Nam"
+        assert units[1].source == "vnexpress" and units[1].target.endswith("/0.rss")
+        assert all(u.state == UNIT_PENDING and u.sweep_id == "s1" for u in units)
+
+    def test_summary_sums_stats_per_kind(self):
+        sweep = {"_id": "s1", "kind": "full_crawl", "created_at": datetime(2024, 9, 7)}
+        finished = datetime(2024, 9, 7, 0, 10)
+        rows = [
+            {"_id": {"kind": KIND_KEYWORD, "state": UNIT_DONE}, "units": 2, "finished_at": finished, **unit_stats(3)},
+            {"_id": {"kind": KIND_FEED, "state": UNIT_DONE}, "units": 4, "finished_at": finished, **unit_stats(5)},
+            {"_id": {"kind": KIND_FEED, "state": UNIT_FAILED}, "units": 1, "finished_at": finished},
+        ]
+
+        status = summarize_sweep(sweep, rows)
+
+        assert status["units"] == {UNIT_PENDING: 0, UNIT_LEASED: 0, UNIT_DONE: 6, UNIT_FAILED: 1}
+        assert not status["running"] and status["completed_at"] == finished
+        assert status["google_news"]["stored"] == 3
+        assert status["total"]["stored"] == 8 and status["total"]["fetched"] == 10
+
+
+class TestCrawlQueue:
+    """Test leasing and completion records"""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_is_idempotent(self, test_db):
+        """A second scheduler enqueueing the same sweep joins it"""
+        queue = CrawlQueue(db=test_db)
+        units = sweep_units("daily-2024-09-07", feeds=feeds(3))
+
+        assert await queue.enqueue("daily-2024-09-07", "daily_crawl", units)
+        assert not await queue.enqueue("daily-2024-09-07", "daily_crawl", units)
+        assert await test_db.crawl_units.count_documents({}) == 3
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, test_db):
+        """A unit whose worker died is claimed again; the late worker cannot complete it"""
+        queue = CrawlQueue(db=test_db, lease_s=60)
+        await queue.enqueue("s1", "direct_sources", sweep_units("s1", feeds=feeds(1)))
+        now = datetime.utcnow()
+
+        crashed = await queue.claim("worker-1", now)
+        assert await queue.claim("worker-2", now) is None
+
+        retried = await queue.claim("worker-2", now + timedelta(seconds=61))
+        assert retried.id == crashed.id and retried.attempts == 2
+
+        assert not await queue.complete(crashed, unit_stats(), now)
+        assert await queue.complete(retried, unit_stats(), now)
+        assert (await queue.sweep_status("s1"))["units"][UNIT_DONE] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_unit_is_retried_then_given_up(self, test_db):
+        queue = CrawlQueue(db=test_db, max_attempts=2)
+        await queue.enqueue("s1", "google_news", sweep_units("s1", keywords=["lũ quét"]))
+
+        async def failing(unit):
+            raise RuntimeError("HTTP 503")
+
+        await CrawlWorker(queue, owner="w", concurrency=1, run_unit=failing).drain("s1")
+
+        doc = await test_db.crawl_units.find_one({})
+        assert doc["state"] == UNIT_FAILED and doc["attempts"] == 2
+        assert doc["error"] == "HTTP 503"
+        assert await queue.running_sweeps() == []
+
+
+class TestCrawlWorkers:
+    """Test splitting a sweep between workers"""
+
+    @pytest.mark.asyncio
+    async def test_each_unit_is_crawled_once(self, test_db):
+        queue = CrawlQueue(db=test_db)
+        await queue.enqueue("s1", "full_crawl", sweep_units("s1", keywords=["bão"], feeds=feeds(9)))
+        crawled = []
+
+        def runner(owner):
+            async def run(unit):
+                crawled.append((owner, unit.id))
+                await asyncio.sleep(0.01)
+                return unit_stats()
+            return run
+
+        await asyncio.gather(*[
+            CrawlWorker(queue, owner=f"w{i}", concurrency=1, run_unit=runner(f"w{i}")).drain("s1")
+            for i in range(3)
+        ])
+
+        assert len(crawled) == 10 and len({unit_id for _, unit_id in crawled}) == 10
+        assert len({owner for owner, _ in crawled}) == 3
+        status = await queue.sweep_status("s1")
+        assert status["units"][UNIT_DONE] == 10 and status["total"]["stored"] == 10
+
+    @pytest.mark.asyncio
+    async def test_sweep_time_scales_with_workers(self, test_db):
+        """Four workers finish a sweep in about a quarter of the time"""
+        async def slow(unit):
+            await asyncio.sleep(0.1)
+            return unit_stats()
+
+        async def sweep(sweep_id: str, workers: int) -> float:
+            queue = CrawlQueue(db=test_db)
+            await queue.enqueue(sweep_id, "direct_sources", sweep_units(sweep_id, feeds=feeds(8)))
+            started = time.perf_counter()
+            await asyncio.gather(*[
+                CrawlWorker(queue, owner=f"w{i}", concurrency=1, run_unit=slow).drain(sweep_id)
+                for i in range(workers)
+            ])
+            return time.perf_counter() - started
+
+        one = await sweep("one", 1)
+        four = await sweep("four", 4)
+
+        assert four < one / 2.5
@@ -0,0 +1,110 @@
+"""
+Tests for the adaptive per-feed crawl scheduler
+"""
+
+from datetime import datetime, timedelta
+
+from mongodb.api.services.crawl_scheduler import AdaptivePolicy, FeedSchedule
+
+
+def make_policy() -> AdaptivePolicy:
+    return AdaptivePolicy(
+        target_items=3,
+        min_interval_s=300,
+        max_interval_s=6 * 3600,
+        initial_interval_s=900,
+        boost_s=2 * 3600
+    )
+
+
+def entries(now: datetime, count: int, every_minutes: float):
+    """Publish dates of ``count`` entries, newest first"""
+    return [now - timedelta(minutes=i * every_minutes) for i in range(count)]
+
+
+class TestAdaptivePolicy:
+    """Test interval learning"""
+
+    def test_busy_feed_is_polled_often_quiet_feed_rarely(self):
+        """Intervals follow each feed's publish rate"""
+        policy, now = make_policy(), datetime(2024, 9, 7, 12, 0)
+
+        busy = policy.observe(FeedSchedule("busy", "vnexpress"), entries(now, 30, 6), 0, now)
+        quiet = policy.observe(FeedSchedule("quiet", "hanoimoi"), entries(now, 10, 600), 0, now)
+
+        assert 9 <= busy.rate_per_hour <= 11
+        assert busy.interval_s == 1080  # 3 items at ~10/h
+        assert quiet.interval_s == 6 * 3600  # clamped to the maximum
+
+    def test_rate_adapts_to_new_items_between_crawls(self):
+        """Only entries published since the last crawl count, smoothed by EWMA"""
+        policy, now = make_policy(), datetime(2024, 9, 7, 12, 0)
+        schedule = policy.observe(FeedSchedule("feed", "tuoitre"), entries(now, 10, 60), 0, now)
+        assert abs(schedule.rate_per_hour - 1.0) < 0.01
+
+        # One hour later the feed suddenly lists 20 new entries
+        later = now + timedelta(hours=1)
+        schedule = policy.observe(schedule, entries(later, 20, 3) + entries(now, 10, 60), 0, later)
+
+        assert schedule.last_new_items == 20
+        assert abs(schedule.rate_per_hour - (0.3 * 20 + 0.7 * 1.0)) < 0.01
+        assert schedule.next_due_at == later + timedelta(seconds=schedule.interval_s)
+
+    def test_silent_feed_backs_off(self):
+        """A feed with nothing new drifts toward the maximum interval"""
+        policy, now = make_policy(), datetime(2024, 9, 7, 12, 0)
+        schedule = policy.observe(FeedSchedule("feed", "vtv"), entries(now, 10, 12), 0, now)
+        first = schedule.interval_s
+
+        for hour in range(1, 6):
+            schedule = policy.observe(schedule, entries(now, 10, 12), 0, now + timedelta(hours=hour))
+
+        assert schedule.interval_s > first * 3
+
+    def test_high_severity_boosts_polling(self):
+        """A high-severity hit polls at the minimum interval until the boost expires"""
+        policy, now = make_policy(), datetime(2024, 9, 7, 12, 0)
+        schedule = policy.observe(FeedSchedule("feed", "hanoimoi"), entries(now, 5, 600), 1, now)
+        assert schedule.interval_s == 300
+
+        # Still boosted 1h later, back to the learned interval after 3h
+        schedule = policy.observe(schedule, [], 0, now + timedelta(hours=1))
+        assert schedule.interval_s == 300
+        schedule = policy.observe(schedule, [], 0, now + timedelta(hours=3))
+        assert schedule.interval_s == 6 * 3600
+
+    def test_incremental_crawl_counts_every_returned_entry(self):
+        """Incremental reads only return new entries, backdated ones included"""
+        policy, now = make_policy(), datetime(2024, 9, 7, 12, 0)
+        schedule = policy.observe(FeedSchedule("feed", "tuoitre"), entries(now, 10, 60), 0, now)
+
+        later = now + timedelta(hours=1)
+        backdated = entries(now - timedelta(hours=2), 4, 10)
+        schedule = policy.observe(schedule, backdated, 0, later, incremental=True)
+
+        assert schedule.last_new_items == 4
+
+    def test_failed_crawl_backs_off_without_decaying_rate(self):
+        """Failures retry at growing delays and leave the learned rate alone"""
+        policy, now = make_policy(), datetime(2024, 9, 7, 12, 0)
+        schedule = policy.observe(FeedSchedule("feed", "vnexpress"), entries(now, 30, 6), 0, now)
+        rate, interval = schedule.rate_per_hour, schedule.interval_s
+
+        delays = []
+        for attempt in range(1, 4):
+            failed_at = now + timedelta(hours=attempt)
+            schedule = policy.backoff(schedule, failed_at)
+            delays.append((schedule.next_due_at - failed_at).total_seconds())
+
+        assert delays == [300, 600, 1200]
+        assert schedule.rate_per_hour == rate and schedule.interval_s == interval
+
+        schedule = policy.observe(schedule, entries(now + timedelta(hours=4), 30, 6), 0, now + timedelta(hours=4))
+        assert schedule.failures == 0
+
+    def test_schedule_document_round_trip(self):
+        schedule = FeedSchedule("https://vnexpress.net/rss/thoi-su.rss", "vnexpress", rate_per_hour=2.5, crawls=4)
+        doc = schedule.to_doc()
+
+        assert doc["_id"] == schedule.url and "url" not in doc
+        assert FeedSchedule.from_doc(doc) == schedule
@@ -0,0 +1,154 @@
+"""
+Tests for the Redis Streams event bus
+"""
+
+import asyncio
+import pytest
+
+from mongodb.api.services.event_bus import BusMessage, EventBus, EventBusConsumer, forward_to_hub
+from mongodb.api.websockets import hub as hub_module
+
+GROUP = "test-group"
+
+
+def make_bus(client, **kwargs) -> EventBus:
+    kwargs.setdefault("batch_size", 10)
+    return EventBus(stream="test:events", client=client, **kwargs)
+
+
+class TestProducing:
+    """Test batched XADD and trimming"""
+
+    @pytest.mark.asyncio
+    async def test_add_flushes_in_batches(self, fake_redis):
+        """Buffered events are written once batch_size is reached"""
+        bus = make_bus(fake_redis, batch_size=3)
+
+        await bus.add("new_disaster", {"id": 1})
+        await bus.add("new_disaster", {"id": 2})
+        assert await fake_redis.xlen(bus.stream) == 0
+
+        await bus.add("new_disaster", {"id": 3})
+        assert await fake_redis.xlen(bus.stream) == 3
+        assert bus.pending == 0
+
+        await bus.add("new_disaster", {"id": 4})
+        assert await bus.flush() == 1
+        assert await fake_redis.xlen(bus.stream) == 4
+
+    @pytest.mark.asyncio
+    async def test_events_stay_local_until_consumer_runs(self, fake_redis, monkeypatch):
+        """A worker whose consumer is not reading yet publishes to its own hub"""
+        local = []
+
+        async def publish_event(event, data):
+            local.append((event, data))
+
+        monkeypatch.setattr(hub_module, "publish_event", publish_event)
+        monkeypatch.setattr(EventBus, "local_only", True)
+        bus = make_bus(fake_redis)
+
+        await bus.add("new_disaster", {"id": 1})
+        await bus.flush()
+
+        assert local == [("new_disaster", {"id": 1})]
+        assert await fake_redis.xlen(bus.stream) == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_is_trimmed_to_maxlen(self, fake_redis):
+        """XADD MAXLEN keeps the stream bounded"""
+        bus = make_bus(fake_redis, maxlen=5, approximate=False)
+        await bus.publish_many([("stats_update", {"n": i}) for i in range(12)])
+
+        assert await fake_redis.xlen(bus.stream) == 5
+
+
+class TestConsuming:
+    """Test consumer groups, ACK and redelivery"""
+
+    @pytest.mark.asyncio
+    async def test_group_delivers_each_event_to_one_consumer(self, fake_redis):
+        """Consumers in a group split the stream between them"""
+        bus = make_bus(fake_redis, batch_size=2)
+        await bus.ensure_group(GROUP)
+        await bus.ensure_group(GROUP)  # BUSYGROUP is ignored
+        await bus.publish_many([("new_disaster", {"id": i}) for i in range(4)])
+
+        first = await bus.read(GROUP, "worker-1")
+        second = await bus.read(GROUP, "worker-2")
+
+        assert [m.data["id"] for m in first] == [0, 1]
+        assert [m.data["id"] for m in second] == [2, 3]
+        assert first[0].event == "new_disaster"
+
+    @pytest.mark.asyncio
+    async def test_events_published_while_consumer_down_are_delivered(self, fake_redis):
+        """Unlike pub/sub, events wait in the stream for the group"""
+        bus = make_bus(fake_redis)
+        await bus.ensure_group(GROUP)
+        await bus.publish("disaster_alert", {"severity": "high"})
+
+        received = []
+
+        async def handler(messages):
+            received.extend(messages)
+
+        consumer = EventBusConsumer(bus, GROUP, handler, consumer="worker-1", block_ms=10)
+        await consumer.start()
+        await asyncio.sleep(0.1)
+        await consumer.stop()
+
+        assert [m.data for m in received] == [{"severity": "high"}]
+        pending = await fake_redis.xpending(bus.stream, GROUP)
+        assert pending["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_stays_pending_and_is_reclaimed(self, fake_redis):
+        """Unacked entries are claimed by another consumer after the idle time"""
+        bus = make_bus(fake_redis)
+        await bus.ensure_group(GROUP)
+        await bus.publish("new_disaster", {"id": 7})
+
+        async def failing(messages):
+            raise RuntimeError("boom")
+
+        crashed = EventBusConsumer(bus, GROUP, failing, consumer="worker-1")
+        assert not await crashed.handle(await bus.read(GROUP, "worker-1"))
+        assert (await fake_redis.xpending(bus.stream, GROUP))["pending"] == 1
+
+        await asyncio.sleep(0.02)
+        claimed = await bus.claim_stale(GROUP, "worker-2", min_idle_ms=10)
+        assert [m.data["id"] for m in claimed] == [7]
+
+        received = []
+
+        async def handler(messages):
+            received.extend(messages)
+
+        survivor = EventBusConsumer(bus, GROUP, handler, consumer="worker-2")
+        assert await survivor.handle(claimed)
+        assert (await fake_redis.xpending(bus.stream, GROUP))["pending"] == 0
+        assert len(received) == 1
+
+
+class TestForwarding:
+    """Test handing stream batches to the realtime hub"""
+
+    @pytest.mark.asyncio
+    async def test_batch_is_broadcast_before_ack(self, monkeypatch):
+        """The handler does not leave events in the coalescing window"""
+        frames = []
+
+        async def broadcast(message):
+            frames.append(message)
+
+        monkeypatch.setattr(hub_module.hub, "broadcast", broadcast)
+        await forward_to_hub([
+            BusMessage("1-0", "new_disaster", {"id": 1}),
+            BusMessage("2-0", "stats_update", {"total": 2}),
+            BusMessage("3-0", "new_disaster", {"id": 3})
+        ])
+
+        assert [f["event"] for f in frames] == ["stats_update", "new_disasters"]
+        assert [item["id"] for item in frames[1]["data"]["items"]] == [1, 3]
+        assert hub_module.hub.coalescer.stats()["pending"] == 0
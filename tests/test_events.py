@@ -0,0 +1,78 @@
+"""
+Tests for clustering disaster articles into events
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from mongodb.api.services.event_service import EventService, title_signature
+from mongodb.api.services.story_index import similarity
+
+
+def article(title: str, **extra) -> dict:
+    return {
+        "title": title, "url": f"https://example.vn/{abs(hash(title))}", "source": "vnexpress.net",
+        "disaster_type": "storm", "region": "north", "severity": "medium",
+        "details": {"deaths": 0, "missing": 0, "injured": 0, "houses_affected": 0}, **extra
+    }
+
+
+class TestEventUpdate:
+    """Test the per-article aggregate update (no database)"""
+
+    def test_update_is_constant_size(self):
+        service = EventService(window_hours=72, threshold=0.25)
+        at = datetime(2024, 9, 7, 12)
+        doc = article("Bão số 3 đổ bộ Quảng Ninh", severity="high", story_id="s1",
+                      details={"deaths": 2, "missing": 1, "injured": 0, "houses_affected": 40})
+
+        update = service._update(doc, title_signature(doc["title"]), at)
+
+        assert update["$inc"] == {"article_count": 1}
+        assert update["$min"] == {"first_seen_at": at}
+        assert update["$max"] == {"last_seen_at": at, "severity_rank": 3, "deaths": 2, "missing": 1,
+                                  "injured": 0, "houses_affected": 40}
+        assert update["$addToSet"] == {"sources": "vnexpress.net", "story_ids": "s1"}
+        assert update["$push"]["signatures"]["$slice"] == -5
+
+    def test_titles_of_one_event_are_similar(self):
+        same = similarity(title_signature("Bão số 3 đổ bộ Quảng Ninh, 2 người chết"),
+                          title_signature("Quảng Ninh: bão số 3 làm 5 người chết, hàng trăm nhà tốc mái"))
+        other = similarity(title_signature("Bão số 3 đổ bộ Quảng Ninh, 2 người chết"),
+                           title_signature("Bão số 4 gây mưa lớn ở Nghệ An"))
+
+        assert same >= 0.25 > other
+
+
+class TestEventService:
+    """Test incremental assignment and aggregates"""
+
+    @pytest.mark.asyncio
+    async def test_articles_join_one_event(self, test_db):
+        service = EventService(db=test_db, window_hours=72, threshold=0.25)
+        first = await service.assign(article("Bão số 3 đổ bộ Quảng Ninh, 2 người chết",
+                                             details={"deaths": 2, "houses_affected": 15}))
+        second = await service.assign(article("Quảng Ninh: bão số 3 làm 5 người chết, hàng trăm nhà tốc mái",
+                                              source="tuoitre.vn", severity="high", details={"deaths": 5}))
+        other = await service.assign(article("Bão số 4 gây mưa lớn ở Nghệ An"))
+
+        assert first == second != other
+        event = (await service.get_events(limit=1, region="north", disaster_type="storm", since_hours=1))[0]
+        assert event["_id"] == other
+        event = await service.get_event(first)
+        assert event["article_count"] == 2 and event["severity"] == "high"
+        assert (event["deaths"], event["houses_affected"]) == (5, 15)
+        assert sorted(event["sources"]) == ["tuoitre.vn", "vnexpress.net"]
+
+    @pytest.mark.asyncio
+    async def test_story_or_window_decides(self, test_db):
+        service = EventService(db=test_db, window_hours=72, threshold=0.25)
+        now = datetime.now()
+        event_id = await service.assign(article("Lũ quét ở Sơn La", story_id="s1", created_at=now))
+
+        # A copy of the same story joins even with an unrelated-looking title
+        assert await service.assign(article("Tin mới nhất hôm nay", story_id="s1", created_at=now)) == event_id
+        # A similar article after the event went quiet opens a new one
+        late = await service.assign(article("Lũ quét ở Sơn La", created_at=now + timedelta(hours=100)))
+        assert late != event_id
@@ -0,0 +1,170 @@
+"""
+Tests for incremental feed reading with per-feed high-water marks
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from mongodb.api.services.feed_reader import MAX_ATTEMPTS, FeedCheckpoint, FeedItem, read_new_items
+
+BASE_TIME = datetime(2024, 9, 7, 12, 0, tzinfo=timezone.utc)
+
+
+def rss(count: int, newest: int = 0, broken: bool = False) -> bytes:
+    """Feed of ``count`` items, newest first, numbered down from ``newest + count``"""
+    items = []
+    for i in range(newest + count, newest, -1):
+        published = format_datetime(BASE_TIME + timedelta(minutes=i))
+        items.append(
+            f"<item><title>Tin {i}</title><link>https://example.vn/{i}</link>"
+            f"<guid>example-{i}</guid><pubDate>{published}</pubDate>"
+            f"<description>{'Mưa lớn kéo dài ' * 20}</description></item>"
+        )
+    body = '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>T</title>'
+    body += "".join(items) + "</channel></rss>"
+    if broken:
+        body = body.replace("<title>T</title>", "<title>T & co</title>")  # unescaped &
+    return body.encode()
+
+
+async def read_and_advance(session, url, checkpoint, failed=(), **kwargs):
+    """One crawl: read the new entries and mark them processed"""
+    result = await read_new_items(session, url, checkpoint, **kwargs)
+    if not result.not_modified:
+        checkpoint.advance(result.items, result.published, failed=failed, etag=result.etag)
+    return result
+
+
+@pytest.fixture
+async def feed_server():
+    """Serves ``state["body"]`` at /feed with an ETag"""
+    state = {"body": rss(200), "etag": '"v1"', "requests": 0}
+
+    async def feed(request):
+        state["requests"] += 1
+        if request.headers.get("If-None-Match") == state["etag"]:
+            return web.Response(status=304)
+        return web.Response(body=state["body"], content_type="application/rss+xml", headers={"ETag": state["etag"]})
+
+    app = web.Application()
+    app.router.add_get("/feed", feed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    state["url"] = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/feed"
+    yield state
+    await runner.cleanup()
+
+
+class TestIncrementalRead:
+    """Test high-water marks"""
+
+    @pytest.mark.asyncio
+    async def test_first_read_takes_newest_entries(self, feed_server):
+        checkpoint = FeedCheckpoint(feed_server["url"])
+        async with aiohttp.ClientSession() as session:
+            result = await read_new_items(session, feed_server["url"], checkpoint, limit=30)
+
+        assert len(result.items) == 30
+        assert result.items[0].guid == "example-200"
+        assert checkpoint.is_new  # untouched until the entries are processed
+
+        checkpoint.advance(result.items, result.published, etag=result.etag)
+        assert checkpoint.guids[0] == "example-200"
+        assert checkpoint.newest_published == datetime(2024, 9, 7, 15, 20)
+        assert checkpoint.etag == '"v1"'
+
+    @pytest.mark.asyncio
+    async def test_unchanged_feed_is_not_downloaded(self, feed_server):
+        """The ETag turns the next read into a 304"""
+        checkpoint = FeedCheckpoint(feed_server["url"])
+        async with aiohttp.ClientSession() as session:
+            await read_and_advance(session, feed_server["url"], checkpoint)
+            second = await read_new_items(session, feed_server["url"], checkpoint)
+
+        assert second.not_modified and second.items == [] and second.bytes_read == 0
+
+    @pytest.mark.asyncio
+    async def test_stops_at_first_seen_entry(self, feed_server):
+        """Only entries above the mark are returned, and the rest of the body is skipped"""
+        checkpoint = FeedCheckpoint(feed_server["url"])
+        async with aiohttp.ClientSession() as session:
+            await read_and_advance(session, feed_server["url"], checkpoint)
+
+            # Three new items on top of the same feed
+            feed_server["body"], feed_server["etag"] = rss(200, newest=3), '"v2"'
+            second = await read_and_advance(session, feed_server["url"], checkpoint)
+
+        assert [i.guid for i in second.items] == ["example-203", "example-202", "example-201"]
+        assert second.stopped_early
+        assert second.bytes_read < len(feed_server["body"]) / 2
+        assert checkpoint.guids[:4] == ["example-203", "example-202", "example-201", "example-200"]
+
+    @pytest.mark.asyncio
+    async def test_limit_only_caps_the_first_read(self, feed_server):
+        """A burst larger than the limit is read down to the mark, nothing is cut off"""
+        checkpoint = FeedCheckpoint(feed_server["url"])
+        async with aiohttp.ClientSession() as session:
+            await read_and_advance(session, feed_server["url"], checkpoint, limit=30)
+
+            feed_server["body"], feed_server["etag"] = rss(200, newest=40), '"v2"'
+            second = await read_and_advance(session, feed_server["url"], checkpoint, limit=30)
+
+        assert [i.guid for i in second.items] == [f"example-{i}" for i in range(240, 200, -1)]
+        assert checkpoint.newest_published == datetime(2024, 9, 7, 16, 0)
+
+    @pytest.mark.asyncio
+    async def test_older_entries_are_skipped_without_guid(self, feed_server):
+        """The published mark stops the read even when the GUIDs are unknown"""
+        checkpoint = FeedCheckpoint(feed_server["url"], newest_published=datetime(2024, 9, 7, 15, 15))
+        async with aiohttp.ClientSession() as session:
+            result = await read_new_items(session, feed_server["url"], checkpoint)
+
+        assert [i.guid for i in result.items] == [f"example-{i}" for i in range(200, 194, -1)]
+
+    @pytest.mark.asyncio
+    async def test_malformed_feed_falls_back_to_feedparser(self, feed_server):
+        feed_server["body"] = rss(50, broken=True)
+        checkpoint = FeedCheckpoint(feed_server["url"], guids=["example-45"])
+        async with aiohttp.ClientSession() as session:
+            result = await read_new_items(session, feed_server["url"], checkpoint)
+
+        assert [i.guid for i in result.items] == [f"example-{i}" for i in range(50, 45, -1)]
+        assert not result.stopped_early
+
+
+class TestCheckpointAdvance:
+    """Test that only processed entries move the mark"""
+
+    @pytest.mark.asyncio
+    async def test_failed_entry_is_retried(self, feed_server):
+        """A failure holds the watermark and is read again on the next crawl"""
+        checkpoint = FeedCheckpoint(feed_server["url"])
+        async with aiohttp.ClientSession() as session:
+            await read_and_advance(session, feed_server["url"], checkpoint, failed=["example-190"])
+            assert checkpoint.newest_published == datetime(2024, 9, 7, 15, 10)
+            assert checkpoint.etag is None  # a 304 would hide the retry
+
+            feed_server["body"] = rss(200, newest=2)
+            second = await read_and_advance(session, feed_server["url"], checkpoint)
+
+        assert [i.guid for i in second.items] == ["example-202", "example-201", "example-190"]
+        assert checkpoint.pending == []
+        assert checkpoint.newest_published == datetime(2024, 9, 7, 15, 22)
+
+    def test_entry_is_given_up_after_max_attempts(self):
+        checkpoint = FeedCheckpoint("feed")
+        item = FeedItem(guid="a", link="https://example.vn/a")
+        published = [datetime(2024, 9, 7, 12, 0)]
+
+        for _ in range(MAX_ATTEMPTS - 1):
+            checkpoint.advance([item], published, failed=["a"])
+            assert [p["guid"] for p in checkpoint.pending] == ["a"]
+        checkpoint.advance([item], published, failed=["a"])
+
+        assert checkpoint.pending == [] and "a" in checkpoint.guids
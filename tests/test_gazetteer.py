@@ -0,0 +1,71 @@
+"""
+Tests for province tagging with the gazetteer
+"""
+
+import pytest
+
+from mongodb.api.services.classification_service import ClassificationService
+from mongodb.api.services.gazetteer import PROVINCES, Gazetteer, gazetteer
+
+
+class TestGazetteer:
+    """Test matching names, variants and districts"""
+
+    def test_covers_every_province(self):
+        assert len(PROVINCES) == 63
+        assert len({p.name for p in PROVINCES}) == 63
+        assert {p.region for p in PROVINCES} == {"north", "central", "south", "highlands"}
+
+    @pytest.mark.parametrize("text, province", [
+        ("Triều cường dâng cao tại TP.HCM", "TP Hồ Chí Minh"),
+        ("Ngập sâu ở TPHCM", "TP Hồ Chí Minh"),
+        ("Mưa lớn ở Huế", "Thừa Thiên Huế"),
+        ("Bão đổ bộ Khánh Hoà", "Khánh Hòa"),  # old-style tone placement
+        ("Lu quet o Quang Ninh", "Quảng Ninh"),  # no diacritics
+        ("Sạt lở ở Đăk Lăk", "Đắk Lắk"),
+        ("Lũ quét ở Mù Cang Chải", "Yên Bái"),  # district
+        ("Sân bay Tân Sơn Nhất ngập nặng", "TP Hồ Chí Minh"),  # not Tân Sơn, Phú Thọ
+        ("Phu Yen mua lon", "Phú Yên"),  # not Phù Yên, Sơn La
+    ])
+    def test_resolves_variants(self, text, province):
+        assert gazetteer.tag(text) == [province]
+
+    def test_mentions_have_positions(self):
+        text = "Bà Rịa - Vũng Tàu và Cà Mau"
+        mentions = gazetteer.find(text)
+
+        assert [(m.province, text[m.start:m.end]) for m in mentions] == [
+            ("Bà Rịa - Vũng Tàu", "Bà Rịa - Vũng Tàu"), ("Cà Mau", "Cà Mau")
+        ]
+
+    def test_common_words_need_capitals(self):
+        assert gazetteer.tag("Chung tay vì hòa bình và phát triển") == []
+        assert gazetteer.tag("Mưa lớn ở Hòa Bình") == ["Hòa Bình"]
+
+    def test_most_mentioned_first(self):
+        text = "Bão số 3 ảnh hưởng Hải Phòng. Quảng Ninh thiệt hại nặng, Hạ Long mất điện"
+
+        assert gazetteer.tag(text) == ["Quảng Ninh", "Hải Phòng"]
+
+    def test_resolve(self):
+        assert gazetteer.resolve("tp.hcm") == "TP Hồ Chí Minh"
+        assert gazetteer.resolve("Hue") == "Thừa Thiên Huế"
+        assert gazetteer.resolve("Atlantis") is None
+        assert Gazetteer(PROVINCES[:1]).resolve("Hà Nội") == "Hà Nội"
+
+
+class TestProvinceLabels:
+    """Test provinces and region from ClassificationService"""
+
+    def test_region_follows_primary_province(self):
+        labels = ClassificationService().classify(
+            "Lũ ở Cà Mau", "Cà Mau ngập sâu, đoàn cứu trợ từ Hà Nội đã tới Cà Mau"
+        )
+
+        assert labels["provinces"] == ["Cà Mau", "Hà Nội"]
+        assert labels["province"] == "Cà Mau" and labels["region"] == "south"
+
+    def test_macro_region_without_province(self):
+        labels = ClassificationService().classify("Mưa lớn ở miền Trung, Tây Nguyên chuẩn bị ứng phó")
+
+        assert labels["provinces"] == [] and labels["region"] == "central"
@@ -0,0 +1,140 @@
+"""
+Tests for the streaming JSON / NDJSON importer
+"""
+
+import io
+import json
+import tracemalloc
+
+import pytest
+
+from mongodb.api.services.json_import import (
+    ImportFormatError,
+    JsonImporter,
+    iter_json_records,
+    service_classifier,
+)
+
+
+def article(i: int, **extra) -> dict:
+    return {"url": f"https://vnexpress.net/{i}", "title": f"Tin {i}", "text": "Mưa lớn kéo dài", **extra}
+
+
+class LazyArchive(io.TextIOBase):
+    """A JSON array of ``count`` articles generated as it is read"""
+
+    def __init__(self, count: int):
+        self._parts = self._generate(count)
+        self._pending = ""
+
+    @staticmethod
+    def _generate(count: int):
+        yield "["
+        for i in range(count):
+            yield ("," if i else "") + json.dumps(article(i, summary="Sạt lở đất " * 50), ensure_ascii=False)
+        yield "]"
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while len(self._pending) < size:
+            part = next(self._parts, None)
+            if part is None:
+                break
+            self._pending += part
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+class TestIterJsonRecords:
+    """Test incremental decoding"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+    def test_array_across_chunk_boundaries(self, chunk_size):
+        records = [article(i) for i in range(20)]
+        fp = io.StringIO(json.dumps(records, ensure_ascii=False, indent=2))
+
+        assert list(iter_json_records(fp, chunk_size=chunk_size)) == records
+
+    def test_ndjson(self):
+        lines = "\n".join(json.dumps(article(i), ensure_ascii=False) for i in range(5)) + "\n"
+
+        assert [r["url"] for r in iter_json_records(io.StringIO(lines), chunk_size=16)] == [
+            f"https://vnexpress.net/{i}" for i in range(5)
+        ]
+
+    def test_single_object(self):
+        assert list(iter_json_records(io.StringIO(json.dumps(article(1))))) == [article(1)]
+
+    @pytest.mark.parametrize("body", ['[{"a": 1} {"a": 2}]', '[{"a": 1},', '{"a": 1}\n{"a": '])
+    def test_malformed_input_raises(self, body):
+        with pytest.raises(ImportFormatError):
+            list(iter_json_records(io.StringIO(body), chunk_size=4))
+
+    def test_oversized_record_raises(self):
+        body = '[{"text": "' + "x" * 10_000
+        with pytest.raises(ImportFormatError, match="too large"):
+            list(iter_json_records(io.StringIO(body), chunk_size=128, max_record_bytes=1024))
+
+    def test_memory_does_not_grow_with_file(self):
+        """Decoding 20k articles (~13 MB) keeps well under 1 MB alive"""
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in iter_json_records(LazyArchive(20_000)))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert count == 20_000
+        assert peak < 1024 * 1024
+
+
+class TestServiceClassifier:
+    """Test batch labels from ClassificationService"""
+
+    @pytest.mark.asyncio
+    async def test_labels_in_input_order(self):
+        classify = service_classifier()
+        labels = await classify([
+            {"title": "Bão số 3 đổ bộ Quảng Ninh, 2 người chết"},
+            {"url": "https://example.vn/empty"},
+            {"title": "Giá vàng hôm nay", "summary": "Thị trường ổn định"},
+        ])
+
+        assert labels[0]["is_disaster"] and labels[0]["severity"] == "high"
+        assert labels[1] == {"is_disaster": False}
+        assert not labels[2]["is_disaster"]
+
+
+class TestJsonImporter:
+    """Test batched upserts"""
+
+    @pytest.mark.asyncio
+    async def test_import_upserts_by_url(self, test_db):
+        await test_db.articles.insert_one(article(0, title="Đã có"))
+        records = [article(i) for i in range(12)] + [article(3), "not an object"]
+        progress = []
+
+        importer = JsonImporter(test_db.articles, batch_size=5, on_progress=lambda s: progress.append(s.read))
+        stats = await importer.import_records(iter(records))
+
+        assert (stats.read, stats.inserted, stats.duplicates, stats.failed) == (14, 11, 2, 1)
+        assert progress == [5, 10, 13]
+        assert await test_db.articles.count_documents({}) == 12
+        assert (await test_db.articles.find_one({"url": article(0)["url"]}))["title"] == "Đã có"
+
+    @pytest.mark.asyncio
+    async def test_import_file_classifies(self, test_db, tmp_path):
+        path = tmp_path / "articles.ndjson"
+        path.write_text(
+            json.dumps({"url": "https://example.vn/bao", "title": "Bão số 3 gây sạt lở, 2 người chết"}) + "\n"
+            + json.dumps({"url": "https://example.vn/vang", "title": "Giá vàng hôm nay"}) + "\n",
+            encoding="utf-8"
+        )
+
+        stats = await JsonImporter(test_db.articles, classify=service_classifier()).import_file(str(path))
+
+        assert stats.inserted == 2 and stats.disasters == 1
+        doc = await test_db.articles.find_one({"url": "https://example.vn/bao"})
+        assert doc["is_disaster"] and doc["severity"] == "high"
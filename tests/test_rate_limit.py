@@ -0,0 +1,137 @@
+"""
+Tests for the distributed sliding-window rate limiter
+"""
+
+import pytest
+from starlette.requests import Request
+
+from mongodb.api.middleware import sliding_window
+from mongodb.api.middleware.sliding_window import SlidingWindowLimiter, parse_limit
+from mongodb.api.middleware.rate_limit import get_rate_limit_category
+
+
+def make_request(method: str, path: str) -> Request:
+    return Request({"type": "http", "method": method, "path": path, "headers": [], "query_string": b""})
+
+
+class BrokenRedis:
+    """Client whose scripts always fail (Redis down)"""
+
+    def register_script(self, script):
+        async def run(keys, args):
+            raise ConnectionError("redis down")
+        return run
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; starts at the beginning of a minute"""
+
+    def __init__(self):
+        self.now = 1_700_000_040.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class TestSlidingWindowLimiter:
+    """Test limits shared across workers"""
+
+    @pytest.mark.asyncio
+    async def test_limit_is_shared_by_all_workers(self, fake_redis):
+        """Two workers on one Redis admit the configured limit in total"""
+        workers = [SlidingWindowLimiter(client=fake_redis, lease_size=1) for _ in range(2)]
+
+        allowed = 0
+        for i in range(20):
+            result = await workers[i % 2].hit("read:1.2.3.4", 10, 60)
+            allowed += result.allowed
+
+        assert allowed == 10
+        denied = await workers[0].hit("read:1.2.3.4", 10, 60)
+        assert not denied.allowed and denied.retry_after >= 1
+
+    @pytest.mark.asyncio
+    async def test_leases_avoid_redis_call_per_request(self, fake_redis):
+        """Leased tokens are spent locally; the lease grows 1, 2, 4, 8, 10 under load"""
+        limiter = SlidingWindowLimiter(client=fake_redis, lease_size=10)
+
+        for _ in range(50):
+            assert (await limiter.hit("dashboard:ip", 1000, 60)).allowed
+
+        assert limiter.redis_calls == 8
+
+    @pytest.mark.asyncio
+    async def test_denials_are_cached_locally(self, fake_redis):
+        """A flood past the limit does not reach Redis per request"""
+        limiter = SlidingWindowLimiter(client=fake_redis, lease_size=1)
+        for _ in range(3):
+            await limiter.hit("auth:ip", 3, 60)
+        calls = limiter.redis_calls
+
+        for _ in range(100):
+            assert not (await limiter.hit("auth:ip", 3, 60)).allowed
+
+        assert limiter.redis_calls == calls + 1
+
+    @pytest.mark.asyncio
+    async def test_sparse_client_gets_full_limit(self, fake_redis, monkeypatch):
+        """One request every 1.5s is never charged for tokens it did not use"""
+        clock = FakeClock()
+        monkeypatch.setattr(sliding_window, "time", clock)
+        limiter = SlidingWindowLimiter(client=fake_redis, lease_size=10, lease_ms=1000)
+
+        allowed = 0
+        for _ in range(40):
+            allowed += (await limiter.hit("read:ip", 100, 60)).allowed
+            clock.advance(1.5)
+
+        assert allowed == 40
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_refunded(self, fake_redis, monkeypatch):
+        """Unspent tokens of an expired lease are given back to the shared counter"""
+        clock = FakeClock()
+        monkeypatch.setattr(sliding_window, "time", clock)
+        limiter = SlidingWindowLimiter(client=fake_redis, lease_size=10, lease_ms=1000)
+
+        for _ in range(4):  # leases of 1 and 2, then a lease of 4 with 3 unspent
+            await limiter.hit("read:ip", 1000, 60)
+        clock.advance(2)
+        await limiter.hit("read:ip", 1000, 60)
+
+        window = int(clock.time() * 1000) // 60000
+        assert int(await fake_redis.get(f"rl:read:ip:{window}")) == 5
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_limits_without_redis(self):
+        """With Redis down each worker still enforces the limit itself"""
+        limiter = SlidingWindowLimiter(client=BrokenRedis(), lease_size=1)
+
+        results = [(await limiter.hit("write:ip", 5, 60)).allowed for _ in range(8)]
+
+        assert results == [True] * 5 + [False] * 3
+        assert limiter.stats()["backend"] == "local"
+
+
+class TestRateLimitConfig:
+    """Test limit parsing and request categories"""
+
+    def test_parse_limit(self):
+        assert parse_limit("60/minute") == (60, 60)
+        assert parse_limit("5000 per hour") == (5000, 3600)
+        with pytest.raises(ValueError):
+            parse_limit("lots")
+
+    def test_categories(self):
+        assert get_rate_limit_category(make_request("POST", "/api/v1/auth/login")) == "auth"
+        assert get_rate_limit_category(make_request("GET", "/api/v1/auth/me")) == "read"
+        assert get_rate_limit_category(make_request("POST", "/api/v1/crawl/start")) == "crawl"
+        assert get_rate_limit_category(make_request("GET", "/api/v1/dashboard/summary")) == "dashboard"
+        assert get_rate_limit_category(make_request("DELETE", "/api/v1/articles/1")) == "write"
+        assert get_rate_limit_category(make_request("GET", "/realtime/recent")) == "public"
@@ -0,0 +1,103 @@
+"""
+Tests for the resumable reclassification backfill
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from mongodb.api.services import classification_service
+from mongodb.api.services.classification_service import LABEL_FIELDS, ClassificationService, classifier_fingerprint
+from mongodb.api.services.reclassify_service import (
+    JOB_COLLECTION,
+    JOB_DONE,
+    JOB_ID,
+    JOB_PAUSED,
+    JOB_RUNNING,
+    ReclassifyService,
+    labels_changed,
+)
+
+FLOOD = {"title": "Lũ quét ở Sơn La", "text": "3 người mất tích"}
+SPORT = {"title": "Đội tuyển Việt Nam thắng", "text": "Trận đấu tối qua"}
+
+
+def stale(article: dict) -> dict:
+    """An article stored with labels from an older classifier"""
+    return {**article, "is_disaster": False, "disaster_type": "none", "severity": "none",
+            "confidence": 0.0, "region": None, "provinces": [], "province": None, "matched_keywords": []}
+
+
+def current(article: dict) -> dict:
+    """An article whose stored labels are up to date"""
+    labels = ClassificationService().classify(article["title"], article["text"])
+    return {**article, **{name: labels[name] for name in LABEL_FIELDS}}
+
+
+class TestFingerprint:
+    """Test detecting a classifier change (no database)"""
+
+    def test_changes_with_keywords(self, monkeypatch):
+        before = classifier_fingerprint()
+        flood = dict(classification_service.DISASTER_KEYWORDS["flood"])
+        flood["keywords"] = flood["keywords"] + ["triều cường"]
+        monkeypatch.setitem(classification_service.DISASTER_KEYWORDS, "flood", flood)
+
+        assert classifier_fingerprint() != before
+
+    def test_labels_changed(self):
+        labels = {"is_disaster": False, "disaster_type": "none", "severity": "none",
+                  "confidence": 0.0, "region": None, "provinces": [], "province": None, "matched_keywords": []}
+
+        assert not labels_changed(stale(SPORT), labels)
+        assert labels_changed(stale(SPORT), {**labels, "region": "north"})
+        # Articles stored before province tagging are relabeled
+        assert labels_changed({k: v for k, v in stale(SPORT).items() if k != "provinces"}, labels)
+
+
+class TestReclassifyService:
+    """Test the batched walk over articles"""
+
+    @pytest.mark.asyncio
+    async def test_rewrites_only_changed_labels(self, test_db):
+        await test_db.articles.insert_many([stale(FLOOD), current(SPORT), stale(FLOOD), current(SPORT), stale(FLOOD)])
+        service = ReclassifyService(db=test_db, batch_size=2, workers=1)
+
+        job = await service.run()
+
+        assert job["state"] == JOB_DONE and job["scanned"] == 5 and job["changed"] == 3
+        assert await test_db.articles.count_documents({"is_disaster": True, "disaster_type": "flood"}) == 3
+        assert await service.run() is None  # labels are current
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_checkpoint(self, test_db):
+        result = await test_db.articles.insert_many([stale(FLOOD) for _ in range(4)])
+        ids = result.inserted_ids
+        await test_db[JOB_COLLECTION].insert_one({
+            "_id": JOB_ID, "state": JOB_PAUSED, "fingerprint": classifier_fingerprint(),
+            "last_id": ids[1], "scanned": 2, "changed": 2
+        })
+
+        assert await ReclassifyService(db=test_db, workers=1).run_if_needed() is None  # paused stays paused
+        job = await ReclassifyService(db=test_db, batch_size=10, workers=1).run()
+
+        assert job["scanned"] == 4 and job["changed"] == 4
+        relabeled = await test_db.articles.distinct("_id", {"is_disaster": True})
+        assert set(relabeled) == set(ids[2:])
+
+    @pytest.mark.asyncio
+    async def test_one_runner_at_a_time(self, test_db):
+        await test_db.articles.insert_one(stale(FLOOD))
+        await test_db[JOB_COLLECTION].insert_one({
+            "_id": JOB_ID, "state": JOB_RUNNING, "fingerprint": classifier_fingerprint(),
+            "owner": "other", "lease_expires_at": datetime.utcnow() + timedelta(minutes=5),
+            "last_id": None, "scanned": 0, "changed": 0
+        })
+        service = ReclassifyService(db=test_db, workers=1)
+
+        assert await service.run() is None
+
+        # The other runner died: its lease expires and the job is taken over
+        await test_db[JOB_COLLECTION].update_one({"_id": JOB_ID}, {"$set": {"lease_expires_at": datetime.utcnow()}})
+        job = await service.run()
+        assert job["state"] == JOB_DONE and job["changed"] == 1
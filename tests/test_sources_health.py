@@ -0,0 +1,129 @@
+"""
+Tests for the async source health checker
+"""
+
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiohttp import web
+
+from mongodb.api.services import sources_service
+from mongodb.api.services.sources_service import probe_sources, source_feeds
+
+
+def rss(published: datetime) -> str:
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>Bão số 3</title><link>https://example.vn/a</link>
+<pubDate>{format_datetime(published)}</pubDate></item>
+<item><title>Lũ lụt</title><link>https://example.vn/b</link>
+<pubDate>{format_datetime(published - timedelta(hours=5))}</pubDate></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+async def feed_server():
+    """Local feed server: /fresh, /slow, /broken, /empty"""
+    published = datetime.now(timezone.utc) - timedelta(minutes=30)
+
+    async def fresh(request):
+        return web.Response(text=rss(published), content_type="application/rss+xml")
+
+    async def slow(request):
+        await asyncio.sleep(0.3)
+        return web.Response(text=rss(published), content_type="application/rss+xml")
+
+    async def broken(request):
+        return web.Response(status=500)
+
+    async def empty(request):
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/fresh", fresh)
+    app.router.add_get("/slow", slow)
+    app.router.add_get("/broken", broken)
+    app.router.add_get("/empty", empty)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+def make_source(name: str, *feeds: str, google: str = None) -> dict:
+    return {"name": name, "domain": f"{name}.vn", "rss_feeds": list(feeds), "google_news_rss": google}
+
+
+class TestFeedProbe:
+    """Test per-feed metrics"""
+
+    @pytest.mark.asyncio
+    async def test_healthy_feed_metrics(self, feed_server):
+        """Status, bytes, item count and newest-item age are recorded"""
+        probes = await probe_sources([make_source("a", f"{feed_server}/fresh")])
+
+        assert len(probes) == 1
+        probe = probes[0]
+        assert probe["ok"] and probe["status_code"] == 200
+        assert probe["bytes"] > 0 and probe["items"] == 2
+        assert 1700 <= probe["newest_item_age_s"] <= 1900
+        assert probe["latency_ms"] >= 0
+        assert probe["meta"] == {"source": "a", "domain": "a.vn", "feed": f"{feed_server}/fresh", "kind": "rss"}
+
+    @pytest.mark.asyncio
+    async def test_failures_are_recorded(self, feed_server):
+        """HTTP errors, non-feeds, timeouts and refused connections are reported, not raised"""
+        source = make_source(
+            "b", f"{feed_server}/broken", f"{feed_server}/empty", f"{feed_server}/slow",
+            google="http://127.0.0.1:1/unreachable"
+        )
+        probes = await probe_sources([source], timeout=0.1)
+        by_feed = {p["meta"]["feed"].rsplit("/", 1)[-1]: p for p in probes}
+
+        assert not any(p["ok"] for p in probes)
+        assert by_feed["broken"]["status_code"] == 500
+        assert by_feed["empty"]["error"] == "no feed entries"
+        assert by_feed["slow"]["error"] == "timeout"
+        assert by_feed["unreachable"]["status_code"] is None
+        assert by_feed["unreachable"]["meta"]["kind"] == "google_news"
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_is_recorded(self, feed_server, monkeypatch):
+        """Errors outside aiohttp are recorded against the feed instead of failing the sweep"""
+        def broken_parser(body):
+            raise ValueError("parser crashed")
+
+        monkeypatch.setattr(sources_service, "_newest_entry", broken_parser)
+        probes = await probe_sources([make_source("d", f"{feed_server}/fresh", "not a url")])
+
+        assert len(probes) == 2 and not any(p["ok"] for p in probes)
+        assert probes[0]["error"] == "ValueError: parser crashed"
+        assert probes[0]["status_code"] == 200
+        assert probes[1]["error"]
+
+
+class TestHealthSweep:
+    """Test concurrent sweeps"""
+
+    def test_source_feeds_include_google_news(self):
+        source = make_source("c", "https://c.vn/rss", google="https://news.google.com/rss?q=c")
+        assert [f["kind"] for f in source_feeds(source)] == ["rss", "google_news"]
+
+    @pytest.mark.asyncio
+    async def test_feeds_are_probed_concurrently(self, feed_server):
+        """A sweep takes about one slow response, not one per feed"""
+        sources = [make_source(f"s{i}", f"{feed_server}/slow") for i in range(10)]
+
+        started = time.perf_counter()
+        probes = await probe_sources(sources, concurrency=10)
+        elapsed = time.perf_counter() - started
+
+        assert len(probes) == 10 and all(p["ok"] for p in probes)
+        assert elapsed < 1.5
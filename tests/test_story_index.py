@@ -0,0 +1,81 @@
+"""
+Tests for near-duplicate story clustering
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from mongodb.api.services.story_index import StoryIndex, normalize, signature, similarity
+
+TITLE = "Lũ quét ở Sơn La làm 3 người mất tích, hàng chục ngôi nhà bị cuốn trôi"
+LEAD = "Trận lũ quét đêm qua tại huyện Mường La, tỉnh Sơn La đã làm 3 người mất tích và cuốn trôi 25 ngôi nhà."
+
+
+class TestSignature:
+    """Test MinHash signatures (no database)"""
+
+    def test_normalize(self):
+        assert normalize("<b>Bão số 3</b> &amp; lũ: TP.HCM!") == "bão số 3 lũ tp hcm"
+
+    def test_copies_are_similar(self):
+        original = signature(TITLE, LEAD)
+        syndicated = signature(TITLE + " - Báo Tuổi Trẻ", "<p>" + LEAD + "</p>")
+
+        assert similarity(original, syndicated) >= 0.8
+
+    def test_unrelated_articles_are_not(self):
+        other = signature("Giá vàng hôm nay tăng mạnh", "Thị trường vàng trong nước biến động theo giá thế giới.")
+
+        assert similarity(signature(TITLE, LEAD), other) < 0.2
+
+    def test_empty_text(self):
+        assert signature("", "") is None
+        assert signature("   ", "<br/>") is None
+
+
+class TestStoryIndex:
+    """Test LSH matching over the recent window"""
+
+    def test_match_joins_existing_story(self):
+        index = StoryIndex(threshold=0.5, window_days=3)
+        index.add("a1", "a1", signature(TITLE, LEAD))
+
+        assert index.match(signature(TITLE + " - VnExpress", LEAD)) == "a1"
+        assert index.match(signature("Giá vàng hôm nay tăng mạnh")) is None
+
+    def test_add_is_idempotent(self):
+        index = StoryIndex(threshold=0.5, window_days=3)
+        sig = signature(TITLE, LEAD)
+        index.add("a1", "a1", sig)
+        index.add("a1", "a1", sig)
+
+        assert len(index) == 1
+
+    def test_old_articles_are_evicted(self):
+        index = StoryIndex(threshold=0.5, window_days=3)
+        now = datetime.now()
+        index.add("old", "old", signature(TITLE, LEAD), at=now - timedelta(days=4))
+        index.add("new", "new", signature("Giá vàng hôm nay tăng mạnh"), at=now)
+
+        assert len(index) == 1
+        assert index.match(signature(TITLE, LEAD)) is None
+
+
+class TestStoryIndexSync:
+    """Test loading signatures stored by other processes"""
+
+    @pytest.mark.asyncio
+    async def test_sync_loads_recent_articles(self, test_db):
+        now = datetime.now()
+        await test_db.articles.insert_many([
+            {"title": TITLE, "story_id": "s1", "story_signature": signature(TITLE, LEAD), "created_at": now},
+            {"title": "Cũ", "story_id": "s2", "story_signature": signature("Giá vàng"), "created_at": now - timedelta(days=10)},
+            {"title": "Không có chữ ký", "created_at": now},
+        ])
+        index = StoryIndex(threshold=0.5, window_days=3)
+
+        await index.sync(test_db.articles)
+
+        assert len(index) == 1
+        assert index.match(signature(TITLE, LEAD)) == "s1"
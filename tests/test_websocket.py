@@ -0,0 +1,471 @@
+"""
+Test WebSocket fan-out
+"""
+
+import asyncio
+from collections import deque
+import json
+
+import pytest
+
+from mongodb.api.websockets.broadcaster import (
+    Broadcaster,
+    POLICY_DISCONNECT,
+    POLICY_DROP_OLDEST,
+    CLOSE_CODE_SLOW_CONSUMER,
+)
+from mongodb.api.websockets.hub import RealtimeHub, StreamClient
+from mongodb.api.websockets.coalescer import EventCoalescer
+from mongodb.api.websockets.heartbeat import HeartbeatService, CLOSE_CODE_IDLE
+from mongodb.api.services.redis_service import RedisService, CHANNEL_EVENTS
+from mongodb.api.websockets.wire import WireEvent, WIRE_JSON, WIRE_MSGPACK
+from mongodb.api.websockets.subscriptions import Subscription, SubscriptionIndex
+
+
+def make_hub(coalesce_window_ms: int = 0) -> RealtimeHub:
+    """Hub that sends each event as its own frame unless a window is given"""
+    hub = RealtimeHub()
+    hub.coalescer = EventCoalescer(hub._publish_batch, window_ms=coalesce_window_ms, max_events=100)
+    return hub
+
+
+class FakeWebSocket:
+    """Minimal WebSocket stand-in recording sent frames"""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+class TestBroadcaster:
+    """Test per-client queues and slow consumer policies"""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_block_others(self):
+        """Fast clients receive every frame while a slow one lags"""
+        hub = Broadcaster(queue_size=100, policy=POLICY_DROP_OLDEST)
+        fast = [FakeWebSocket() for _ in range(50)]
+        slow = FakeWebSocket(delay=10)
+        for ws in fast + [slow]:
+            hub.register(ws)
+
+        for i in range(10):
+            assert hub.publish({"event": "n", "i": i}) == 51
+        await asyncio.sleep(0.05)
+
+        assert all(len(ws.sent) == 10 for ws in fast)
+        assert json.loads(fast[0].sent[-1]) == {"event": "n", "i": 9}
+        assert slow.sent == []
+        assert hub.metrics()["queue_depth_max"] == 9
+
+        hub.unregister(slow)
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_keeps_newest_frames(self):
+        """A full queue discards its oldest frame and counts the drop"""
+        hub = Broadcaster(queue_size=3, policy=POLICY_DROP_OLDEST)
+        ws = FakeWebSocket()
+        channel = hub.register(ws)
+
+        # Publish before the writer task gets a chance to run
+        for i in range(5):
+            hub.publish(str(i))
+        await asyncio.sleep(0.01)
+
+        assert ws.sent == ["2", "3", "4"]
+        assert channel.dropped == 2
+        assert hub.metrics()["dropped_total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy_closes_slow_client(self):
+        """With the disconnect policy an overflowing client is closed"""
+        hub = Broadcaster(queue_size=2, policy=POLICY_DISCONNECT)
+        ws = FakeWebSocket()
+        hub.register(ws)
+
+        for i in range(3):
+            hub.publish(str(i))
+        await asyncio.sleep(0.01)
+
+        assert ws.closed_with == CLOSE_CODE_SLOW_CONSUMER
+        assert hub.connection_count == 0
+        assert hub.metrics()["slow_disconnects"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_send_unregisters_client(self):
+        """A socket error stops the writer and removes the client"""
+        class BrokenWebSocket(FakeWebSocket):
+            async def send_text(self, text: str):
+                raise RuntimeError("closed")
+
+        hub = Broadcaster(queue_size=10)
+        hub.register(BrokenWebSocket())
+        hub.publish("x")
+        await asyncio.sleep(0.01)
+
+        assert hub.connection_count == 0
+
+
+class TestRealtimeHub:
+    """Test single publish API and cross-worker delivery"""
+
+    @staticmethod
+    def _connect(hub, count: int):
+        sockets = [FakeWebSocket() for _ in range(count)]
+        for ws in sockets:
+            hub.active_connections.add(ws)
+            hub.broadcaster.register(ws)
+            hub.subscriptions.add(ws)
+        return sockets
+
+    @pytest.mark.asyncio
+    async def test_publish_without_redis_delivers_locally(self):
+        """Without Redis every local client gets the event once"""
+        hub = make_hub()
+        sockets = self._connect(hub, 3)
+
+        await hub.publish("new_disaster", {"title": "Lũ"})
+        await asyncio.sleep(0.01)
+
+        for ws in sockets:
+            assert len(ws.sent) == 1
+            frame = json.loads(ws.sent[0])
+            assert frame["event"] == frame["type"] == "new_disaster"
+            assert frame["data"] == {"title": "Lũ"}
+
+    @pytest.mark.asyncio
+    async def test_publish_through_redis_reaches_every_worker_once(self, monkeypatch):
+        """With Redis, each client on each worker receives the event exactly once"""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        redis_service = RedisService()
+        monkeypatch.setattr(redis_service, "_client", fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        monkeypatch.setattr(redis_service, "_raw_client", fakeredis.FakeAsyncRedis(server=server))
+        monkeypatch.setattr(redis_service, "_raw_pubsub", None)
+        monkeypatch.setattr(redis_service, "_raw_subscribers", {})
+        monkeypatch.setattr(redis_service, "_raw_listener_task", None)
+
+        # Two hubs in one process stand in for two workers sharing Redis
+        workers = [make_hub(), make_hub()]
+        sockets = [self._connect(w, 2) for w in workers]
+        for w in workers:
+            await RedisService.subscribe_raw(CHANNEL_EVENTS, w._on_redis_batch)
+            w.redis_connected = True
+        await asyncio.sleep(0.05)
+
+        await workers[0].publish("disaster_alert", {"severity": "high"})
+        await asyncio.sleep(0.1)
+
+        for ws in sockets[0] + sockets[1]:
+            assert len(ws.sent) == 1
+            assert json.loads(ws.sent[0])["seq"] == 1
+
+        redis_service._raw_listener_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_raw_listener_recovers_and_hub_falls_back_meanwhile(self, monkeypatch):
+        """A Redis error resubscribes the listener; until then the hub delivers locally"""
+        fakeredis = pytest.importorskip("fakeredis")
+        from mongodb.api.services import redis_service as redis_module
+        server = fakeredis.FakeServer()
+        redis_service = RedisService()
+        monkeypatch.setattr(redis_module, "RAW_RECONNECT_DELAY", 0.01)
+        monkeypatch.setattr(redis_service, "_client", fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        monkeypatch.setattr(redis_service, "_raw_client", fakeredis.FakeAsyncRedis(server=server))
+        monkeypatch.setattr(redis_service, "_raw_pubsub", None)
+        monkeypatch.setattr(redis_service, "_raw_subscribers", {})
+        monkeypatch.setattr(redis_service, "_raw_listener_task", None)
+        monkeypatch.setattr(redis_service, "_raw_state_listeners", [])
+
+        hub = make_hub()
+        (ws,) = self._connect(hub, 1)
+        states = []
+        RedisService.on_raw_state(hub._on_redis_state)
+        RedisService.on_raw_state(states.append)
+
+        async def broken(*args, **kwargs):
+            raise ConnectionError("connection reset")
+
+        # The first pub/sub connection fails as soon as the listener reads
+        await RedisService.subscribe_raw(CHANNEL_EVENTS, hub._on_redis_batch)
+        redis_service._raw_pubsub.get_message = broken
+        hub.redis_connected = True
+        await asyncio.sleep(0.2)
+
+        assert states == [False, True]
+        assert hub.redis_connected
+
+        hub._on_redis_state(False)
+        await hub.publish("disaster_alert", {"severity": "high"})
+        await asyncio.sleep(0.01)
+        assert len(ws.sent) == 1
+
+        hub._on_redis_state(True)
+        await hub.publish("disaster_alert", {"severity": "low"})
+        await asyncio.sleep(0.1)
+        assert len(ws.sent) == 2
+
+        redis_service._raw_listener_task.cancel()
+
+
+class TestSubscriptions:
+    """Test topic subscriptions and filtered delivery"""
+
+    @pytest.mark.asyncio
+    async def test_events_routed_to_matching_subscribers(self):
+        """Only sockets whose filters match an event receive it"""
+        hub = make_hub()
+        everyone, north, central_floods, high_only = TestRealtimeHub._connect(hub, 4)
+        hub.subscribe(north, {"topics": ["region:north"]})
+        hub.subscribe(central_floods, {"regions": ["Central"], "disaster_types": ["flood"]})
+        hub.subscribe(high_only, {"topics": ["severity:high"]})
+
+        await hub.publish("new_disaster", {"region": "central", "disaster_type": "flood", "severity": "medium"})
+        await hub.publish("new_disaster", {"region": "north", "disaster_type": "storm", "severity": "high"})
+        await hub.publish("stats_update", {"today": 3})
+        await asyncio.sleep(0.01)
+
+        assert len(everyone.sent) == 3
+        assert [json.loads(t)["data"].get("region") for t in north.sent] == ["north", None]
+        assert [json.loads(t)["data"].get("region") for t in central_floods.sent] == ["central", None]
+        assert [json.loads(t)["data"].get("severity") for t in high_only.sent] == ["high", None]
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_restores_full_feed(self):
+        """Unsubscribing puts the socket back on every event"""
+        hub = make_hub()
+        (ws,) = TestRealtimeHub._connect(hub, 1)
+        hub.subscribe(ws, {"topics": ["region:south"]})
+        hub.unsubscribe(ws)
+
+        await hub.publish("new_disaster", {"region": "north", "severity": "low"})
+        await asyncio.sleep(0.01)
+
+        assert len(ws.sent) == 1
+        assert hub.subscriptions.stats()["filtered"] == 0
+
+    def test_index_and_matches_agree_on_unknown_severity(self):
+        """Live routing and replay filtering use the same severity rule"""
+        index = SubscriptionIndex()
+        low, medium = object(), object()
+        index.add(low, Subscription.from_topics(["severity:low"]))
+        index.add(medium, Subscription.from_topics(["severity:medium"]))
+
+        for data in ({"severity": "unknown"}, {"region": "north"}):
+            routed = index.match(data)
+            for sock in (low, medium):
+                assert (sock in routed) == index.get(sock).matches(data)
+
+    def test_malformed_subscribe_fields_are_ignored(self):
+        """Wrong field types fall back to "no filter" instead of raising"""
+        sub = Subscription.from_message({"min_severity": 2, "regions": 5, "disaster_types": {"a": 1}})
+        assert sub.to_dict() == {"regions": None, "disaster_types": None, "min_severity": None}
+
+        sub = Subscription.from_message({"topics": "region:north"})
+        assert sub.regions == {"north"}
+
+
+class TestReplay:
+    """Test sequenced events and resume from last_seq"""
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_only_missed_events(self):
+        """A reconnecting client gets exactly the events after its last_seq"""
+        hub = make_hub()
+        for i in range(5):
+            await hub.publish("new_disaster", {"title": f"t{i}"})
+        assert hub.last_seq == 5
+
+        (ws,) = TestRealtimeHub._connect(hub, 1)
+        assert hub.replay(ws, 3) == 2
+        await asyncio.sleep(0.01)
+
+        assert [json.loads(t)["seq"] for t in ws.sent] == [4, 5]
+
+    @pytest.mark.asyncio
+    async def test_replay_respects_subscription(self):
+        """Replayed events are filtered like live ones"""
+        hub = make_hub()
+        await hub.publish("new_disaster", {"region": "north", "severity": "high"})
+        await hub.publish("new_disaster", {"region": "south", "severity": "high"})
+
+        (ws,) = TestRealtimeHub._connect(hub, 1)
+        hub.subscribe(ws, {"topics": ["region:south"]})
+        assert hub.replay(ws, 0) == 1
+
+    @pytest.mark.asyncio
+    async def test_gap_reported_when_buffer_overflowed(self):
+        """Clients older than the buffer are told to backfill"""
+        hub = make_hub()
+        hub.replay_buffer = deque(maxlen=2)
+        for i in range(4):
+            await hub.publish("new_disaster", {"title": f"t{i}"})
+
+        (ws,) = TestRealtimeHub._connect(hub, 1)
+        hub.replay(ws, 0)
+        await asyncio.sleep(0.01)
+
+        frames = [json.loads(t) for t in ws.sent]
+        assert frames[0]["type"] == "replay_gap"
+        assert frames[0]["data"] == {"last_seq": 0, "oldest_seq": 3}
+        assert [f["seq"] for f in frames[1:]] == [3, 4]
+
+
+class TestHeartbeat:
+    """Test the shared heartbeat and idle eviction wheel"""
+
+    @pytest.mark.asyncio
+    async def test_beat_sends_one_frame_to_every_socket(self):
+        """One tick queues the same encoded heartbeat for all clients"""
+        hub = make_hub()
+        sockets = TestRealtimeHub._connect(hub, 3)
+
+        assert hub.heartbeat.beat() == 3
+        await asyncio.sleep(0.01)
+
+        frame = json.loads(sockets[0].sent[0])
+        assert frame["type"] == "heartbeat"
+        assert frame["connections"] == 3
+        assert len({ws.sent[0] for ws in sockets}) == 1
+
+    @pytest.mark.asyncio
+    async def test_idle_sockets_evicted_after_timeout(self):
+        """Sockets not heard from for idle_timeout are closed; active ones stay"""
+        hub = make_hub()
+        hub.heartbeat = HeartbeatService(hub, interval=10, idle_timeout=20)
+        active, idle = TestRealtimeHub._connect(hub, 2)
+        for ws in (active, idle):
+            hub.touch(ws)
+
+        for _ in range(3):
+            hub.heartbeat.beat()
+            hub.touch(active)
+        await asyncio.sleep(0.01)
+
+        assert hub.connection_count == 1
+        assert active in hub.active_connections
+        assert idle.closed_with == CLOSE_CODE_IDLE
+        assert hub.heartbeat.stats()["evicted"] == 1
+
+
+class TestCoalescing:
+    """Test micro-batching of new_disaster bursts"""
+
+    @pytest.mark.asyncio
+    async def test_burst_becomes_one_frame_with_stats_delta(self):
+        """Events inside the window reach each client as one new_disasters frame"""
+        hub = make_hub(coalesce_window_ms=20)
+        (ws,) = TestRealtimeHub._connect(hub, 1)
+
+        for i in range(30):
+            await hub.publish("new_disaster", {"title": f"t{i}", "severity": "high" if i % 3 == 0 else "low"})
+        await asyncio.sleep(0.05)
+
+        assert len(ws.sent) == 1
+        frame = json.loads(ws.sent[0])
+        assert frame["type"] == "new_disasters"
+        assert frame["data"]["count"] == 30
+        assert frame["data"]["stats_delta"]["by_severity"] == {"high": 10, "low": 20}
+        assert hub.last_seq == 1
+
+    @pytest.mark.asyncio
+    async def test_max_events_flushes_early(self):
+        """A full batch is sent without waiting for the window"""
+        hub = make_hub(coalesce_window_ms=10_000)
+        hub.coalescer.max_events = 5
+        (ws,) = TestRealtimeHub._connect(hub, 1)
+
+        for i in range(5):
+            await hub.publish("new_disaster", {"title": f"t{i}"})
+        await asyncio.sleep(0.01)
+
+        assert json.loads(ws.sent[0])["data"]["count"] == 5
+        assert hub.coalescer.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_split_by_subscription(self):
+        """Filtered clients only get their items; empty subsets send nothing"""
+        hub = make_hub(coalesce_window_ms=10)
+        everyone, north, south = TestRealtimeHub._connect(hub, 3)
+        hub.subscribe(north, {"topics": ["region:north"]})
+        hub.subscribe(south, {"topics": ["region:south"]})
+
+        for region in ("north", "north", "central"):
+            await hub.publish("new_disaster", {"region": region, "severity": "medium"})
+        await asyncio.sleep(0.05)
+
+        assert json.loads(everyone.sent[0])["data"]["count"] == 3
+        assert json.loads(north.sent[0])["data"]["count"] == 2
+        assert south.sent == []
+
+
+class TestStreamClients:
+    """Test SSE clients on the shared hub"""
+
+    @pytest.mark.asyncio
+    async def test_stream_clients_share_one_event_stream_record(self):
+        """SSE clients get id/event/data records encoded once per event"""
+        hub = make_hub()
+        (ws,) = TestRealtimeHub._connect(hub, 1)
+        channels = [hub.connect_stream(StreamClient()) for _ in range(2)]
+
+        await hub.publish("disaster_alert", {"title": "Bão số 3"})
+        await asyncio.sleep(0.01)
+
+        frames = [c.queue.get_nowait() for c in channels]
+        assert frames[0] is frames[1]
+        assert frames[0].startswith("id: 1\nevent: disaster_alert\ndata: {")
+        assert frames[0].endswith("\n\n")
+        assert json.loads(ws.sent[0])["data"]["title"] == "Bão số 3"
+
+    @pytest.mark.asyncio
+    async def test_stream_resume_and_filters(self):
+        """Last-Event-ID replay and query filters apply to SSE clients"""
+        hub = make_hub()
+        await hub.publish("new_disaster", {"region": "north", "severity": "high"})
+        await hub.publish("new_disaster", {"region": "south", "severity": "high"})
+
+        client = StreamClient()
+        channel = hub.connect_stream(client, {"regions": ["south"]})
+        assert hub.replay(client, 0) == 1
+        assert channel.queue.get_nowait().startswith("id: 2\n")
+
+        hub.disconnect(client)
+        assert hub.connection_count == 0
+
+
+class TestWireFormat:
+    """Test the cross-worker event envelope"""
+
+    @pytest.mark.parametrize("fmt", [WIRE_JSON, WIRE_MSGPACK])
+    def test_roundtrip_keeps_body_bytes(self, fmt):
+        """Receivers get the publisher's JSON body verbatim plus routing header"""
+        if fmt == WIRE_MSGPACK:
+            pytest.importorskip("msgpack")
+        event = WireEvent.from_message({
+            "type": "new_disaster", "seq": 7,
+            "data": {"title": "Lũ quét", "region": "north", "severity": "high"}
+        })
+
+        received = WireEvent.from_wire(event.to_wire(fmt))
+
+        assert received.body == event.body
+        assert (received.seq, received.type) == (7, "new_disaster")
+        assert received.route == {"region": "north", "severity": "high"}
+        assert received._message is None
+
+    def test_legacy_json_message_accepted(self):
+        """Plain JSON from legacy publishers is still understood"""
+        received = WireEvent.from_wire(b'{"event": "stats_update", "data": {"today": 1}}')
+
+        assert received.route is None
+        assert received.message["data"] == {"today": 1}